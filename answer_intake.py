@@ -0,0 +1,115 @@
+# Cola de entrada de respuestas por sesión: on_message encola y un worker verifica
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, NamedTuple, Optional, Set, Tuple
+
+import discord
+
+from config import INTAKE_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class Attempt(NamedTuple):
+    ronda: int
+    clave: Tuple[int, int, str]
+    message: discord.Message
+    llegada: float
+
+
+class AnswerIntake:
+    """Cola acotada de intentos de respuesta de una sesión.
+
+    submit() es síncrono y nunca espera: descarta lo que no es del jugador de
+    la ronda, junta intentos repetidos y, si la cola está llena, rechaza el
+    intento (se prefiere perder ráfagas a retrasar la verificación). El worker
+    descarta los intentos de rondas que ya terminaron antes de verificarlos.
+    """
+
+    def __init__(self, sesion, capacidad: int = INTAKE_QUEUE_SIZE):
+        self.sesion = sesion
+        self.capacidad = capacidad
+        self._cola: Deque[Attempt] = deque()
+        self._claves: Set[Tuple[int, int, str]] = set()
+        self._hay_trabajo = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+
+        # Métricas
+        self.encolados = 0
+        self.procesados = 0
+        self.coalescidos = 0
+        self.obsoletos = 0
+        self.descartados = 0
+        self.espera_total = 0.0
+
+    def __len__(self) -> int:
+        return len(self._cola)
+
+    def submit(self, message: discord.Message) -> bool:
+        """Encolar un posible intento; False si se ignoró, se juntó con otro o no cabía"""
+        sesion = self.sesion
+        if not sesion.current_answers or not sesion.current_player:
+            return False
+        if message.author.id != sesion.current_player.id:
+            return False
+
+        clave = (sesion.round_id, message.author.id, message.content.strip().casefold())
+        if clave in self._claves:
+            self.coalescidos += 1
+            return False
+        if len(self._cola) >= self.capacidad:
+            self.descartados += 1
+            logger.debug("🚦 Cola de respuestas llena en #%s, intento descartado", getattr(sesion.channel, "name", "?"))
+            return False
+
+        self._claves.add(clave)
+        self._cola.append(Attempt(sesion.round_id, clave, message, time.perf_counter()))
+        self.encolados += 1
+        self._hay_trabajo.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return True
+
+    async def _run(self):
+        while True:
+            if not self._cola:
+                self._hay_trabajo.clear()
+                await self._hay_trabajo.wait()
+                continue
+
+            intento = self._cola.popleft()
+            self._claves.discard(intento.clave)
+            self.espera_total += time.perf_counter() - intento.llegada
+
+            # La ronda terminó (acierto, tiempo agotado o nueva ronda) mientras esperaba
+            if intento.ronda != self.sesion.round_id or not self.sesion.current_answers:
+                self.obsoletos += 1
+                continue
+
+            try:
+                await self.sesion.handle_translation_attempt(intento.message)
+                self.procesados += 1
+            except Exception as e:
+                logger.error("❌ Error verificando respuesta: %s", e)
+
+    def stop(self):
+        """Cancelar el worker y olvidar los intentos pendientes"""
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
+        self._cola.clear()
+        self._claves.clear()
+
+    def stats(self) -> dict:
+        atendidos = self.procesados + self.obsoletos
+        return {
+            "profundidad": len(self._cola),
+            "encolados": self.encolados,
+            "procesados": self.procesados,
+            "coalescidos": self.coalescidos,
+            "obsoletos": self.obsoletos,
+            "descartados": self.descartados,
+            "espera_media": self.espera_total / atendidos if atendidos else 0.0
+        }
@@ -0,0 +1,78 @@
+# Cliente HTTP asíncrono compartido para la API de palabras
+import asyncio
+from typing import Any, Dict, Optional
+from urllib.parse import quote
+
+import aiohttp
+
+from api_config import (
+    API_URL, API_TIMEOUT, API_MAX_CONEXIONES, API_MAX_CONCURRENTES, API_KEEPALIVE
+)
+
+
+class ApiError(Exception):
+    """Error al comunicarse con la API de palabras"""
+
+    def __init__(self, mensaje: str, status: Optional[int] = None):
+        super().__init__(mensaje)
+        self.status = status
+
+
+class ApiClient:
+    """Cliente con pool de conexiones keep-alive, plazo por llamada y límite de concurrencia.
+
+    Nunca bloquea el event loop: todas las llamadas son corrutinas y el plazo
+    incluye el tiempo esperando un hueco en el límite de concurrencia.
+    """
+
+    def __init__(self, base_url: str = API_URL, timeout: float = API_TIMEOUT,
+                 max_conexiones: int = API_MAX_CONEXIONES,
+                 max_concurrentes: int = API_MAX_CONCURRENTES):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_conexiones = max_conexiones
+        self._semaforo = asyncio.Semaphore(max_concurrentes)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # La sesión se crea bajo demanda para que pertenezca al loop en ejecución
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_conexiones,
+                keepalive_timeout=API_KEEPALIVE,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None,
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Hacer GET a la API y devolver el JSON. Lanza ApiError si falla o vence el plazo"""
+        plazo = timeout if timeout is not None else self.timeout
+        session = self._get_session()
+
+        try:
+            async with asyncio.timeout(plazo):
+                async with self._semaforo:
+                    async with session.get(f"{self.base_url}{path}", params=params) as response:
+                        if response.status != 200:
+                            raise ApiError(f"HTTP {response.status} en {path}", status=response.status)
+                        return await response.json()
+        except TimeoutError:
+            raise ApiError(f"Tiempo agotado ({plazo}s) en {path}")
+        except aiohttp.ClientError as e:
+            raise ApiError(f"Error de conexión en {path}: {e}")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def ruta_traduccion(word: str) -> str:
+    """Ruta del endpoint de traducción con la palabra escapada"""
+    return f"/traducir/{quote(word, safe='')}"
+
+
+# Cliente compartido por todo el bot
+api_client = ApiClient()
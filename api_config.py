@@ -5,9 +5,28 @@ API_URL = "https://api-traduccion-discord-api.up.railway.app"
 # Fallback a APIs externas si la propia no está disponible
 USE_FALLBACK_APIS = True
 
+# Configuración del cliente HTTP asíncrono
+API_TIMEOUT = 10            # Plazo máximo por llamada en segundos
+API_MAX_CONEXIONES = 20     # Tamaño del pool de conexiones keep-alive
+API_MAX_CONCURRENTES = 10   # Llamadas simultáneas permitidas contra la API
+API_KEEPALIVE = 30          # Segundos que se mantiene abierta una conexión inactiva
+
+# Resiliencia: cortocircuito, reintentos, peticiones duplicadas y presupuestos de latencia
+API_BREAKER_FALLOS = 5          # Fallos seguidos que abren el circuito de un endpoint
+API_BREAKER_ESPERA = 30         # Segundos con el circuito abierto antes de probar de nuevo
+API_REINTENTOS = 2              # Reintentos tras un fallo transitorio (timeout, conexión, 5xx, 429)
+API_BACKOFF_BASE = 0.2          # Espera base entre reintentos (crece x2, con jitter completo)
+API_BACKOFF_MAX = 2             # Espera máxima entre reintentos
+API_HEDGE_PERCENTIL = 0.95      # Se lanza una segunda petición si la primera supera este percentil
+API_HEDGE_MUESTRAS = 20         # Latencias necesarias antes de empezar a duplicar peticiones
+API_HEDGE_MIN = 0.05            # Nunca duplicar antes de estos segundos
+API_PRESUPUESTO_RONDA = 0.5     # Una ronda debe empezar en este tiempo; si no, datos locales
+API_PRESUPUESTO_TRADUCCION = 3  # Espera máxima por una traducción antes de usar el fallback local
+API_PRESUPUESTO_ESTADISTICAS = 1.5  # Espera máxima de !estadisticas cuando no hay nada guardado
+
 # Instrucciones para cambiar la URL:
 # 1. Ve a Railway.app
 # 2. Abre tu proyecto de API
 # 3. Ve a Settings > Networking
 # 4. Copia la URL pública
-# 5. Reemplaza "https://tu-api.railway.app" con tu URL real 
\ No newline at end of file
+# 5. Reemplaza "https://tu-api.railway.app" con tu URL real 
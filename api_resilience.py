@@ -0,0 +1,253 @@
+# Capa de resiliencia sobre el cliente de la API: cortocircuito, reintentos y peticiones duplicadas
+import asyncio
+import logging
+import random
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Optional
+
+from api_client import api_client, ApiClient, ApiError
+from api_config import (
+    API_BREAKER_FALLOS, API_BREAKER_ESPERA, API_REINTENTOS, API_BACKOFF_BASE, API_BACKOFF_MAX,
+    API_HEDGE_PERCENTIL, API_HEDGE_MUESTRAS, API_HEDGE_MIN
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(ApiError):
+    """El circuito del endpoint está abierto: se falla al instante sin llamar a la API"""
+
+
+def es_fallo_transitorio(error: ApiError) -> bool:
+    """Timeouts, errores de conexión, 5xx y 429 cuentan como caída; el resto es una respuesta válida"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    return error.status is None or error.status >= 500 or error.status == 429
+
+
+class CircuitBreaker:
+    """Cortocircuito de un endpoint: cerrado, abierto o semiabierto.
+
+    Tras API_BREAKER_FALLOS fallos seguidos se abre y rechaza llamadas sin
+    esperar al timeout; pasados API_BREAKER_ESPERA segundos deja pasar una
+    sola sonda, que lo cierra si va bien o lo vuelve a abrir si falla.
+    """
+
+    CERRADO = "cerrado"
+    ABIERTO = "abierto"
+    SEMIABIERTO = "semiabierto"
+
+    def __init__(self, nombre: str, umbral: int = API_BREAKER_FALLOS, espera: float = API_BREAKER_ESPERA):
+        self.nombre = nombre
+        self.umbral = umbral
+        self.espera = espera
+        self.estado = self.CERRADO
+        self.fallos_seguidos = 0
+        self.abierto_desde = 0.0
+        self._sonda = False
+
+        # Métricas
+        self.aperturas = 0
+        self.rechazos = 0
+
+    def allow(self) -> bool:
+        if self.estado == self.ABIERTO:
+            if time.monotonic() - self.abierto_desde < self.espera:
+                self.rechazos += 1
+                return False
+            self.estado = self.SEMIABIERTO
+            self._sonda = False
+        if self.estado == self.SEMIABIERTO:
+            if self._sonda:
+                self.rechazos += 1
+                return False
+            self._sonda = True
+        return True
+
+    def success(self):
+        self.fallos_seguidos = 0
+        self._sonda = False
+        if self.estado != self.CERRADO:
+            logger.info("🟢 Circuito de %s cerrado, la API responde de nuevo", self.nombre)
+            self.estado = self.CERRADO
+
+    def failure(self):
+        self.fallos_seguidos += 1
+        self._sonda = False
+        if self.estado == self.SEMIABIERTO or self.fallos_seguidos >= self.umbral:
+            if self.estado != self.ABIERTO:
+                self.aperturas += 1
+                logger.warning("🔴 Circuito de %s abierto tras %s fallos seguidos", self.nombre, self.fallos_seguidos)
+            self.estado = self.ABIERTO
+            self.abierto_desde = time.monotonic()
+
+    def release(self):
+        """Una llamada se canceló sin veredicto: liberar la sonda si la había"""
+        if self.estado == self.SEMIABIERTO:
+            self._sonda = False
+
+
+class LatencyTracker:
+    """Ventana de las últimas latencias correctas de un endpoint"""
+
+    def __init__(self, ventana: int = 200):
+        self._muestras: Deque[float] = deque(maxlen=ventana)
+        self._ordenadas: Optional[list] = None
+
+    def __len__(self) -> int:
+        return len(self._muestras)
+
+    def add(self, segundos: float):
+        self._muestras.append(segundos)
+        self._ordenadas = None
+
+    def percentil(self, p: float) -> Optional[float]:
+        """Percentil p de la ventana; None mientras no haya muestras suficientes"""
+        if len(self._muestras) < API_HEDGE_MUESTRAS:
+            return None
+        if self._ordenadas is None:
+            self._ordenadas = sorted(self._muestras)
+        return self._ordenadas[min(len(self._ordenadas) - 1, int(p * len(self._ordenadas)))]
+
+
+class ResilientApi:
+    """get_json() con cortocircuito por endpoint, reintentos con jitter,
+    petición duplicada al superar el p95 y un presupuesto total de latencia.
+
+    Si el presupuesto se agota o el circuito está abierto lanza ApiError, y
+    quien llama usa sus datos locales (y lo anota con registrar_fallback).
+    """
+
+    def __init__(self, cliente: ApiClient = api_client):
+        self.cliente = cliente
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencias: Dict[str, LatencyTracker] = {}
+
+        # Métricas
+        self.reintentos = 0
+        self.hedges = 0
+        self.hedges_ganados = 0
+        self.presupuestos_agotados = 0
+        self.fallbacks: Counter = Counter()
+
+    @staticmethod
+    def endpoint(path: str) -> str:
+        """Endpoint de una ruta, sin parámetros de ruta ("/traducir/cat" -> "/traducir")"""
+        return "/" + path.lstrip("/").split("/", 1)[0]
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+    def latencias(self, endpoint: str) -> LatencyTracker:
+        tracker = self._latencias.get(endpoint)
+        if tracker is None:
+            tracker = self._latencias[endpoint] = LatencyTracker()
+        return tracker
+
+    def registrar_fallback(self, operacion: str):
+        self.fallbacks[operacion] += 1
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None,
+                       presupuesto: Optional[float] = None, hedge: bool = True) -> Dict[str, Any]:
+        """GET resiliente; `presupuesto` acota el tiempo total incluidos reintentos"""
+        endpoint = self.endpoint(path)
+        plazo = presupuesto if presupuesto is not None else self.cliente.timeout
+        try:
+            async with asyncio.timeout(plazo):
+                return await self._con_reintentos(endpoint, path, params, hedge)
+        except TimeoutError:
+            self.presupuestos_agotados += 1
+            raise ApiError(f"Presupuesto de {plazo}s agotado en {path}")
+
+    async def _con_reintentos(self, endpoint: str, path: str, params, hedge: bool) -> Dict[str, Any]:
+        for intento in range(API_REINTENTOS + 1):
+            breaker = self.breaker(endpoint)
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuito abierto en {endpoint}")
+            try:
+                return await self._con_hedge(endpoint, path, params, breaker, hedge)
+            except ApiError as e:
+                if not es_fallo_transitorio(e) or intento == API_REINTENTOS:
+                    raise
+                self.reintentos += 1
+                # Backoff exponencial con jitter completo para no sincronizar reintentos
+                await asyncio.sleep(random.uniform(0, min(API_BACKOFF_MAX, API_BACKOFF_BASE * 2 ** intento)))
+
+    async def _con_hedge(self, endpoint: str, path: str, params, breaker: CircuitBreaker,
+                         hedge: bool) -> Dict[str, Any]:
+        umbral = None
+        if hedge and breaker.estado == CircuitBreaker.CERRADO:
+            umbral = self.latencias(endpoint).percentil(API_HEDGE_PERCENTIL)
+        if umbral is None:
+            return await self._intento(endpoint, path, params, breaker)
+
+        primera = asyncio.create_task(self._intento(endpoint, path, params, breaker))
+        pendientes = {primera}
+        try:
+            hechas, pendientes = await asyncio.wait(pendientes, timeout=max(umbral, API_HEDGE_MIN))
+            if not hechas:
+                # La primera va más lenta que el p95: una segunda petición, gana la que llegue antes
+                self.hedges += 1
+                pendientes.add(asyncio.create_task(self._intento(endpoint, path, params, breaker)))
+            error: Optional[BaseException] = None
+            while hechas or pendientes:
+                for tarea in hechas:
+                    if tarea.exception() is None:
+                        if tarea is not primera:
+                            self.hedges_ganados += 1
+                        return tarea.result()
+                    error = tarea.exception()
+                if not pendientes:
+                    break
+                hechas, pendientes = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+            raise error
+        finally:
+            for tarea in pendientes:
+                tarea.cancel()
+
+    async def _intento(self, endpoint: str, path: str, params, breaker: CircuitBreaker) -> Dict[str, Any]:
+        inicio = time.perf_counter()
+        try:
+            datos = await self.cliente.get_json(path, params=params)
+        except ApiError as e:
+            if es_fallo_transitorio(e):
+                breaker.failure()
+            else:
+                breaker.success()
+            raise
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        breaker.success()
+        self.latencias(endpoint).add(time.perf_counter() - inicio)
+        return datos
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuitos": {
+                endpoint: {
+                    "estado": breaker.estado,
+                    "fallos_seguidos": breaker.fallos_seguidos,
+                    "aperturas": breaker.aperturas,
+                    "rechazos": breaker.rechazos
+                }
+                for endpoint, breaker in self._breakers.items()
+            },
+            "p95": {
+                endpoint: tracker.percentil(API_HEDGE_PERCENTIL)
+                for endpoint, tracker in self._latencias.items()
+            },
+            "reintentos": self.reintentos,
+            "hedges": self.hedges,
+            "hedges_ganados": self.hedges_ganados,
+            "presupuestos_agotados": self.presupuestos_agotados,
+            "fallbacks": dict(self.fallbacks)
+        }
+
+
+# Capa compartida: los circuitos y latencias son del bot entero, no de cada sesión
+resilient_api = ResilientApi()
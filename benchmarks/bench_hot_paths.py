@@ -0,0 +1,249 @@
+# Microbenchmarks de las rutas calientes del juego contra una API local simulada
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_hot_paths
+#     python -m benchmarks.bench_hot_paths --latencia 0.05 --fallos 0.1
+#     python -m benchmarks.bench_hot_paths --comparar benchmarks/results/anterior.json
+#
+# Cada ejecución guarda un JSON en benchmarks/results/ con el commit, la
+# configuración de la API simulada y las estadísticas de cada caso.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.fake_api import FakeWordApi
+
+RAIZ = Path(__file__).resolve().parent.parent
+RESULTADOS = RAIZ / "benchmarks" / "results"
+UMBRAL_REGRESION = 0.10
+
+
+def _resumen(nombre: str, tiempos_ns: List[int]) -> Dict[str, float]:
+    tiempos = sorted(t / 1000 for t in tiempos_ns)
+    media = statistics.fmean(tiempos)
+    return {
+        "nombre": nombre,
+        "iteraciones": len(tiempos),
+        "media_us": media,
+        "p50_us": tiempos[len(tiempos) // 2],
+        "p95_us": tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))],
+        "min_us": tiempos[0],
+        "ops_s": 1e6 / media if media else 0.0
+    }
+
+
+def medir(nombre: str, funcion: Callable[[], object], iteraciones: int) -> Dict[str, float]:
+    tiempos = []
+    for _ in range(iteraciones):
+        inicio = time.perf_counter_ns()
+        funcion()
+        tiempos.append(time.perf_counter_ns() - inicio)
+    return _resumen(nombre, tiempos)
+
+
+async def medir_async(nombre: str, corrutina: Callable[[], Awaitable[object]], iteraciones: int,
+                      preparar: Optional[Callable[[], Awaitable[object]]] = None) -> Dict[str, float]:
+    """Como medir(), pero esperando la corrutina; `preparar` se ejecuta fuera del cronómetro"""
+    tiempos = []
+    for _ in range(iteraciones):
+        if preparar:
+            await preparar()
+        inicio = time.perf_counter_ns()
+        await corrutina()
+        tiempos.append(time.perf_counter_ns() - inicio)
+    return _resumen(nombre, tiempos)
+
+
+class _Canal:
+    id = 1
+    name = "bench"
+
+    async def send(self, *args, **kwargs):
+        return None
+
+
+class _Servidor:
+    id = 1
+    name = "bench"
+
+    def get_member(self, user_id):
+        return None
+
+
+class _Autor:
+    bot = False
+    display_name = "jugador"
+    mention = "<@7>"
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+class _Mensaje:
+    def __init__(self, autor: _Autor, contenido: str):
+        self.author = autor
+        self.content = contenido
+        self.created_at = datetime.now(timezone.utc)
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def ejecutar(args) -> Dict[str, object]:
+    # Los módulos del bot usan rutas relativas (scores.json, word_corpus.db...):
+    # se importan desde un directorio temporal para no tocar los datos reales
+    os.chdir(tempfile.mkdtemp(prefix="bench-bot-"))
+    sys.path.insert(0, str(RAIZ))
+
+    from api_client import api_client
+    from api_resilience import resilient_api
+    from game_manager import GameManager, word_prefetcher
+    from leaderboard import scoreboard
+    from matching import are_similar_words, compile_answers
+    from score_store import score_store
+    from translation_cache import translation_cache
+
+    api = FakeWordApi(latencia=args.latencia, jitter=args.jitter, tasa_fallos=args.fallos,
+                      status_fallo=None if args.timeouts else 503, bloqueo=args.bloqueo)
+    api_client.base_url = await api.start()
+
+    n = args.iteraciones
+    juego = GameManager(channel=_Canal(), guild=_Servidor())
+    juego.is_game_active = True
+    resultados = []
+
+    try:
+        # Comparación de palabras y comprobación con la caché ya caliente
+        resultados.append(medir("are_similar_words", lambda: are_similar_words("murcielago", "murcielgao"), n * 10))
+        await juego.check_translation("cat", "gato")
+        resultados.append(await medir_async("check_translation (caché)",
+                                            lambda: juego.check_translation("cat", "el gatto"), n * 10))
+
+        # Traducción sin caché: pasa por la API simulada
+        async def preparar_frio():
+            translation_cache._entradas.clear()
+
+        resultados.append(await medir_async("check_translation (API)",
+                                            lambda: juego.check_translation("dog", "perro"), n,
+                                            preparar=preparar_frio))
+
+        # Puntuaciones: 10.000 jugadores, escritura diferida y volcado
+        for user_id in range(10_000):
+            scoreboard.add(juego.guild_id, user_id, user_id % 97)
+        contador = iter(range(10**9))
+        resultados.append(medir("update_score",
+                                lambda: juego.update_score(next(contador) % 10_000, 1), n * 10))
+        resultados.append(await medir_async("save_scores (flush)", score_store.flush, n,
+                                            preparar=lambda: _anotar(juego)))
+        resultados.append(medir("get_top_scores", lambda: juego.get_top_scores(10), n * 10))
+
+        # Palabra nueva directamente de la API (sin corpus ni precarga)
+        resultados.append(await medir_async("get_random_word (API)", juego.get_random_word, n))
+
+        # Intentos del jugador: fallo silencioso y acierto con cierre de ronda
+        jugador = _Autor(7)
+        respuestas = compile_answers("cat", "gato", ["felino", "minino"])
+
+        async def nueva_ronda():
+            await juego.set_round("cat", jugador, respuestas)
+
+        await nueva_ronda()
+        resultados.append(await medir_async(
+            "handle_translation_attempt (incorrecto)",
+            lambda: juego.handle_translation_attempt(_Mensaje(jugador, "perro")), n * 10))
+        resultados.append(await medir_async(
+            "handle_translation_attempt (correcto)",
+            lambda: juego.handle_translation_attempt(_Mensaje(jugador, "el gáto")), n,
+            preparar=nueva_ronda))
+    finally:
+        await api.stop()
+        await word_prefetcher.stop()
+        await api_client.close()
+
+    return {
+        "commit": _commit(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "api": api.stats(),
+        "resiliencia": resilient_api.stats(),
+        "resultados": resultados
+    }
+
+
+async def _anotar(juego):
+    for user_id in range(100):
+        juego.update_score(user_id, 1)
+
+
+def comparar(actual: Dict[str, object], archivo: str) -> bool:
+    """Imprimir la diferencia de medias con otra ejecución; True si hay regresiones"""
+    with open(archivo, "r", encoding="utf-8") as f:
+        base = {r["nombre"]: r for r in json.load(f)["resultados"]}
+
+    regresion = False
+    print(f"\nComparación con {archivo}:")
+    for r in actual["resultados"]:
+        anterior = base.get(r["nombre"])
+        if not anterior:
+            continue
+        cambio = r["media_us"] / anterior["media_us"] - 1 if anterior["media_us"] else 0.0
+        marca = ""
+        if cambio > UMBRAL_REGRESION:
+            marca = "  ⚠️ regresión"
+            regresion = True
+        print(f"  {r['nombre']:<42} {anterior['media_us']:10.2f} -> {r['media_us']:10.2f} µs ({cambio:+.0%}){marca}")
+    return regresion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks de las rutas calientes del bot")
+    parser.add_argument("--iteraciones", type=int, default=200)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos de latencia de la API simulada")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latencia extra aleatoria máxima")
+    parser.add_argument("--fallos", type=float, default=0.0, help="fracción de peticiones que fallan")
+    parser.add_argument("--timeouts", action="store_true", help="los fallos no responden en vez de dar 503")
+    parser.add_argument("--bloqueo", type=float, default=30.0, help="segundos que tarda un fallo con --timeouts")
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto benchmarks/results/)")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    if args.comparar:
+        args.comparar = os.path.abspath(args.comparar)
+    salida = Path(args.salida).resolve() if args.salida else None
+
+    informe = asyncio.run(ejecutar(args))
+
+    print(f"{'caso':<42} {'media':>10} {'p50':>10} {'p95':>10}   ops/s")
+    for r in informe["resultados"]:
+        print(f"{r['nombre']:<42} {r['media_us']:10.2f} {r['p50_us']:10.2f} {r['p95_us']:10.2f}   {r['ops_s']:,.0f}")
+    print(f"\nAPI simulada: {informe['api']['peticiones']} peticiones, {informe['api']['fallos']} fallos inyectados")
+    print(f"Datos locales usados: {informe['resiliencia']['fallbacks'] or 'ninguno'}")
+
+    if salida is None:
+        RESULTADOS.mkdir(parents=True, exist_ok=True)
+        salida = RESULTADOS / f"{time.strftime('%Y%m%d-%H%M%S')}-{informe['commit'] or 'sin-commit'}.json"
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {salida}")
+
+    if args.comparar and comparar(informe, args.comparar):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
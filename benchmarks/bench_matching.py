@@ -0,0 +1,85 @@
+# Benchmark del motor de respuestas frente a la implementación anterior
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.bench_matching
+import random
+import string
+import timeit
+
+from matching import compile_answers
+
+ITERACIONES = 20000
+
+
+def legacy_are_similar_words(word1: str, word2: str) -> bool:
+    """Implementación anterior de GameManager.are_similar_words"""
+    if len(word1) == len(word2):
+        differences = sum(c1 != c2 for c1, c2 in zip(word1, word2))
+        return differences <= 1
+    elif abs(len(word1) - len(word2)) == 1:
+        shorter, longer = (word1, word2) if len(word1) < len(word2) else (word2, word1)
+        for i in range(len(longer)):
+            if longer[:i] + longer[i+1:] == shorter:
+                return True
+        return False
+    return False
+
+
+def legacy_check(user_translation, traduccion, alternativas):
+    """Comprobación anterior de check_translation, ya con la respuesta de la API"""
+    user_translation = user_translation.lower().strip()
+    correct_translation = traduccion.lower()
+    if user_translation == correct_translation:
+        return True
+    for alt in alternativas:
+        if user_translation == alt.lower():
+            return True
+    if len(user_translation) >= 3 and len(correct_translation) >= 3:
+        if abs(len(user_translation) - len(correct_translation)) <= 1:
+            if legacy_are_similar_words(user_translation, correct_translation):
+                return True
+    return False
+
+
+def _palabra(rng: random.Random, longitud: int) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(longitud))
+
+
+def _intentos(rng: random.Random, traduccion: str, alternativas):
+    """Mezcla realista: aciertos, tildes, artículos, erratas y fallos"""
+    return [
+        traduccion,
+        f"el {traduccion}",
+        traduccion[:-1],
+        traduccion[1] + traduccion[0] + traduccion[2:],
+        rng.choice(alternativas),
+        _palabra(rng, len(traduccion)),
+        _palabra(rng, 30),
+    ]
+
+
+def medir(nombre, funcion):
+    segundos = timeit.timeit(funcion, number=ITERACIONES)
+    print(f"{nombre:<45} {segundos / ITERACIONES * 1e6:8.2f} µs/llamada")
+
+
+def main():
+    rng = random.Random(42)
+    traduccion = "murciélago"
+    alternativas = [_palabra(rng, rng.randint(4, 12)) for _ in range(40)]
+    intentos = _intentos(rng, traduccion, alternativas)
+    matcher = compile_answers("bat", traduccion, alternativas)
+
+    print(f"Respuesta con {len(alternativas)} alternativas, {len(intentos)} intentos por llamada\n")
+    medir("anterior (check sin API)", lambda: [legacy_check(t, traduccion, alternativas) for t in intentos])
+    medir("AnswerMatcher.matches", lambda: [matcher.matches(t) for t in intentos])
+    medir("compile_answers (una vez por ronda)", lambda: compile_answers("bat", traduccion, alternativas))
+
+    print("\nAceptados:")
+    for intento in intentos:
+        print(f"  {intento!r:<34} anterior={legacy_check(intento, traduccion, alternativas)!s:<5} "
+              f"nuevo={matcher.matches(intento)}")
+
+
+if __name__ == "__main__":
+    main()
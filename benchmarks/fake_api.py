@@ -0,0 +1,134 @@
+# Sustituto en proceso de la API de palabras, con latencia y fallos configurables
+import asyncio
+import random
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+# (palabra, traducción, alternativas, categoría)
+PALABRAS: Dict[str, List[Tuple[str, str, List[str], str]]] = {
+    "normal": [
+        ("cat", "gato", ["felino", "minino"], "animales"),
+        ("dog", "perro", ["can"], "animales"),
+        ("bird", "pájaro", ["ave"], "animales"),
+        ("house", "casa", ["hogar", "vivienda"], "hogar"),
+        ("table", "mesa", [], "hogar"),
+        ("red", "rojo", ["colorado"], "colores"),
+        ("blue", "azul", [], "colores"),
+        ("bread", "pan", [], "comida"),
+        ("apple", "manzana", [], "comida"),
+        ("water", "agua", [], "comida"),
+    ],
+    "warframe": [
+        ("serration", "serración", ["dentado"], "warframe"),
+        ("void", "vacío", [], "warframe"),
+        ("relic", "reliquia", [], "warframe"),
+        ("mod", "modificador", ["mod"], "warframe"),
+    ],
+}
+
+ENDPOINTS = {"/palabra-normal": "normal", "/palabra-warframe": "warframe", "/palabra-mixta": "mixto"}
+
+
+class FakeWordApi:
+    """Servidor aiohttp local que imita /palabra-*, /traducir/{palabra} y /estadisticas.
+
+    `latencia` y `jitter` retrasan cada respuesta; con probabilidad
+    `tasa_fallos` se responde `status_fallo` (o, si es None, no se responde
+    hasta pasado `bloqueo` segundos, para simular un timeout).
+    """
+
+    def __init__(self, latencia: float = 0.0, jitter: float = 0.0, tasa_fallos: float = 0.0,
+                 status_fallo: Optional[int] = 503, bloqueo: float = 30.0, semilla: int = 1234):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.tasa_fallos = tasa_fallos
+        self.status_fallo = status_fallo
+        self.bloqueo = bloqueo
+        self._rng = random.Random(semilla)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+        # Métricas
+        self.peticiones = 0
+        self.fallos = 0
+
+    def _pool(self, tipo: str):
+        if tipo == "mixto":
+            return PALABRAS["normal"] + PALABRAS["warframe"]
+        return PALABRAS.get(tipo, PALABRAS["normal"])
+
+    async def _simular(self) -> Optional[web.Response]:
+        """Aplicar latencia y, si toca, devolver la respuesta de fallo"""
+        self.peticiones += 1
+        retraso = self.latencia + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if retraso:
+            await asyncio.sleep(retraso)
+        if self.tasa_fallos and self._rng.random() < self.tasa_fallos:
+            self.fallos += 1
+            if self.status_fallo is None:
+                await asyncio.sleep(self.bloqueo)
+            return web.json_response({"error": "fallo inyectado"}, status=self.status_fallo or 503)
+        return None
+
+    async def _palabra(self, request: web.Request) -> web.Response:
+        fallo = await self._simular()
+        if fallo:
+            return fallo
+        pool = self._pool(ENDPOINTS[request.path])
+        categoria = request.query.get("categoria")
+        candidatas = [p for p in pool if p[3] == categoria] or pool
+        palabra = self._rng.choice(candidatas)
+        return web.json_response({"palabra": palabra[0], "categoria": palabra[3]})
+
+    async def _traducir(self, request: web.Request) -> web.Response:
+        fallo = await self._simular()
+        if fallo:
+            return fallo
+        buscada = request.match_info["palabra"].lower()
+        for pool in PALABRAS.values():
+            for palabra, traduccion, alternativas, _ in pool:
+                if palabra == buscada:
+                    return web.json_response({"palabra": palabra, "traduccion": traduccion,
+                                              "alternativas": alternativas})
+        return web.json_response({"error": "palabra no encontrada"}, status=404)
+
+    async def _estadisticas(self, request: web.Request) -> web.Response:
+        fallo = await self._simular()
+        if fallo:
+            return fallo
+        pool = self._pool(request.query.get("tipo", "mixto"))
+        por_categoria: Dict[str, int] = {}
+        for _, _, _, categoria in pool:
+            por_categoria[categoria] = por_categoria.get(categoria, 0) + 1
+        return web.json_response({"estadisticas": {"total": len(pool), "por_categoria": por_categoria}})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Arrancar en un puerto libre y devolver la URL base"""
+        app = web.Application()
+        for ruta in ENDPOINTS:
+            app.router.add_get(ruta, self._palabra)
+        app.router.add_get("/traducir/{palabra}", self._traducir)
+        app.router.add_get("/estadisticas", self._estadisticas)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        puerto = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{puerto}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "latencia": self.latencia,
+            "jitter": self.jitter,
+            "tasa_fallos": self.tasa_fallos,
+            "peticiones": self.peticiones,
+            "fallos": self.fallos
+        }
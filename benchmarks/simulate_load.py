@@ -0,0 +1,365 @@
+# Simulador de carga de extremo a extremo: servidores, miembros y tráfico sintéticos
+#
+# Uso (desde la raíz del repositorio):
+#     python -m benchmarks.simulate_load
+#     python -m benchmarks.simulate_load --miembros 40000 --mensajes 300 --duracion 60
+#     python -m benchmarks.simulate_load --mezcla "chat=80,respuesta=10,score=5,table=3,word=2"
+#
+# Los mensajes entran por el on_message real de bot.py (comandos incluidos) con
+# objetos falsos de discord; nada sale a Discord: los envíos se cuentan y se
+# retrasan `--latencia-envio` segundos. Las palabras vienen de FakeWordApi.
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import discord
+from discord.ext import commands
+
+from benchmarks.fake_api import FakeWordApi
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+MEZCLA_POR_DEFECTO = "chat=90,respuesta=6,score=2,table=1,word=0.5,join=0.5"
+COMANDOS = {
+    "score": "!score",
+    "table": "!table",
+    "word": "!word",
+    "join": "!join",
+    "status": "!status",
+    "metricas": "!metricas",
+    "estadisticas": "!estadisticas",
+}
+MODERADORES = {"word", "metricas"}
+CHARLA = ["hola", "alguien juega?", "gg", "jajaja", "qué tal", "buenas", "lol", "ok", "ya voy", "xd"]
+
+
+class SimStats:
+    """Contadores compartidos por todos los objetos simulados"""
+
+    def __init__(self):
+        self.envios = 0
+        self.envios_por_segundo: Counter = Counter()
+        self.latencias: List[float] = []
+        self.lag: List[float] = []
+        self.tipos: Counter = Counter()
+        self.errores = 0
+        self.tipos_error: Counter = Counter()
+
+    def envio(self):
+        self.envios += 1
+        self.envios_por_segundo[int(time.monotonic())] += 1
+
+
+class SimMember:
+    __slots__ = ("id", "name", "display_name", "mention", "bot", "pending", "guild", "moderador")
+
+    def __init__(self, guild: "SimGuild", user_id: int, bot: bool = False, moderador: bool = False):
+        self.id = user_id
+        self.name = f"usuario{user_id % 100000}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+        self.bot = bot
+        self.pending = False
+        self.guild = guild
+        self.moderador = moderador
+
+    def __eq__(self, otro) -> bool:
+        return getattr(otro, "id", None) == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+class SimChannel:
+    type = discord.ChannelType.text
+
+    def __init__(self, guild: "SimGuild", channel_id: int, stats: SimStats, latencia_envio: float):
+        self.id = channel_id
+        self.name = f"canal-{channel_id % 1000}"
+        self.mention = f"<#{channel_id}>"
+        self.guild = guild
+        self._stats = stats
+        self._latencia = latencia_envio
+
+    def permissions_for(self, member: SimMember) -> discord.Permissions:
+        if member.moderador:
+            return discord.Permissions(manage_messages=True, send_messages=True)
+        return discord.Permissions(send_messages=True)
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        if self._latencia:
+            await asyncio.sleep(self._latencia)
+        self._stats.envio()
+        return None
+
+
+class SimGuild:
+    def __init__(self, guild_id: int, miembros: int, canales: int, stats: SimStats, latencia_envio: float):
+        self.id = guild_id
+        self.name = f"servidor-{guild_id % 1000}"
+        self.chunked = True
+        self.me = SimMember(self, guild_id * 10**6 + 999_999, bot=True)
+        self.members = [SimMember(self, guild_id * 10**6 + i, moderador=(i == 0)) for i in range(miembros)]
+        self.members.append(self.me)
+        self._miembros = {m.id: m for m in self.members}
+        self.channels = [SimChannel(self, guild_id * 1000 + i, stats, latencia_envio) for i in range(canales)]
+        self._canales = {c.id: c for c in self.channels}
+        self.member_count = len(self.members)
+
+    def get_member(self, user_id: int) -> Optional[SimMember]:
+        return self._miembros.get(user_id)
+
+    def get_channel(self, channel_id: int) -> Optional[SimChannel]:
+        return self._canales.get(channel_id)
+
+    async def chunk(self):
+        return self.members
+
+
+class SimMessage:
+    _siguiente_id = 1
+
+    def __init__(self, author: SimMember, channel: SimChannel, content: str, state):
+        self.id = SimMessage._siguiente_id
+        SimMessage._siguiente_id += 1
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+        self.created_at = discord.utils.utcnow()
+        self._state = state
+        self.attachments = []
+        self.mentions = []
+
+
+class SimContext(commands.Context):
+    """Contexto de comando cuyas respuestas van al canal simulado, no a la API de Discord"""
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+def parse_mezcla(texto: str) -> Dict[str, float]:
+    mezcla = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        nombre = nombre.strip()
+        if nombre not in COMANDOS and nombre not in ("chat", "respuesta"):
+            raise SystemExit(f"Tipo de mensaje desconocido en --mezcla: {nombre}")
+        mezcla[nombre] = float(peso or 1)
+    return mezcla
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+async def _monitor_lag(stats: SimStats, intervalo: float = 0.01):
+    """Medir cuánto tarda el loop en despertar respecto a lo pedido"""
+    loop = asyncio.get_running_loop()
+    while True:
+        inicio = loop.time()
+        await asyncio.sleep(intervalo)
+        stats.lag.append(loop.time() - inicio - intervalo)
+
+
+async def simular(args) -> Dict[str, object]:
+    # Igual que en bench_hot_paths: los datos del bot van a un directorio temporal
+    os.chdir(tempfile.mkdtemp(prefix="sim-bot-"))
+    sys.path.insert(0, str(RAIZ))
+
+    import bot as bot_module
+    from api_client import api_client
+    from api_resilience import resilient_api
+    from player_pool import player_pools
+    from session_snapshot import session_snapshot
+    from sessions import sessions
+
+    api = FakeWordApi(latencia=args.latencia_api, tasa_fallos=args.fallos_api)
+    api_client.base_url = await api.start()
+
+    stats = SimStats()
+    rng = random.Random(args.semilla)
+    bot = bot_module.bot
+    bot.get_context = functools.partial(bot.get_context, cls=SimContext)
+
+    guilds = [SimGuild(i + 1, args.miembros, args.canales, stats, args.latencia_envio) for i in range(args.servidores)]
+    bot._connection.user = guilds[0].me
+    estado = bot._connection
+
+    # Lo que hace login() antes de conectar: fijar el loop del cliente y arrancar los servicios
+    await bot._async_setup_hook()
+    await bot.setup_hook()
+    session_snapshot.restaurado = True
+    inicio_build = time.perf_counter()
+    for guild in guilds:
+        player_pools.build(guild)
+    build_s = time.perf_counter() - inicio_build
+
+    canales = [canal for guild in guilds for canal in guild.channels]
+    for canal in canales:
+        moderador = canal.guild.members[0]
+        await bot_module.on_message(SimMessage(moderador, canal, "!start", estado))
+
+    mezcla = parse_mezcla(args.mezcla)
+    tipos, pesos = list(mezcla), list(mezcla.values())
+    pendientes = set()
+
+    def generar() -> SimMessage:
+        canal = rng.choice(canales)
+        tipo = rng.choices(tipos, pesos)[0]
+        sesion = sessions.get(canal.guild.id, canal.id)
+        if tipo == "respuesta" and sesion and sesion.current_player and sesion.current_answers:
+            acierto = rng.random() < args.aciertos
+            texto = sesion.current_answers.traduccion if acierto else rng.choice(CHARLA)
+            autor = canal.guild.get_member(sesion.current_player.id)
+        elif tipo in COMANDOS:
+            autor = canal.guild.members[0] if tipo in MODERADORES else rng.choice(canal.guild.members[:-1])
+            texto = COMANDOS[tipo]
+        else:
+            tipo = "chat"
+            autor = rng.choice(canal.guild.members[:-1])
+            texto = rng.choice(CHARLA)
+        stats.tipos[tipo] += 1
+        return SimMessage(autor, canal, texto, estado)
+
+    async def atender(mensaje: SimMessage, llegada: float):
+        try:
+            await bot_module.on_message(mensaje)
+        except Exception as e:
+            stats.errores += 1
+            stats.tipos_error[type(e).__name__] += 1
+        stats.latencias.append(time.perf_counter() - llegada)
+
+    async def rondas():
+        # Rondas forzadas cada --intervalo-ronda (GAME_INTERVAL real es de hora y media)
+        while True:
+            await asyncio.sleep(args.intervalo_ronda)
+            for sesion in list(sessions):
+                if sesion.is_game_active:
+                    tarea = asyncio.create_task(sesion.start_new_round())
+                    pendientes.add(tarea)
+                    tarea.add_done_callback(pendientes.discard)
+
+    monitor = asyncio.create_task(_monitor_lag(stats))
+    tarea_rondas = asyncio.create_task(rondas())
+    loop = asyncio.get_running_loop()
+    total = int(args.mensajes * args.duracion)
+    inicio = loop.time()
+    inicio_reloj = time.perf_counter()
+
+    # Llegadas en bucle abierto: si el bot se retrasa, los mensajes no esperan a que termine
+    for i in range(total):
+        objetivo = inicio + i / args.mensajes
+        retraso = objetivo - loop.time()
+        if retraso > 0:
+            await asyncio.sleep(retraso)
+        tarea = asyncio.create_task(atender(generar(), time.perf_counter()))
+        pendientes.add(tarea)
+        tarea.add_done_callback(pendientes.discard)
+
+    await asyncio.gather(*list(pendientes), return_exceptions=True)
+    duracion = time.perf_counter() - inicio_reloj
+    monitor.cancel()
+    tarea_rondas.cancel()
+
+    sesiones_activas = sessions.active_count()
+    for sesion in list(sessions):
+        sesion.cancel_tasks()
+    await bot.close()
+    await api.stop()
+
+    latencias_ms = [x * 1000 for x in stats.latencias]
+    lag_ms = [x * 1000 for x in stats.lag]
+    return {
+        "configuracion": {
+            "servidores": args.servidores,
+            "miembros": args.miembros,
+            "canales": args.canales,
+            "mensajes_por_segundo": args.mensajes,
+            "duracion": args.duracion,
+            "mezcla": mezcla,
+            "latencia_envio": args.latencia_envio,
+            "latencia_api": args.latencia_api,
+            "fallos_api": args.fallos_api
+        },
+        "construccion_pools_s": build_s,
+        "mensajes": len(stats.latencias),
+        "tipos": dict(stats.tipos),
+        "errores": stats.errores,
+        "tipos_error": dict(stats.tipos_error),
+        "rendimiento_msg_s": len(stats.latencias) / duracion if duracion else 0.0,
+        "latencia_ms": {
+            "media": statistics.fmean(latencias_ms) if latencias_ms else 0.0,
+            "p50": _percentil(latencias_ms, 0.50),
+            "p95": _percentil(latencias_ms, 0.95),
+            "p99": _percentil(latencias_ms, 0.99),
+            "max": max(latencias_ms, default=0.0)
+        },
+        "lag_loop_ms": {
+            "media": statistics.fmean(lag_ms) if lag_ms else 0.0,
+            "p99": _percentil(lag_ms, 0.99),
+            "max": max(lag_ms, default=0.0)
+        },
+        "envios": stats.envios,
+        "envios_s": stats.envios / duracion if duracion else 0.0,
+        "envios_s_pico": max(stats.envios_por_segundo.values(), default=0),
+        "sesiones_activas": sesiones_activas,
+        "api": api.stats(),
+        "resiliencia": resilient_api.stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador de carga del bot con objetos de discord falsos")
+    parser.add_argument("--servidores", type=int, default=1)
+    parser.add_argument("--miembros", type=int, default=40_000, help="miembros por servidor")
+    parser.add_argument("--canales", type=int, default=1, help="canales con partida por servidor")
+    parser.add_argument("--mensajes", type=float, default=200, help="mensajes por segundo en total")
+    parser.add_argument("--duracion", type=float, default=20, help="segundos de tráfico")
+    parser.add_argument("--mezcla", default=MEZCLA_POR_DEFECTO,
+                        help="pesos por tipo: chat, respuesta y " + ", ".join(COMANDOS))
+    parser.add_argument("--aciertos", type=float, default=0.3, help="fracción de respuestas correctas")
+    parser.add_argument("--intervalo-ronda", type=float, default=5, help="segundos entre rondas forzadas")
+    parser.add_argument("--latencia-envio", type=float, default=0.05, help="latencia simulada de channel.send")
+    parser.add_argument("--latencia-api", type=float, default=0.02)
+    parser.add_argument("--fallos-api", type=float, default=0.0)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--salida", help="guardar el informe en este JSON")
+    args = parser.parse_args()
+
+    salida = Path(args.salida).resolve() if args.salida else None
+    informe = asyncio.run(simular(args))
+
+    lat, lag = informe["latencia_ms"], informe["lag_loop_ms"]
+    print(f"Mensajes: {informe['mensajes']} ({informe['errores']} con error) - {dict(informe['tipos'])}")
+    if informe["tipos_error"]:
+        print(f"Errores: {informe['tipos_error']}")
+    print(f"Rendimiento: {informe['rendimiento_msg_s']:,.0f} msg/s")
+    print(f"Latencia por mensaje: media {lat['media']:.2f} ms, p50 {lat['p50']:.2f}, "
+          f"p95 {lat['p95']:.2f}, p99 {lat['p99']:.2f}, máx {lat['max']:.2f}")
+    print(f"Lag del event loop: media {lag['media']:.2f} ms, p99 {lag['p99']:.2f}, máx {lag['max']:.2f}")
+    print(f"Envíos: {informe['envios']} ({informe['envios_s']:.1f}/s, pico {informe['envios_s_pico']}/s)")
+    print(f"Pools construidos en {informe['construccion_pools_s'] * 1000:.0f} ms")
+
+    if salida:
+        with open(salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"Informe guardado en {salida}")
+
+
+if __name__ == "__main__":
+    main()
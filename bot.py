@@ -2,9 +2,34 @@ import discord
 from discord.ext import commands
 import asyncio
 import os
-from config import TOKEN, GUILD_ID, CHANNEL_ID
-from game_manager import GameManager
+import time
+from typing import Optional, Tuple
+from config import TOKEN, GUILD_ID, CHANNEL_ID, CLUSTER_ID, CLUSTER_SHARD_COUNT, CLUSTER_SHARD_IDS
+from game_manager import GameManager, word_prefetcher, load_guild_config, save_guild_config, send_leaderboard
+from sessions import sessions
+from api_client import api_client
+from api_resilience import resilient_api
+from translation_cache import translation_cache
+from word_corpus import word_corpus
+from word_stats import word_stats
+from word_selection import SelectionProfile, perfil_por_defecto
+from score_store import score_store
+from leaderboard import scoreboard
+from leaderboard_view import leaderboard_pages
+from round_stats import round_stats
+from player_pool import player_pools
+from scheduler import scheduler
+from outbound import outbound, PRIORIDAD_RONDA
+from session_snapshot import session_snapshot
+from shared_state import shared_backend
+from logging_config import setup_logging, shutdown_logging
 import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Para medir el tiempo desde el arranque del proceso hasta tener las partidas reanudadas
+ARRANQUE = time.perf_counter()
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -12,84 +37,222 @@ intents.members = True
 intents.guilds = True
 intents.guild_messages = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
-game_manager = GameManager()
+class TranslationBot(commands.AutoShardedBot):
+    async def setup_hook(self):
+        # Empezar a sincronizar el corpus y precargar palabras antes de conectar al gateway
+        score_store.start()
+        scheduler.start()
+        session_snapshot.start()
+        round_stats.start()
+        word_corpus.start()
+        word_prefetcher.start()
+    
+    async def close(self):
+        await word_prefetcher.stop()
+        # Última instantánea con los temporizadores aún programados
+        await session_snapshot.stop()
+        await round_stats.stop()
+        await scheduler.stop()
+        await word_stats.stop()
+        await word_corpus.stop()
+        word_corpus.close()
+        # Volcar las puntuaciones pendientes antes de salir
+        await score_store.close()
+        if shared_backend:
+            shared_backend.close()
+        # Cerrar el pool de conexiones de la API antes de desconectar
+        await api_client.close()
+        translation_cache.save()
+        await super().close()
+
+# Sin clúster, discord.py decide cuántos shards usar y los lleva todos este proceso
+bot = TranslationBot(command_prefix='!', intents=intents,
+                     shard_count=CLUSTER_SHARD_COUNT, shard_ids=CLUSTER_SHARD_IDS)
 
 @bot.event
 async def on_ready():
-    print(f'🤖 {bot.user} se ha conectado a Discord!')
-    print(f'📊 Servidores conectados: {len(bot.guilds)}')
+    logger.info('🤖 %s se ha conectado a Discord!', bot.user)
+    logger.info('📊 Servidores conectados: %s', len(bot.guilds))
     
     for guild in bot.guilds:
-        print(f'🏠 Servidor: {guild.name} (ID: {guild.id})')
-        print(f'   👥 Miembros: {guild.member_count}')
-        print(f'   📝 Canales: {len(guild.channels)}')
+        logger.info('🏠 Servidor: %s (ID: %s) - 👥 %s miembros, 📝 %s canales',
+                    guild.name, guild.id, guild.member_count, len(guild.channels))
+        player_pools.build(guild)
+    
+    # Las puntuaciones antiguas no tenían servidor: se asignan si no hay ambigüedad
+    # (en el clúster, solo el proceso que tiene ese servidor)
+    guild_legado = GUILD_ID or (bot.guilds[0].id if len(bot.guilds) == 1 and CLUSTER_ID is None else None)
+    if guild_legado and bot.get_guild(guild_legado):
+        migradas = scoreboard.migrate_legacy(guild_legado)
+        if migradas:
+            logger.info('💾 %s puntuaciones antiguas asignadas al servidor %s', migradas, guild_legado)
+    
+    # Reanudar las partidas que había en curso antes del reinicio (solo en el primer on_ready)
+    if not session_snapshot.restaurado:
+        session_snapshot.restore(bot)
+        session_snapshot.arranque_s = time.perf_counter() - ARRANQUE
+        logger.info('⏱️ Listo %.2f s después del arranque', session_snapshot.arranque_s)
     
     await bot.change_presence(
         activity=discord.Game(name="!ayuda para comandos")
     )
 
+@bot.event
+async def on_guild_join(guild):
+    player_pools.build(guild)
+
+@bot.event
+async def on_guild_remove(guild):
+    player_pools.forget(guild.id)
+    sessions.drop_guild(guild.id)
+
+@bot.event
+async def on_member_join(member):
+    player_pools.on_member_join(member)
+
+@bot.event
+async def on_member_remove(member):
+    player_pools.on_member_remove(member)
+
+@bot.event
+async def on_member_update(before, after):
+    player_pools.on_member_update(before, after)
+    leaderboard_pages.on_member_update(before, after)
+
 @bot.event
 async def on_message(message):
     if message.author == bot.user:
         return
     
+    if message.guild:
+        player_pools.mark_active(message.guild.id, message.author.id)
+    
     if message.content.startswith('!'):
         await bot.process_commands(message)
         return
     
-    if game_manager.is_game_active:
-        await game_manager.handle_translation_attempt(message)
+    # Una búsqueda en diccionario: si el canal no tiene partida activa no se hace nada más.
+    # El intento solo se encola; la verificación la hace el worker de la sesión
+    game_manager = sessions.get_for_message(message)
+    if game_manager:
+        game_manager.intake.submit(message)
 
 @bot.command(name='start')
+@commands.guild_only()
 @commands.has_permissions(manage_messages=True)
 async def start_game(ctx):
+    game_manager = sessions.get_or_create(ctx.channel, ctx.guild)
     if game_manager.is_game_active:
         await ctx.send("❌ El juego ya está activo. Usa `!detener` para pararlo primero.")
         return
     
     await ctx.send("🎮 Iniciando el juego de traducción...")
     
-    game_manager.game_task = asyncio.create_task(
-        game_manager.start_game_loop(ctx.channel, ctx.guild)
-    )
+    await game_manager.start_game(ctx.channel, ctx.guild)
 
 @bot.command(name='stop')
 @commands.has_permissions(manage_messages=True)
 async def stop_game(ctx):
-    if not game_manager.is_game_active:
+    game_manager = sessions.get(ctx.guild and ctx.guild.id, ctx.channel.id)
+    if not game_manager or not game_manager.is_game_active:
         await ctx.send("❌ El juego no está activo.")
         return
     
     await game_manager.stop_game()
+    sessions.remove(ctx.guild.id, ctx.channel.id)
 
 @bot.command(name='score')
 async def show_score(ctx):
-    user_id = str(ctx.author.id)
-    score = game_manager.scores.get(user_id, 0)
+    guild_id = ctx.guild.id if ctx.guild else 0
+    score = scoreboard.get(guild_id, ctx.author.id)
+    rank = scoreboard.rank(guild_id, ctx.author.id)
     
     embed = discord.Embed(
         title="📊 Tu Puntuación",
         description=f"**Usuario:** {ctx.author.display_name}\n"
-                   f"**Puntos:** {score}",
+                   f"**Puntos:** {score}\n"
+                   f"**Posición:** {f'#{rank}' if rank else 'Sin clasificar'}",
         color=0x00ff00
     )
     
+    cercanos = scoreboard.around(guild_id, ctx.author.id, radio=2)
+    if cercanos:
+        embed.add_field(
+            name="📍 Jugadores cercanos",
+            value="\n".join(
+                f"{'**' if uid == ctx.author.id else ''}#{pos} <@{uid}> - {puntos} puntos"
+                f"{'**' if uid == ctx.author.id else ''}"
+                for pos, uid, puntos in cercanos
+            ),
+            inline=False
+        )
+    
+    await ctx.send(embed=embed)
+
+@bot.command(name='rendimiento', aliases=['historial'])
+async def show_round_stats(ctx, *, objetivo: str = None):
+    """Aciertos, tiempos y rachas de un jugador (por defecto tú) o de una palabra"""
+    miembro = ctx.author
+    if objetivo:
+        try:
+            miembro = await commands.MemberConverter().convert(ctx, objetivo)
+        except commands.BadArgument:
+            miembro = None
+    
+    if miembro is None:
+        stats = round_stats.word(objetivo)
+        if stats is None:
+            await ctx.send(f"📈 La palabra `{objetivo}` aún no ha salido en ninguna ronda.")
+            return
+        embed = discord.Embed(
+            title=f"📈 Palabra: {objetivo.upper()}",
+            description=f"**Rondas:** {stats.rondas}\n"
+                       f"**Acertada:** {stats.aciertos} veces ({stats.precision:.0%})\n"
+                       f"**Respuestas fallidas:** {stats.fallos}\n"
+                       f"**Tiempo medio hasta acertar:** "
+                       + (f"{stats.tiempo_medio:.1f} s" if stats.aciertos else "—"),
+            color=0x9b59b6
+        )
+        await ctx.send(embed=embed)
+        return
+    
+    stats = round_stats.user(miembro.id)
+    if stats is None:
+        await ctx.send(f"📈 {miembro.display_name} aún no ha jugado ninguna ronda.")
+        return
+    embed = discord.Embed(
+        title=f"📈 Rendimiento de {miembro.display_name}",
+        description=f"**Rondas:** {stats.rondas}\n"
+                   f"**Aciertos:** {stats.aciertos} ({stats.precision:.0%}) | **Tiempo agotado:** {stats.agotadas}\n"
+                   f"**Respuestas fallidas:** {stats.fallos}\n"
+                   f"**Tiempo medio:** " + (f"{stats.tiempo_medio:.1f} s" if stats.aciertos else "—")
+                   + " | **Mejor:** " + (f"{stats.mejor_tiempo:.1f} s" if stats.mejor_tiempo else "—") + "\n"
+                   f"**Racha:** {stats.racha} (máxima {stats.racha_max})",
+        color=0x9b59b6
+    )
+    if stats.por_tipo:
+        embed.add_field(
+            name="🎯 Por tipo de palabra",
+            value="\n".join(f"**{tipo.capitalize()}:** {aciertos}/{rondas} ({aciertos / rondas:.0%})"
+                             for tipo, (rondas, aciertos) in stats.por_tipo.items()),
+            inline=False
+        )
     await ctx.send(embed=embed)
 
 @bot.command(name='table')
-async def show_leaderboard(ctx):
-    await game_manager.show_leaderboard()
+@commands.guild_only()
+async def show_leaderboard(ctx, pagina: int = 1):
+    await send_leaderboard(ctx.channel, ctx.guild, max(1, pagina))
 
 @bot.command(name='word')
 @commands.has_permissions(manage_messages=True)
 async def force_new_word(ctx):
-    if not game_manager.is_game_active:
+    game_manager = sessions.get(ctx.guild and ctx.guild.id, ctx.channel.id)
+    if not game_manager or not game_manager.is_game_active:
         await ctx.send("❌ El juego no está activo. Usa `!iniciar` primero.")
         return
     
-    if game_manager.round_task and not game_manager.round_task.done():
-        game_manager.round_task.cancel()
+    game_manager.cancel_deadline()
     
     await ctx.send("🔄 Forzando nueva palabra...")
     await game_manager.start_new_round()
@@ -97,7 +260,8 @@ async def force_new_word(ctx):
 @bot.command(name='select')
 @commands.has_permissions(manage_messages=True)
 async def select_player(ctx, member: discord.Member):
-    if not game_manager.is_game_active:
+    game_manager = sessions.get(ctx.guild and ctx.guild.id, ctx.channel.id)
+    if not game_manager or not game_manager.is_game_active:
         await ctx.send("❌ El juego no está activo. Usa `!iniciar` primero.")
         return
     
@@ -105,12 +269,11 @@ async def select_player(ctx, member: discord.Member):
         await ctx.send("❌ No puedes seleccionar un bot. Selecciona un usuario humano.")
         return
     
-    if game_manager.round_task and not game_manager.round_task.done():
-        game_manager.round_task.cancel()
+    game_manager.cancel_deadline()
     
-    word = game_manager.get_random_word()
-    game_manager.current_word = word
-    game_manager.current_player = member
+    item = await game_manager.draw_word()
+    word = item.palabra
+    await game_manager.set_round(word, member, item.answers, item.tipo)
     
     embed = discord.Embed(
         title="🎯 Jugador Seleccionado",
@@ -122,9 +285,23 @@ async def select_player(ctx, member: discord.Member):
     )
     embed.set_footer(text="Responde con la traducción en español")
     
-    await ctx.send(embed=embed)
+    outbound.send(ctx.channel, embed=embed, prioridad=PRIORIDAD_RONDA)
     
-    game_manager.round_task = asyncio.create_task(game_manager.wait_and_check())
+    game_manager.schedule_deadline()
+
+@bot.command(name='join', aliases=['jugar'])
+@commands.guild_only()
+async def join_game(ctx):
+    """Apuntarse como voluntario para ser seleccionado"""
+    player_pools.set_opt_in(ctx.author, True)
+    await ctx.send(f"✅ {ctx.author.display_name}, ahora puedes ser seleccionado para traducir.")
+
+@bot.command(name='leave', aliases=['salir'])
+@commands.guild_only()
+async def leave_game(ctx):
+    """Dejar de ser voluntario y no ser elegido para traducir"""
+    player_pools.set_opt_in(ctx.author, False)
+    await ctx.send(f"👋 {ctx.author.display_name}, ya no estás en la lista de voluntarios y no se te elegirá para traducir.")
 
 @bot.command(name='ayuda')
 async def help_command(ctx):
@@ -141,16 +318,20 @@ async def help_command(ctx):
               "`!palabra` - Forzar nueva palabra inmediatamente\n"
               "`!seleccionar @usuario` - Seleccionar jugador manualmente\n"
               "`!reiniciar` - Reiniciar puntuaciones\n"
-              "`!tipo [tipo]` - Configurar tipo de palabras",
+              "`!tipo [tipo]` - Configurar tipo de palabras\n"
+              "`!pesos [tipos|normal|mixto] clave=peso...` - Pesos de tipos y categorías del servidor\n"
+              "`!metricas` - Ver métricas internas del bot",
         inline=False
     )
     
     embed.add_field(
         name="👤 Comandos de Usuario",
         value="`!puntuacion` - Ver tu puntuación\n"
-              "`!tabla` - Ver tabla de puntuaciones\n"
+              "`!tabla [página]` - Ver tabla de puntuaciones\n"
               "`!estado` - Ver estado del juego\n"
               "`!estadisticas` - Ver estadísticas de palabras\n"
+              "`!rendimiento [@usuario|palabra]` - Aciertos, tiempos y rachas de un jugador o una palabra\n"
+              "`!jugar` / `!salir` - Apuntarte como voluntario o pedir que no te elijan\n"
               "`!ayuda` - Mostrar esta ayuda",
         inline=False
     )
@@ -179,7 +360,8 @@ async def help_command(ctx):
 
 @bot.command(name='status')
 async def game_status(ctx):
-    if game_manager.is_game_active:
+    game_manager = sessions.get(ctx.guild and ctx.guild.id, ctx.channel.id)
+    if game_manager and game_manager.is_game_active:
         status = "🟢 Activo"
         if game_manager.current_word and game_manager.current_player:
             status += f"\n🎯 Palabra actual: {game_manager.current_word.upper()}"
@@ -190,37 +372,43 @@ async def game_status(ctx):
     embed = discord.Embed(
         title="📊 Estado del Juego",
         description=f"**Estado:** {status}",
-        color=0x00ff00 if game_manager.is_game_active else 0xff0000
+        color=0x00ff00 if game_manager and game_manager.is_game_active else 0xff0000
     )
     
     await ctx.send(embed=embed)
 
 @bot.command(name='reset')
+@commands.guild_only()
 @commands.has_permissions(manage_messages=True)
 async def reset_scores(ctx):
-    game_manager.scores = {}
-    game_manager.save_scores()
+    scoreboard.reset(ctx.guild.id)
     
     embed = discord.Embed(
         title="🔄 Puntuaciones Reiniciadas",
-        description="Todas las puntuaciones han sido eliminadas.",
+        description="Todas las puntuaciones de este servidor han sido eliminadas.",
         color=0xffa500
     )
     
     await ctx.send(embed=embed)
 
+def _config_canal(ctx) -> Tuple[Optional[GameManager], str, SelectionProfile]:
+    """Partida del canal (si la hay) con su tipo y pesos; sin partida, lo guardado para el servidor"""
+    game_manager = sessions.get(ctx.guild.id, ctx.channel.id)
+    if game_manager:
+        return game_manager, game_manager.tipo_palabras, game_manager.perfil
+    return (None, *load_guild_config(ctx.guild.id))
+
 @bot.command(name='tipo')
+@commands.guild_only()
 @commands.has_permissions(manage_messages=True)
 async def cambiar_tipo_palabras(ctx, tipo: str = None):
-    """Cambiar el tipo de palabras que usa el bot"""
-    global game_manager
+    """Cambiar el tipo de palabras de la partida de este canal"""
+    game_manager, tipo_actual, perfil = _config_canal(ctx)
     
     tipos_validos = ["normal", "warframe", "mixto", "auto"]
     
     if not tipo:
         # Mostrar tipo actual y opciones
-        tipo_actual = getattr(game_manager, 'tipo_palabras', 'auto')
-        
         embed = discord.Embed(
             title="⚙️ Configuración de Tipos de Palabras",
             description=f"**Tipo actual:** `{tipo_actual.upper()}`\n\n"
@@ -235,10 +423,11 @@ async def cambiar_tipo_palabras(ctx, tipo: str = None):
         )
         
         if tipo_actual == "auto":
-            from config import PROBABILIDADES_AUTO
+            pesos = perfil.pesos_tipos
+            total = sum(pesos.values()) or 1
             probabilidades_texto = "\n".join([
-                f"• {k.capitalize()}: {v}%" 
-                for k, v in PROBABILIDADES_AUTO.items()
+                f"• {k.capitalize()}: {v * 100 / total:.0f}%" 
+                for k, v in pesos.items()
             ])
             embed.add_field(
                 name="🎲 Probabilidades en modo AUTO",
@@ -255,14 +444,14 @@ async def cambiar_tipo_palabras(ctx, tipo: str = None):
         await ctx.send(f"❌ Tipo inválido. Usa: `{', '.join(tipos_validos)}`")
         return
     
-    # Cambiar tipo en el game_manager
-    game_manager.tipo_palabras = tipo
+    # Cambiar tipo en la sesión del canal
+    if game_manager:
+        game_manager.tipo_palabras = tipo
     
-    # Guardar en archivo de configuración temporal (opcional)
+    # Guardar como tipo por defecto del servidor (opcional)
     try:
-        with open('bot_config.json', 'w') as f:
-            json.dump({'tipo_palabras': tipo}, f)
-    except:
+        save_guild_config(ctx.guild.id, tipo, perfil)
+    except Exception:
         pass  # Si no se puede guardar, no pasa nada
     
     # Descripción del tipo seleccionado
@@ -283,24 +472,71 @@ async def cambiar_tipo_palabras(ctx, tipo: str = None):
     
     await ctx.send(embed=embed)
 
+@bot.command(name='pesos')
+@commands.guild_only()
+@commands.has_permissions(manage_messages=True)
+async def configurar_pesos(ctx, grupo: str = None, *pares: str):
+    """Ver o cambiar los pesos de tipos (modo auto) y de categorías de este servidor"""
+    _, tipo_actual, perfil = _config_canal(ctx)
+    
+    if grupo is None:
+        embed = discord.Embed(
+            title="🎲 Pesos de Selección de Palabras",
+            description="**Uso:** `!pesos tipos normal=60 warframe=30 mixto=10`\n"
+                       "`!pesos normal animals=3 food=1` | `!pesos reset`",
+            color=0x9932cc
+        )
+        embed.add_field(
+            name="Tipos (modo AUTO)",
+            value=", ".join(f"{k}: {v:g}" for k, v in perfil.pesos_tipos.items()),
+            inline=False
+        )
+        for tipo, pesos in perfil.pesos_categorias.items():
+            embed.add_field(
+                name=f"Categorías de {tipo}",
+                value=", ".join(f"{k}: {v:g}" for k, v in pesos.items()),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+        return
+    
+    grupo = grupo.lower()
+    if grupo == "reset":
+        nuevo = perfil_por_defecto
+    else:
+        try:
+            pesos = {}
+            for par in pares:
+                clave, valor = par.split("=", 1)
+                pesos[clave.lower()] = float(valor)
+            if not pesos:
+                raise ValueError("indica al menos un `clave=peso`")
+            if grupo == "tipos":
+                nuevo = SelectionProfile(pesos, perfil.pesos_categorias)
+            else:
+                nuevo = SelectionProfile(perfil.pesos_tipos, {**perfil.pesos_categorias, grupo: pesos})
+        except ValueError as e:
+            await ctx.send(f"❌ Pesos inválidos: {e}")
+            return
+    
+    # Todas las partidas del servidor usan el nuevo perfil desde la próxima ronda
+    for sesion in sessions.for_guild(ctx.guild.id):
+        sesion.perfil = nuevo
+    try:
+        save_guild_config(ctx.guild.id, tipo_actual, nuevo)
+    except Exception:
+        pass
+    
+    await ctx.send("✅ Pesos actualizados. Se aplicarán en la próxima ronda.")
+
 @bot.command(name='estadisticas', aliases=['stats'])
 async def mostrar_estadisticas_api(ctx):
     """Mostrar estadísticas de la API de palabras"""
     try:
         from api_config import API_URL
-        import requests
-        
-        # Obtener estadísticas de cada tipo
-        tipos = ["normal", "warframe", "mixto"]
-        estadisticas = {}
         
-        for tipo in tipos:
-            try:
-                response = requests.get(f"{API_URL}/estadisticas?tipo={tipo}", timeout=5)
-                if response.status_code == 200:
-                    estadisticas[tipo] = response.json()["estadisticas"]
-            except:
-                estadisticas[tipo] = {"total": "Error"}
+        # Los tres tipos a la vez; casi siempre salen del corpus local o de la caché
+        estadisticas = await word_stats.get_many(["normal", "warframe", "mixto"])
         
         embed = discord.Embed(
             title="📊 Estadísticas de la Base de Datos",
@@ -309,14 +545,15 @@ async def mostrar_estadisticas_api(ctx):
         )
         
         for tipo, stats in estadisticas.items():
-            if isinstance(stats.get("total"), int):
-                categorias = stats.get("por_categoria", {})
-                categorias_texto = ", ".join([f"{k}: {v}" for k, v in categorias.items()])
+            if stats:
+                categorias_texto = ", ".join([f"{k}: {v}" for k, v in stats.por_categoria.items()])
+                origen = "📚 corpus local" if stats.origen == "corpus" else f"🕒 hace {int(stats.edad() // 60)} min"
                 
                 embed.add_field(
                     name=f"📝 {tipo.capitalize()}",
-                    value=f"**Total:** {stats['total']} palabras\n"
-                           f"**Categorías:** {categorias_texto}",
+                    value=f"**Total:** {stats.total} palabras\n"
+                           f"**Categorías:** {categorias_texto}\n"
+                           f"*{origen}*",
                     inline=False
                 )
             else:
@@ -332,6 +569,149 @@ async def mostrar_estadisticas_api(ctx):
     except Exception as e:
         await ctx.send(f"❌ Error obteniendo estadísticas: {e}")
 
+@bot.command(name='metricas', aliases=['metrics'])
+@commands.has_permissions(manage_messages=True)
+async def mostrar_metricas(ctx):
+    """Mostrar métricas internas (cachés, colas, temporizadores)"""
+    cache = translation_cache.stats()
+    prefetch = word_prefetcher.stats()
+    corpus_listo = ", ".join(
+        f"{tipo}: {word_corpus.count(tipo)}{' ✅' if word_corpus.is_ready(tipo) else ''}"
+        for tipo in ("normal", "warframe")
+    )
+    
+    embed = discord.Embed(
+        title="📈 Métricas del Bot",
+        color=0x607d8b
+    )
+    embed.add_field(
+        name="🗂️ Caché de traducciones",
+        value=f"**Entradas:** {cache['entradas']}\n"
+              f"**Aciertos:** {cache['hits']} | **Fallos:** {cache['misses']}\n"
+              f"**Tasa de acierto:** {cache['hit_rate']:.0%}\n"
+              f"**Expulsiones:** {cache['expulsiones']}",
+        inline=False
+    )
+    embed.add_field(
+        name="📦 Precarga de palabras",
+        value="**Profundidad:** " + ", ".join(f"{tipo}: {n}" for tipo, n in prefetch['profundidad'].items()) + "\n"
+              f"**Aciertos:** {prefetch['hits']} | **Vacíos:** {prefetch['misses']}\n"
+              f"**Recargas:** {prefetch['recargas']} ({prefetch['fallos_recarga']} fallidas) "
+              f"| **Descartadas por recientes:** {prefetch['descartadas']}\n"
+              f"**Latencia de recarga:** {prefetch['latencia_media'] * 1000:.0f} ms media, "
+              f"{prefetch['ultima_latencia'] * 1000:.0f} ms última",
+        inline=False
+    )
+    embed.add_field(
+        name="🎮 Sesiones",
+        value=f"**Activas:** {sessions.active_count()} de {len(sessions)}",
+        inline=False
+    )
+    shards = ", ".join(f"{shard_id}: {latencia * 1000:.0f} ms" for shard_id, latencia in sorted(bot.latencies))
+    embed.add_field(
+        name="🧩 Clúster",
+        value=f"**Proceso:** {CLUSTER_ID if CLUSTER_ID is not None else 'único'} | "
+              f"**Shards:** {bot.shard_count or 1} en total\n"
+              f"**Latencia por shard:** {shards or 'sin conectar'}\n"
+              f"**Estado compartido:** {type(shared_backend).__name__ if shared_backend else 'archivos locales'}",
+        inline=False
+    )
+    jugadores = player_pools.stats()
+    embed.add_field(
+        name="👥 Jugadores",
+        value=f"**Elegibles:** {jugadores['elegibles']} en {jugadores['servidores']} servidores | "
+              f"**Activos:** {jugadores['activos']}\n"
+              f"**Enfriándose:** {jugadores['enfriando']} | **Excluidos:** {jugadores['excluidos']} | "
+              f"**Elecciones:** {jugadores['elecciones']}",
+        inline=False
+    )
+    salida = outbound.stats()
+    embed.add_field(
+        name="📤 Mensajes salientes",
+        value=f"**En cola:** {salida['profundidad']} en {salida['canales']} canales\n"
+              f"**Envíos:** {salida['envios']} ({salida['combinados']} mensajes combinados)\n"
+              f"**Latencia de envío:** {salida['latencia_media'] * 1000:.0f} ms media, "
+              f"{salida['latencia_maxima'] * 1000:.0f} ms máxima\n"
+              f"**429 recibidos:** {salida['limitados']} | **Errores:** {salida['errores']}",
+        inline=False
+    )
+    tabla = leaderboard_pages.stats()
+    embed.add_field(
+        name="🏆 Tabla de puntuaciones",
+        value=f"**Páginas en caché:** {tabla['paginas']} | **Hit rate:** {tabla['hit_rate']:.0%} "
+              f"({tabla['hits']} hits, {tabla['misses']} misses)\n"
+              f"**Invalidaciones:** {tabla['invalidaciones']} | **Nombres en caché:** {tabla['nombres']} "
+              f"| **Consultas de nombres:** {tabla['consultas_nombres']}",
+        inline=False
+    )
+    palabras = word_stats.stats()
+    embed.add_field(
+        name="📊 Estadísticas de palabras",
+        value=f"**Del corpus:** {palabras['locales']} | **De caché:** {palabras['frescos']} "
+              f"({palabras['viejos']} refrescando) | **Esperando a la API:** {palabras['esperas']}\n"
+              f"**Refrescos:** {palabras['refrescos']} | **Errores:** {palabras['errores']}",
+        inline=False
+    )
+    rondas = round_stats.stats()
+    embed.add_field(
+        name="📈 Estadísticas de rondas",
+        value=f"**Jugadores:** {rondas['usuarios']} | **Palabras:** {rondas['palabras']} | "
+              f"**Memoria:** {rondas['bytes'] / 1024:.0f} KiB\n"
+              f"**Eventos:** {rondas['eventos']} ({rondas['pendientes']} por escribir) | "
+              f"**Checkpoints:** {rondas['checkpoints']}\n"
+              f"**Carga:** {rondas['carga_ms']:.1f} ms ({rondas['reaplicados']} eventos reaplicados)",
+        inline=False
+    )
+    entrada = sessions.intake_stats()
+    embed.add_field(
+        name="📥 Respuestas",
+        value=f"**En cola:** {entrada['profundidad']} | **Verificadas:** {entrada['procesados']}\n"
+              f"**Repetidas:** {entrada['coalescidos']} | **De rondas terminadas:** {entrada['obsoletos']} | "
+              f"**Descartadas por ráfaga:** {entrada['descartados']}\n"
+              f"**Espera media en cola:** {entrada['espera_media'] * 1000:.1f} ms",
+        inline=False
+    )
+    api = resilient_api.stats()
+    circuitos = "\n".join(
+        f"`{endpoint}`: {'🟢' if c['estado'] == 'cerrado' else '🟡' if c['estado'] == 'semiabierto' else '🔴'} "
+        f"{c['estado']} ({c['aperturas']} aperturas, {c['rechazos']} rechazadas)"
+        for endpoint, c in api['circuitos'].items()
+    ) or "Sin llamadas aún"
+    fallbacks = ", ".join(f"{op}: {n}" for op, n in api['fallbacks'].items()) or "ninguno"
+    embed.add_field(
+        name="🛡️ API",
+        value=f"{circuitos}\n"
+              f"**Reintentos:** {api['reintentos']} | **Duplicadas:** {api['hedges']} ({api['hedges_ganados']} ganadas)\n"
+              f"**Presupuestos agotados:** {api['presupuestos_agotados']}\n"
+              f"**Datos locales usados:** {fallbacks}",
+        inline=False
+    )
+    instantaneas = session_snapshot.stats()
+    embed.add_field(
+        name="💾 Instantáneas de sesiones",
+        value=f"**Guardadas:** {instantaneas['guardadas']} | **Escrituras:** {instantaneas['escrituras']}\n"
+              f"**Reanudadas al arrancar:** {instantaneas['restauradas']} "
+              f"({instantaneas['rondas_perdidas']} rondas perdidas) en {instantaneas['carga_ms']:.1f} ms\n"
+              f"**Arranque hasta listo:** "
+              + (f"{instantaneas['arranque_s']:.2f} s" if instantaneas['arranque_s'] is not None else "—"),
+        inline=False
+    )
+    temporizadores = scheduler.stats()
+    embed.add_field(
+        name="⏰ Temporizadores",
+        value=f"**Pendientes:** {temporizadores['pendientes']} | **En ejecución:** {temporizadores['en_ejecucion']}\n"
+              f"**Disparados:** {temporizadores['disparos']} | **Saltados:** {temporizadores['saltos']}\n"
+              f"**Retraso máximo:** {temporizadores['retraso_maximo'] * 1000:.0f} ms",
+        inline=False
+    )
+    embed.add_field(
+        name="📚 Corpus local",
+        value=f"**Palabras:** {corpus_listo}",
+        inline=False
+    )
+    
+    await ctx.send(embed=embed)
+
 @bot.event
 async def on_command_error(ctx, error):
     if isinstance(error, commands.MissingPermissions):
@@ -342,13 +722,18 @@ async def on_command_error(ctx, error):
         await ctx.send(f"❌ Error: {error}")
 
 def main():
-    if not TOKEN:
-        print("❌ Error: No se encontró el token de Discord.")
-        print("Por favor, crea un archivo .env con tu DISCORD_TOKEN")
-        return
-    
-    print("🚀 Iniciando bot de traducción...")
-    bot.run(TOKEN)
+    setup_logging()
+    try:
+        if not TOKEN:
+            logger.error("❌ Error: No se encontró el token de Discord.")
+            logger.error("Por favor, crea un archivo .env con tu DISCORD_TOKEN")
+            return
+        
+        logger.info("🚀 Iniciando bot de traducción...")
+        # log_handler=None: discord.py usa nuestro logging en vez de instalar el suyo
+        bot.run(TOKEN, log_handler=None)
+    finally:
+        shutdown_logging()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
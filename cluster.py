@@ -0,0 +1,162 @@
+# Modo clúster: varios procesos del bot, cada uno con un rango de shards de Discord
+#
+# Uso (desde la raíz del repositorio):
+#     python cluster.py --procesos 4                 # tantos shards como recomiende Discord
+#     python cluster.py --procesos 2 --shards 8
+#     CLUSTER_BACKEND=redis://localhost:6379/0 python cluster.py --procesos 4
+#
+# Cada proceso es un bot.py normal con CLUSTER_ID, CLUSTER_SHARD_IDS y
+# CLUSTER_SHARD_COUNT en el entorno. Un servidor pertenece siempre al shard
+# (guild_id >> 22) % shards, así que sus partidas y su tabla viven en un solo
+# proceso; puntuaciones y ajustes se guardan en el backend compartido.
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import CLUSTER_SHARD_COUNT, CLUSTER_SHARD_IDS, CLUSTER_RESTART_DELAY
+
+logger = logging.getLogger(__name__)
+
+BOT = Path(__file__).resolve().parent / "bot.py"
+BACKEND_POR_DEFECTO = "sqlite:///shared_state.db"
+
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """Shard al que Discord asigna un servidor"""
+    return (guild_id >> 22) % shard_count
+
+
+def owns_guild(guild_id: int) -> bool:
+    """El servidor es de este proceso (siempre cierto fuera del clúster)"""
+    if not CLUSTER_SHARD_COUNT or CLUSTER_SHARD_IDS is None:
+        return True
+    return shard_for(guild_id, CLUSTER_SHARD_COUNT) in CLUSTER_SHARD_IDS
+
+
+def repartir(shards: int, procesos: int) -> List[List[int]]:
+    """Rangos contiguos de shards, lo más parejos posible"""
+    base, resto = divmod(shards, procesos)
+    rangos, inicio = [], 0
+    for i in range(procesos):
+        fin = inicio + base + (1 if i < resto else 0)
+        if fin > inicio:
+            rangos.append(list(range(inicio, fin)))
+        inicio = fin
+    return rangos
+
+
+async def shards_recomendados(token: str) -> int:
+    import aiohttp
+    async with aiohttp.ClientSession() as sesion:
+        async with sesion.get("https://discord.com/api/v10/gateway/bot",
+                              headers={"Authorization": f"Bot {token}"}) as respuesta:
+            respuesta.raise_for_status()
+            return (await respuesta.json())["shards"]
+
+
+class Worker:
+    """Un proceso bot.py con sus shards; se relanza si se cae"""
+
+    def __init__(self, cluster_id: int, shards: List[int], entorno: Dict[str, str]):
+        self.cluster_id = cluster_id
+        self.shards = shards
+        self.entorno = dict(entorno, CLUSTER_ID=str(cluster_id), CLUSTER_SHARD_IDS=",".join(map(str, shards)))
+        self.proceso: Optional[asyncio.subprocess.Process] = None
+        self.reinicios = 0
+
+    async def run(self, parar: asyncio.Event):
+        loop = asyncio.get_running_loop()
+        espera = CLUSTER_RESTART_DELAY
+        while not parar.is_set():
+            inicio = loop.time()
+            self.proceso = await asyncio.create_subprocess_exec(sys.executable, str(BOT), env=self.entorno)
+            logger.info("🚀 Proceso %s arrancado (pid %s, shards %s)", self.cluster_id, self.proceso.pid, self.shards)
+            codigo = await self.proceso.wait()
+            if parar.is_set():
+                break
+            if codigo == 0:
+                # Salida limpia (sin token, cerrado a propósito...): relanzarlo no arreglaría nada
+                logger.warning("⚠️ Proceso %s terminó sin error; no se relanza", self.cluster_id)
+                break
+
+            # Un proceso que aguantó un rato vuelve a la espera mínima
+            if loop.time() - inicio > 300:
+                espera = CLUSTER_RESTART_DELAY
+            self.reinicios += 1
+            logger.warning("⚠️ Proceso %s terminó con código %s; se relanza en %s s", self.cluster_id, codigo, espera)
+            try:
+                await asyncio.wait_for(parar.wait(), espera)
+            except asyncio.TimeoutError:
+                pass
+            espera = min(60, espera * 2)
+
+    def terminate(self):
+        if self.proceso and self.proceso.returncode is None:
+            self.proceso.terminate()
+
+    def kill(self):
+        if self.proceso and self.proceso.returncode is None:
+            self.proceso.kill()
+
+
+async def supervisar(args) -> int:
+    from config import TOKEN
+
+    if os.getenv("SCORE_BACKEND", "shared") != "shared":
+        logger.error("❌ En modo clúster las puntuaciones tienen que ir al backend compartido (SCORE_BACKEND=shared)")
+        return 1
+    shards = args.shards or CLUSTER_SHARD_COUNT
+    if not shards:
+        if not TOKEN:
+            logger.error("❌ Sin DISCORD_TOKEN no se puede preguntar a Discord cuántos shards usar; indica --shards")
+            return 1
+        shards = await shards_recomendados(TOKEN)
+
+    entorno = dict(os.environ, CLUSTER_SHARD_COUNT=str(shards), SCORE_BACKEND="shared",
+                   CLUSTER_BACKEND=os.getenv("CLUSTER_BACKEND") or args.backend)
+    workers = [Worker(i, rango, entorno) for i, rango in enumerate(repartir(shards, args.procesos))]
+    logger.info("🧩 Clúster: %s shards en %s procesos, estado en %s", shards, len(workers), entorno["CLUSTER_BACKEND"])
+
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(senal, parar.set)
+
+    tareas = [asyncio.create_task(worker.run(parar)) for worker in workers]
+    await parar.wait()
+    logger.info("🛑 Deteniendo %s procesos...", len(workers))
+    for worker in workers:
+        worker.terminate()
+    # Cada bot vuelca sus puntuaciones al cerrar; si alguno se cuelga, se mata
+    _, pendientes = await asyncio.wait(tareas, timeout=30)
+    if pendientes:
+        for worker in workers:
+            worker.kill()
+        await asyncio.wait(pendientes)
+    return 0
+
+
+def main():
+    from logging_config import setup_logging, shutdown_logging
+
+    parser = argparse.ArgumentParser(description="Lanzar el bot en varios procesos con shards repartidos")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="procesos a lanzar")
+    parser.add_argument("--shards", type=int, help="shards totales (por defecto los que recomiende Discord)")
+    parser.add_argument("--backend", default=BACKEND_POR_DEFECTO,
+                        help="estado compartido si no hay CLUSTER_BACKEND: sqlite:///archivo.db o redis://host:puerto/db")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        sys.exit(asyncio.run(supervisar(args)))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
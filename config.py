@@ -9,6 +9,25 @@ TOKEN = os.getenv('DISCORD_TOKEN')
 GUILD_ID = None  # None para todos los servidores
 CHANNEL_ID = None  # None para cualquier canal
 
+# ====== CLÚSTER ======
+
+# cluster.py lanza varios procesos, cada uno con un rango de shards; sin estas
+# variables el bot es un solo proceso con todos los servidores
+CLUSTER_ID = os.getenv('CLUSTER_ID')                                      # Número de este proceso
+CLUSTER_SHARD_COUNT = int(os.getenv('CLUSTER_SHARD_COUNT', '0')) or None  # Shards de todo el bot
+CLUSTER_SHARD_IDS = [int(s) for s in os.getenv('CLUSTER_SHARD_IDS', '').split(',') if s.strip()] or None
+CLUSTER_BACKEND = os.getenv('CLUSTER_BACKEND')   # "sqlite:///shared_state.db" o "redis://localhost:6379/0"
+CLUSTER_RESTART_DELAY = 5                         # Segundos antes de relanzar un proceso caído (se duplica hasta 60)
+
+
+def _por_proceso(archivo: str) -> str:
+    """Archivo local de cada proceso del clúster: cache.json -> cache.2.json"""
+    if CLUSTER_ID is None:
+        return archivo
+    base, extension = os.path.splitext(archivo)
+    return f"{base}.{CLUSTER_ID}{extension}"
+
+
 # Configuración del juego
 GAME_INTERVAL = 5400  # 1.5 horas en segundos
 ROUND_DURATION = 120  # 2 minutos en segundos
@@ -57,4 +76,93 @@ CORRECT_TRANSLATIONS = {
     "bird": "pájaro",
     "house": "casa",
     "car": "coche"
-} 
\ No newline at end of file
+} 
+
+# ====== CACHÉ DE TRADUCCIONES ======
+
+TRANSLATION_CACHE_SIZE = 5000                        # Máximo de palabras en memoria
+TRANSLATION_CACHE_TTL = 24 * 3600                    # Segundos antes de volver a consultar la API
+TRANSLATION_CACHE_FILE = _por_proceso('translation_cache.json')    # None para no guardar en disco
+
+# ====== PRECARGA DE PALABRAS ======
+
+PREFETCH_SIZE = 5               # Palabras listas por tipo
+PREFETCH_LOW_WATERMARK = 2      # Se recarga al bajar de este número
+PREFETCH_RETRY_DELAY = 30       # Segundos de espera si la API falla al recargar
+
+# ====== CORPUS LOCAL DE PALABRAS ======
+
+CORPUS_FILE = 'word_corpus.db'     # Base de datos SQLite con palabras y traducciones
+CORPUS_SYNC_INTERVAL = 1800        # Segundos entre sincronizaciones con la API
+CORPUS_SYNC_BATCH = 50             # Peticiones de palabras por tipo en cada sincronización
+CORPUS_MIN_COBERTURA = 0.9         # Fracción del remoto necesaria para servir un tipo en local
+
+# ====== ALMACENAMIENTO DE PUNTUACIONES ======
+
+SCORE_BACKEND = os.getenv('SCORE_BACKEND', "journal")   # "journal" (scores.bin + diario), "sqlite" (WAL) o "shared" (CLUSTER_BACKEND)
+SCORES_FILE = 'scores.json'            # Formato antiguo: se importa si aún no hay scores.bin
+SCORES_BIN_FILE = 'scores.bin'         # Tablas binarias compactas (16 bytes por jugador)
+SCORES_JOURNAL_FILE = 'scores.journal'
+SCORES_DB_FILE = 'scores.db'
+SCORE_FLUSH_INTERVAL = 5               # Segundos entre escrituras agrupadas
+SCORE_COMPACT_THRESHOLD = 1000         # Líneas de diario antes de reescribir la instantánea
+
+# ====== SELECCIÓN DE JUGADORES ======
+
+# "todos": cualquier miembro humano, "activos": quien haya escrito hace poco,
+# "voluntarios": solo quien se apunte con !jugar (si no hay nadie, se usa "todos")
+PLAYER_POOL_MODE = "todos"
+PLAYER_ACTIVE_WINDOW = 7 * 24 * 3600   # Segundos que un miembro cuenta como activo
+PLAYER_OPTIN_FILE = 'player_optin.json'
+PLAYER_OPTOUT_FILE = 'player_optout.json'   # Quien usó !salir: no se le elige en ningún modo
+PLAYER_PESO_ACTIVO = 4                 # Quien ha escrito hace poco tiene este peso; el resto, 1
+# Enfriamiento tras jugar: (segundos desde que le tocó, factor de su peso); el último se mantiene
+PLAYER_ENFRIAMIENTO = ((0, 0.02), (2 * 3600, 0.2), (8 * 3600, 0.6), (24 * 3600, 1.0))
+
+# ====== LOGGING ======
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')     # DEBUG muestra el detalle de cada mensaje y temporizador
+LOG_JSON = os.getenv('LOG_JSON', '0') == '1'   # Una línea JSON por registro
+
+# ====== INSTANTÁNEAS DE SESIONES ======
+
+SESSION_SNAPSHOT_FILE = _por_proceso('sessions_snapshot.json')   # Partidas en curso para reanudarlas tras reiniciar
+SESSION_SNAPSHOT_INTERVAL = 10                     # Segundos entre instantáneas
+SESSION_SNAPSHOT_MAX_AGE = 6 * 3600                # Instantáneas más antiguas se descartan al arrancar
+
+# ====== ENTRADA DE RESPUESTAS ======
+
+INTAKE_QUEUE_SIZE = 20   # Intentos pendientes por sesión; con la cola llena se descartan los nuevos
+
+# ====== SALIDA DE MENSAJES ======
+
+OUTBOUND_CANAL_RAFAGA = 5          # Mensajes por canal permitidos en cada periodo (límite de Discord)
+OUTBOUND_CANAL_PERIODO = 5.0       # Segundos del periodo por canal
+OUTBOUND_GLOBAL_POR_SEGUNDO = 45   # Envíos por segundo para todo el bot (Discord corta en 50)
+OUTBOUND_ESPERA_429 = 1.0          # Pausa del canal si aun así Discord responde 429
+
+# ====== TABLA DE PUNTUACIONES ======
+
+LEADERBOARD_PAGE_SIZE = 10          # Jugadores por página de !table
+LEADERBOARD_CACHE_PAGES = 512       # Páginas ya renderizadas que se guardan (todas los servidores)
+LEADERBOARD_NAME_TTL = 3600         # Segundos que se recuerda el nombre visible de un jugador
+LEADERBOARD_NAME_CACHE = 10000      # Nombres visibles que se recuerdan como máximo (los menos usados salen antes)
+LEADERBOARD_VIEW_TIMEOUT = 300      # Segundos que funcionan los botones de una tabla
+
+# ====== ESTADÍSTICAS DE PALABRAS ======
+
+WORD_STATS_TTL = 600            # Segundos que las estadísticas de !estadisticas se sirven sin más
+WORD_STATS_STALE = 24 * 3600    # Pasado el TTL se siguen sirviendo mientras se refrescan en segundo plano
+
+# ====== SELECCIÓN DE PALABRAS ======
+
+WORD_NO_REPEAT_WINDOW = 50        # Palabras recientes que una partida no repite
+WORD_NO_REPEAT_BLOOM = 5000       # A partir de este tamaño de ventana se usa un filtro de Bloom
+WORD_NO_REPEAT_INTENTOS = 8       # Candidatas que se prueban antes de aceptar una repetida
+
+# ====== ESTADÍSTICAS DE RONDAS ======
+
+ROUND_EVENTS_FILE = _por_proceso('round_events.jsonl')   # Diario de solo-añadir con el resultado de cada ronda
+ROUND_STATS_FILE = _por_proceso('round_stats.bin')       # Agregados por jugador y palabra (checkpoint del diario)
+ROUND_STATS_FLUSH_INTERVAL = 5       # Segundos entre escrituras agrupadas del diario
+ROUND_STATS_CHECKPOINT = 1000        # Eventos entre checkpoints: al arrancar solo se reaplican los posteriores
@@ -0,0 +1,71 @@
+# Árbol de Fenwick (Binary Indexed Tree) para sumas prefijas en O(log n)
+from typing import Iterable, List, Tuple
+
+
+class FenwickTree:
+    """Sumas prefijas y búsqueda por suma acumulada en O(log n).
+
+    Sirve tanto para contar elementos (tamaños de bloques de la tabla de
+    puntuaciones) como para pesos reales (muestreo ponderado).
+    """
+
+    def __init__(self, valores: Iterable[float] = ()):
+        self._valores: List[float] = list(valores)
+        self._arbol: List[float] = [0] * (len(self._valores) + 1)
+        # Construcción en O(n)
+        for i, valor in enumerate(self._valores, 1):
+            self._arbol[i] += valor
+            padre = i + (i & -i)
+            if padre <= len(self._valores):
+                self._arbol[padre] += self._arbol[i]
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def __getitem__(self, i: int) -> float:
+        return self._valores[i]
+
+    def add(self, i: int, delta: float):
+        self._valores[i] += delta
+        i += 1
+        while i < len(self._arbol):
+            self._arbol[i] += delta
+            i += i & -i
+
+    def set(self, i: int, valor: float):
+        self.add(i, valor - self._valores[i])
+
+    def append(self, valor: float):
+        """Añadir una posición al final en O(log n)"""
+        n = len(self._valores) + 1
+        self._valores.append(0)
+        # El nodo n cubre (n - lowbit(n), n]: se rellena con la suma de ese rango
+        self._arbol.append(self.prefix_sum(n - 1) - self.prefix_sum(n - (n & -n)))
+        self.add(n - 1, valor)
+
+    def prefix_sum(self, i: int) -> float:
+        """Suma de las posiciones [0, i)"""
+        total = 0
+        while i > 0:
+            total += self._arbol[i]
+            i -= i & -i
+        return total
+
+    def total(self) -> float:
+        return self.prefix_sum(len(self._valores))
+
+    def find(self, objetivo: float) -> Tuple[int, float]:
+        """Primera posición cuya suma acumulada supera `objetivo`.
+
+        Devuelve (posición, resto), donde resto es lo que queda de `objetivo`
+        dentro de esa posición. Con conteos enteros es (bloque, índice en el bloque).
+        """
+        pos = 0
+        paso = 1 << (len(self._arbol).bit_length() - 1)
+        while paso:
+            siguiente = pos + paso
+            if siguiente < len(self._arbol) and self._arbol[siguiente] <= objetivo:
+                pos = siguiente
+                objetivo -= self._arbol[siguiente]
+            paso >>= 1
+        return pos, objetivo
@@ -1,352 +1,507 @@
 import asyncio
 import random
 import json
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
 import discord
-import requests
 from config import (
     ENGLISH_WORDS, CORRECT_TRANSLATIONS, GAME_INTERVAL, ROUND_DURATION, 
-    POINTS_CORRECT, POINTS_WRONG, PALABRA_TIPO, PROBABILIDADES_AUTO, 
-    CATEGORIAS_PREFERIDAS, COMANDOS_TIPO
+    POINTS_CORRECT, POINTS_WRONG, PALABRA_TIPO, WORD_NO_REPEAT_INTENTOS
 )
-from api_config import API_URL, USE_FALLBACK_APIS
+from api_config import API_PRESUPUESTO_RONDA, API_PRESUPUESTO_TRADUCCION
+from api_client import api_client, ApiError, ruta_traduccion
+from api_resilience import resilient_api
+from translation_cache import translation_cache, TranslationEntry
+from matching import AnswerMatcher, compile_answers, are_similar_words
+from word_prefetch import WordPrefetcher, PrefetchedWord
+from word_corpus import word_corpus
+from shared_state import guild_settings
+from word_selection import SelectionProfile, RecentWords, perfil_por_defecto
+from leaderboard import scoreboard
+from round_stats import round_stats
+from leaderboard_view import leaderboard_pages
+from player_pool import player_pools
+from scheduler import scheduler, Timer
+from answer_intake import AnswerIntake
+from outbound import outbound, PRIORIDAD_RONDA, PRIORIDAD_BAJA
 
-def get_random_word_from_api(tipo_forzado=None):
-    """Obtener palabra aleatoria de nuestra propia API según configuración"""
+logger = logging.getLogger(__name__)
+
+def elegir_tipo(tipo_actual: str, perfil: Optional[SelectionProfile] = None) -> str:
+    """Resolver el tipo "auto" a un tipo concreto según los pesos del perfil (PROBABILIDADES_AUTO por defecto)"""
+    return (perfil or perfil_por_defecto).tipo(tipo_actual)
+
+async def fetch_word_from_api(tipo_seleccionado, presupuesto=None, categoria=None):
+    """Pedir a la API una palabra de un tipo concreto (normal, warframe o mixto)"""
     try:
-        print(f"🎯 Obteniendo palabra de nuestra API: {API_URL}")
-        
-        # Determinar el tipo de palabra a usar
-        tipo_actual = tipo_forzado or PALABRA_TIPO
-        
-        if tipo_actual == "auto":
-            # Selección aleatoria basada en probabilidades
-            rand = random.randint(1, 100)
-            if rand <= PROBABILIDADES_AUTO["normal"]:
-                tipo_seleccionado = "normal"
-            elif rand <= PROBABILIDADES_AUTO["normal"] + PROBABILIDADES_AUTO["warframe"]:
-                tipo_seleccionado = "warframe"
-            else:
-                tipo_seleccionado = "mixto"
-        else:
-            tipo_seleccionado = tipo_actual
-        
-        print(f"📝 Tipo de palabra seleccionado: {tipo_seleccionado}")
-        
         # Seleccionar endpoint según el tipo
         if tipo_seleccionado == "normal":
-            endpoint = f"{API_URL}/palabra-normal"
-            categoria = random.choice(CATEGORIAS_PREFERIDAS["normal"])
+            endpoint = "/palabra-normal"
+            categoria = categoria or perfil_por_defecto.categoria("normal")
         elif tipo_seleccionado == "warframe":
-            endpoint = f"{API_URL}/palabra-warframe"
+            endpoint = "/palabra-warframe"
             categoria = None  # Warframe solo tiene una categoría
         else:  # mixto
-            endpoint = f"{API_URL}/palabra-mixta"
-            categoria = random.choice(CATEGORIAS_PREFERIDAS["mixto"])
-        
-        # Construir URL con parámetros
-        url = endpoint
-        if categoria:
-            url += f"?categoria={categoria}"
+            endpoint = "/palabra-mixta"
+            categoria = categoria or perfil_por_defecto.categoria("mixto")
         
-        print(f"🌐 Llamando a: {url}")
+        # Construir parámetros
+        params = {"categoria": categoria} if categoria else None
         
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            word = data["palabra"]
-            print(f"✅ Palabra obtenida: '{word}' (tipo: {tipo_seleccionado}, categoría: {data.get('categoria', 'N/A')})")
-            return word
-        else:
-            print(f"❌ Error HTTP obteniendo palabra: {response.status_code}")
+        logger.debug("🌐 Llamando a: %s %s", endpoint, params or '')
         
+        data = await resilient_api.get_json(endpoint, params=params, presupuesto=presupuesto)
+        word = data["palabra"]
+        logger.debug("✅ Palabra obtenida: '%s' (tipo: %s, categoría: %s)", word, tipo_seleccionado, data.get('categoria', 'N/A'))
+        return word
+    except ApiError as e:
+        logger.error("❌ Error HTTP obteniendo palabra: %s", e)
         return None
     except Exception as e:
-        print(f"❌ Error obteniendo palabra de nuestra API: {e}")
+        logger.error("❌ Error obteniendo palabra de nuestra API: %s", e)
         return None
 
-def translate_word_with_api(word, tipo="mixto"):
-    """Obtener traducción de nuestra propia API"""
+async def fetch_word(tipo_seleccionado, presupuesto=None, perfil: Optional[SelectionProfile] = None):
+    """Palabra de un tipo concreto: del corpus local si ya cubre el tipo, si no de la API"""
+    categoria = (perfil or perfil_por_defecto).categoria(tipo_seleccionado)
+    if word_corpus.is_ready(tipo_seleccionado):
+        local = word_corpus.random_word(tipo_seleccionado, categoria)
+        if local:
+            return local[0]
+    
+    word = await fetch_word_from_api(tipo_seleccionado, presupuesto, categoria)
+    if word:
+        return word
+    
+    # API caída: cualquier palabra del corpus es mejor que el fallback mínimo
+    local = word_corpus.random_word(tipo_seleccionado)
+    if local:
+        resilient_api.registrar_fallback("palabra_corpus")
+        return local[0]
+    return None
+
+async def get_random_word_from_api(tipo_forzado=None):
+    """Obtener palabra aleatoria de nuestra propia API según configuración"""
+    logger.debug("🎯 Obteniendo palabra de nuestra API: %s", api_client.base_url)
+    
+    # Determinar el tipo de palabra a usar
+    tipo_seleccionado = elegir_tipo(tipo_forzado or PALABRA_TIPO)
+    logger.debug("📝 Tipo de palabra seleccionado: %s", tipo_seleccionado)
+    
+    return await fetch_word_from_api(tipo_seleccionado)
+
+# Consultas de traducción en vuelo, para no repetir la misma petición en paralelo
+_traducciones_en_curso: Dict[Tuple[str, str], asyncio.Task] = {}
+
+async def _fetch_translation_api(word, tipo):
     try:
-        url = f"{API_URL}/traducir/{word}?tipo={tipo}"
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Traducción obtenida de nuestra API: '{word}' -> '{data['traduccion']}'")
-            return data["traduccion"]
-        else:
-            print(f"❌ Error HTTP obteniendo traducción: {response.status_code}")
-            return None
+        data = await resilient_api.get_json(ruta_traduccion(word), params={"tipo": tipo})
+        entrada = TranslationEntry(data["traduccion"], tuple(data.get("alternativas", [])))
+        translation_cache.put(word, tipo, entrada)
+        logger.debug("✅ Traducción obtenida de nuestra API: '%s' -> '%s'", word, entrada.traduccion)
+        return entrada
+    except ApiError as e:
+        logger.error("❌ Error HTTP obteniendo traducción: %s", e)
+        return None
     except Exception as e:
-        print(f"❌ Error obteniendo traducción de nuestra API: {e}")
+        logger.error("❌ Error obteniendo traducción de nuestra API: %s", e)
         return None
+
+async def fetch_translation(word, tipo="mixto", presupuesto=None) -> Optional[TranslationEntry]:
+    """Obtener traducción y alternativas, pasando primero por la caché.
+
+    Con `presupuesto`, se deja de esperar pasado ese tiempo (None); la consulta
+    sigue en segundo plano y deja el resultado en la caché.
+    """
+    entrada = translation_cache.get(word, tipo) or word_corpus.lookup(word)
+    if entrada:
+        return entrada
     
+    clave = (word.lower().strip(), tipo)
+    tarea = _traducciones_en_curso.get(clave)
+    if tarea is None:
+        tarea = asyncio.create_task(_fetch_translation_api(word, tipo))
+        _traducciones_en_curso[clave] = tarea
+        tarea.add_done_callback(lambda _: _traducciones_en_curso.pop(clave, None))
     
-            
+    # shield: si quien espera se cancela o agota su presupuesto, la consulta sigue para los demás
+    try:
+        return await asyncio.wait_for(asyncio.shield(tarea), presupuesto)
+    except TimeoutError:
+        resilient_api.presupuestos_agotados += 1
+        return None
+
+async def translate_word_with_api(word, tipo="mixto"):
+    """Obtener traducción de nuestra propia API"""
+    entrada = await fetch_translation(word, tipo)
+    return entrada.traduccion if entrada else None
+
+# Palabras listas para empezar ronda, compartidas por todas las partidas
+word_prefetcher = WordPrefetcher(fetch_word, fetch_translation, elegir_tipo)
+
+
+def load_guild_config(guild_id: int) -> Tuple[str, SelectionProfile]:
+    """Tipo de palabras y pesos guardados de un servidor, sin crear una partida"""
+    tipo_palabras, perfil = "auto", perfil_por_defecto
+    try:
+        with open('bot_config.json', 'r') as f:
+            config = json.load(f)
+            # Tipo propio del servidor si lo hay; si no, el general
+            por_servidor = config.get('por_servidor', {})
+            tipo_palabras = por_servidor.get(str(guild_id), config.get('tipo_palabras', 'auto'))
+            perfil = SelectionProfile.from_config(config.get('pesos_por_servidor', {}).get(str(guild_id)))
+            logger.info("⚙️ Configuración cargada: tipo_palabras = %s", tipo_palabras)
+    except FileNotFoundError:
+        logger.info("⚙️ No se encontró archivo de configuración, usando valores por defecto")
+    except Exception as e:
+        logger.warning("⚙️ Error cargando configuración: %s", e)
+
+    # En modo clúster manda lo guardado en el backend compartido; bot_config.json queda como valor inicial
+    if guild_settings and guild_id:
+        try:
+            ajustes = guild_settings.get(guild_id)
+        except Exception as e:
+            logger.warning("⚙️ Error cargando ajustes compartidos: %s", e)
+            return tipo_palabras, perfil
+        tipo_palabras = ajustes.get('tipo_palabras', tipo_palabras)
+        if 'pesos' in ajustes:
+            perfil = SelectionProfile.from_config(ajustes['pesos'])
+    return tipo_palabras, perfil
+
+
+def save_guild_config(guild_id: int, tipo_palabras: str, perfil: SelectionProfile):
+    """Guardar el tipo y los pesos de palabras de un servidor en bot_config.json (o en el backend compartido)"""
+    if guild_settings:
+        pesos = None if perfil is perfil_por_defecto else perfil.to_config()
+        guild_settings.set(guild_id, tipo_palabras=tipo_palabras, pesos=pesos)
+        return
+    try:
+        with open('bot_config.json', 'r') as f:
+            config = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        config = {}
+    config.setdefault('por_servidor', {})[str(guild_id)] = tipo_palabras
+    pesos = config.setdefault('pesos_por_servidor', {})
+    if perfil is perfil_por_defecto:
+        pesos.pop(str(guild_id), None)
+    else:
+        pesos[str(guild_id)] = perfil.to_config()
+    with open('bot_config.json', 'w') as f:
+        json.dump(config, f)
+
+
+async def send_leaderboard(channel: discord.abc.Messageable, guild: discord.Guild, pagina: int = 1):
+    """Enviar una página de la tabla del servidor; no necesita partida en el canal"""
+    # Página ya renderizada si nadie de ese tramo ha cambiado de puntuación
+    embed = await leaderboard_pages.render(guild, pagina)
+
+    if embed is None:
+        if pagina == 1:
+            outbound.send(channel, "📊 No hay puntuaciones registradas aún.", prioridad=PRIORIDAD_BAJA)
+        else:
+            outbound.send(channel, f"📊 La tabla solo tiene {leaderboard_pages.total_pages(guild.id)} páginas.",
+                          prioridad=PRIORIDAD_BAJA)
+        return
+
+    outbound.send(channel, embed=embed, view=leaderboard_pages.view(guild, pagina), prioridad=PRIORIDAD_BAJA)
 
 
 class GameManager:
-    def __init__(self):
+    def __init__(self, channel: Optional[discord.TextChannel] = None, guild: Optional[discord.Guild] = None):
         self.is_game_active = False
         self.current_word = None
         self.current_player = None
-        self.scores = {}
-        self.channel = None
-        self.guild = None
-        self.game_task = None
-        self.round_task = None
+        # Respuestas aceptadas de la ronda en curso (se compilan al elegir la palabra)
+        self.current_answers: Optional[AnswerMatcher] = None
+        # Para las estadísticas: tipo de la palabra, hora de pared de inicio y respuestas fallidas
+        self.current_tipo: Optional[str] = None
+        self.round_started = 0.0
+        self.round_fallos = 0
+        # Cambia con cada ronda: los intentos encolados para una ronda anterior se descartan
+        self.round_id = 0
+        self.intake = AnswerIntake(self)
+        self.channel = channel
+        self.guild = guild
+        # Temporizadores en el planificador central: próxima ronda y plazo de la actual
+        self.game_timer: Optional[Timer] = None
+        self.round_deadline: Optional[Timer] = None
         # Nuevo: tipo de palabras configurado
         self.tipo_palabras = "auto"  # Por defecto usa el modo automático
-        self.load_scores()
+        # Pesos de tipo y categoría del servidor, y palabras que esta partida no debe repetir
+        self.perfil = perfil_por_defecto
+        self.recientes = RecentWords()
+        self.repeticiones_evitadas = 0
         self.load_config()
     
     def load_config(self):
         """Cargar configuración guardada"""
-        try:
-            with open('bot_config.json', 'r') as f:
-                config = json.load(f)
-                self.tipo_palabras = config.get('tipo_palabras', 'auto')
-                print(f"⚙️ Configuración cargada: tipo_palabras = {self.tipo_palabras}")
-        except FileNotFoundError:
-            print("⚙️ No se encontró archivo de configuración, usando valores por defecto")
-        except Exception as e:
-            print(f"⚙️ Error cargando configuración: {e}")
-    
-    def load_scores(self):
-        try:
-            with open('scores.json', 'r', encoding='utf-8') as f:
-                self.scores = json.load(f)
-        except FileNotFoundError:
-            self.scores = {}
-    
-    def save_scores(self):
-        with open('scores.json', 'w', encoding='utf-8') as f:
-            json.dump(self.scores, f, ensure_ascii=False, indent=2)
+        self.tipo_palabras, self.perfil = load_guild_config(self.guild_id)
     
-    def get_random_word(self) -> str:
+    async def get_random_word(self, presupuesto=None) -> str:
         """Obtener palabra aleatoria según configuración actual"""
-        word = get_random_word_from_api(tipo_forzado=self.tipo_palabras)
+        word = await fetch_word(elegir_tipo(self.tipo_palabras, self.perfil), presupuesto, self.perfil)
         if word:
             return word
         else:
             # Fallback a palabras locales
-            print("⚠️ API falló, usando palabras de fallback")
+            logger.warning("⚠️ API falló, usando palabras de fallback")
+            resilient_api.registrar_fallback("palabra_local")
             return random.choice(ENGLISH_WORDS)
     
-    def get_correct_translation(self, word: str) -> str:
+    def tipo_traduccion(self) -> str:
+        """Tipo con el que se consultan las traducciones"""
+        return self.tipo_palabras if self.tipo_palabras != "auto" else "mixto"
+    
+    async def get_correct_translation(self, word: str) -> str:
         """Obtener traducción según el tipo actual"""
-        translation = translate_word_with_api(word, tipo=self.tipo_palabras if self.tipo_palabras != "auto" else "mixto")
+        translation = await translate_word_with_api(word, tipo=self.tipo_traduccion())
         if translation:
             return translation
         else:
             # Fallback a traducciones locales
             return CORRECT_TRANSLATIONS.get(word.lower(), "traducción no encontrada")
     
-    def check_translation(self, word: str, user_translation: str) -> bool:
-        """Verificar si la traducción es correcta usando nuestra API"""
-        user_translation = user_translation.lower().strip()
-        
-        # Obtener traducción completa de nuestra API
-        try:
-            response = requests.get(f"{API_URL}/traducir/{word}", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Verificar traducción principal
-                correct_translation = data["traduccion"].lower()
-                if user_translation == correct_translation:
-                    return True
-                
-                # Verificar alternativas
-                alternativas = data.get("alternativas", [])
-                for alt in alternativas:
-                    if user_translation == alt.lower():
-                        return True
-                
-                # Verificar errores de tipeo menores (máximo 1 carácter de diferencia)
-                if len(user_translation) >= 3 and len(correct_translation) >= 3:
-                    # Solo acepta si las palabras son muy similares en longitud
-                    if abs(len(user_translation) - len(correct_translation)) <= 1:
-                        # Verificar si es un error de tipeo menor
-                        if self.are_similar_words(user_translation, correct_translation):
-                            return True
-                    
-                return False
-        except Exception as e:
-            print(f"❌ Error verificando traducción con API: {e}")
-            # Fallback al método original (también más estricto)
-            correct = self.get_correct_translation(word).lower()
-            
-            if user_translation == correct:
-                return True
-            
-            # Verificar errores de tipeo menores en fallback también
-            if len(user_translation) >= 3 and len(correct) >= 3:
-                if abs(len(user_translation) - len(correct)) <= 1:
-                    if self.are_similar_words(user_translation, correct):
-                        return True
-                
-            return False
+    async def resolve_answers(self, word: str, presupuesto: float = API_PRESUPUESTO_TRADUCCION) -> AnswerMatcher:
+        """Resolver traducción y alternativas una vez y compilarlas para la ronda"""
+        entrada = await fetch_translation(word, self.tipo_traduccion(), presupuesto)
+        if entrada:
+            return compile_answers(word, entrada.traduccion, entrada.alternativas)
+        
+        logger.error("❌ Error obteniendo traducción con API, usando fallback local")
+        resilient_api.registrar_fallback("traduccion_local")
+        return compile_answers(word, CORRECT_TRANSLATIONS.get(word.lower(), "traducción no encontrada"))
+    
+    async def check_translation(self, word: str, user_translation: str) -> bool:
+        """Verificar si la traducción es correcta (API con caché o fallback local)"""
+        answers = await self.resolve_answers(word)
+        return answers.matches(user_translation)
     
     def are_similar_words(self, word1: str, word2: str) -> bool:
         """Verificar si dos palabras son muy similares (máximo 1 diferencia)"""
-        if len(word1) == len(word2):
-            # Misma longitud: verificar cuántos caracteres difieren
-            differences = sum(c1 != c2 for c1, c2 in zip(word1, word2))
-            return differences <= 1  # Solo 1 carácter diferente máximo
-        elif abs(len(word1) - len(word2)) == 1:
-            # Diferencia de 1 carácter: verificar si uno está contenido en el otro
-            shorter, longer = (word1, word2) if len(word1) < len(word2) else (word2, word1)
-            # Verificar si al eliminar 1 carácter del más largo obtenemos el más corto
-            for i in range(len(longer)):
-                if longer[:i] + longer[i+1:] == shorter:
-                    return True
+        return are_similar_words(word1, word2)
+    
+    def _candidata(self, tipo: str) -> Tuple[Optional[PrefetchedWord], bool]:
+        """Palabra lista sin esperar a la API: del corpus si el servidor pondera categorías, si no del búfer.
+
+        El segundo valor dice si salió del búfer compartido.
+        """
+        if self.perfil.custom_categories(tipo) and word_corpus.is_ready(tipo):
+            local = word_corpus.random_word(tipo, self.perfil.categoria(tipo))
+            if local:
+                palabra, entrada = local
+                return PrefetchedWord(palabra, tipo,
+                                      compile_answers(palabra, entrada.traduccion, entrada.alternativas)), False
+        return word_prefetcher.pop(tipo), True
+    
+    def _usar(self, item: PrefetchedWord) -> PrefetchedWord:
+        self.recientes.add(item.palabra)
+        return item
+    
+    async def draw_word(self) -> PrefetchedWord:
+        """Palabra para una ronda nueva, evitando las recientes: del búfer precargado o, si está vacío, de la API"""
+        from sessions import sessions  # sessions importa este módulo
+        
+        tipo = elegir_tipo(self.tipo_palabras, self.perfil)
+        for _ in range(WORD_NO_REPEAT_INTENTOS):
+            item, del_bufer = self._candidata(tipo)
+            if item is None:
+                break
+            if item.palabra not in self.recientes:
+                return self._usar(item)
+            self.repeticiones_evitadas += 1
+            if del_bufer:
+                # Otra partida puede usarla; si no hay otra, se tira para que la recarga traiga palabras nuevas
+                word_prefetcher.reject(item, devolver=sessions.active_count() > 1)
+        
+        logger.warning("⚠️ Sin palabras precargadas nuevas, consultando la API directamente")
+        # La ronda tiene que empezar dentro de API_PRESUPUESTO_RONDA: si la API no llega, datos locales
+        try:
+            async with asyncio.timeout(API_PRESUPUESTO_RONDA):
+                for _ in range(WORD_NO_REPEAT_INTENTOS):
+                    word = await fetch_word(tipo, API_PRESUPUESTO_RONDA, self.perfil)
+                    if not word:
+                        break
+                    if word not in self.recientes:
+                        return self._usar(PrefetchedWord(word, tipo,
+                                                         await self.resolve_answers(word, presupuesto=None)))
+                    self.repeticiones_evitadas += 1
+        except TimeoutError:
+            resilient_api.presupuestos_agotados += 1
+        
+        resilient_api.registrar_fallback("ronda_local")
+        for _ in range(WORD_NO_REPEAT_INTENTOS):
+            local = word_corpus.random_word(tipo, self.perfil.categoria(tipo))
+            if local is None:
+                break
+            palabra, entrada = local
+            if palabra not in self.recientes:
+                return self._usar(PrefetchedWord(palabra, tipo,
+                                                 compile_answers(palabra, entrada.traduccion, entrada.alternativas)))
+            self.repeticiones_evitadas += 1
+        palabra = random.choice([p for p in ENGLISH_WORDS if p not in self.recientes] or ENGLISH_WORDS)
+        return self._usar(PrefetchedWord(palabra, tipo,
+                                         compile_answers(palabra, CORRECT_TRANSLATIONS.get(palabra.lower(), "traducción no encontrada"))))
+    
+    async def set_round(self, word: str, player: discord.Member, answers: Optional[AnswerMatcher] = None,
+                        tipo: Optional[str] = None):
+        """Fijar palabra y jugador de la ronda con sus respuestas ya compiladas"""
+        self.current_answers = answers or await self.resolve_answers(word)
+        self.current_word = word
+        self.current_player = player
+        self.current_tipo = tipo
+        self.round_started = time.time()
+        self.round_fallos = 0
+        self.round_id += 1
+    
+    def clear_round(self):
+        self.cancel_deadline()
+        self.current_word = None
+        self.current_player = None
+        self.current_answers = None
+        self.current_tipo = None
+    
+    @property
+    def guild_id(self) -> int:
+        return self.guild.id if self.guild else 0
+    
+    def snapshot(self) -> Optional[dict]:
+        """Estado mínimo de la partida para reanudarla tras un reinicio (None si no hay partida).
+
+        Los plazos se guardan en hora de pared: el reloj del loop no sobrevive
+        al proceso.
+        """
+        if not self.is_game_active or not self.channel:
+            return None
+        ahora = time.time()
+        estado = {
+            "guild": self.guild_id,
+            "canal": self.channel.id,
+            "tipo": self.tipo_palabras,
+            "proxima": round(ahora + self.game_timer.restante(), 1) if self.game_timer else None
+        }
+        if self.current_word and self.current_player and self.current_answers:
+            estado["ronda"] = {
+                "palabra": self.current_word,
+                "jugador": self.current_player.id,
+                "traduccion": self.current_answers.traduccion,
+                "formas": sorted(self.current_answers.formas),
+                "tipo": self.current_tipo,
+                "inicio": round(self.round_started, 1),
+                "fallos": self.round_fallos,
+                "plazo": round(ahora + self.round_deadline.restante(), 1) if self.round_deadline else ahora
+            }
+        return estado
+    
+    def restore(self, estado: dict) -> bool:
+        """Reanudar una partida guardada con snapshot(); False si la ronda no pudo recuperarse"""
+        ahora = time.time()
+        self.is_game_active = True
+        self.tipo_palabras = estado.get("tipo", self.tipo_palabras)
+        
+        # Mantener la fase original: si el plazo pasó durante el reinicio, el siguiente múltiplo
+        proxima = estado.get("proxima")
+        primera = (proxima - ahora) % GAME_INTERVAL if proxima is not None else GAME_INTERVAL
+        self.game_timer = scheduler.call_every(GAME_INTERVAL, self._scheduled_round, primera=primera)
+        
+        ronda = estado.get("ronda")
+        if not ronda:
+            return True
+        jugador = self.guild.get_member(ronda["jugador"]) if self.guild else None
+        if jugador is None:
             return False
-        return False
+        self.current_word = ronda["palabra"]
+        self.current_player = jugador
+        self.current_answers = compile_answers(ronda["palabra"], ronda["traduccion"], ronda["formas"])
+        self.current_tipo = ronda.get("tipo")
+        self.round_started = ronda.get("inicio", ahora)
+        self.round_fallos = ronda.get("fallos", 0)
+        # Una ronda que venció mientras el bot estaba caído se da por agotada enseguida
+        self.schedule_deadline(max(0.0, ronda["plazo"] - ahora))
+        return True
+    
+    def update_score(self, user_id: int, points: int) -> int:
+        # El ranking del servidor se actualiza en el sitio; el almacén escribe en segundo plano
+        return scoreboard.add(self.guild_id, user_id, points)
     
-    def update_score(self, user_id: int, points: int):
-        if str(user_id) not in self.scores:
-            self.scores[str(user_id)] = 0
-        self.scores[str(user_id)] += points
-        self.save_scores()
+    def get_score(self, user_id: int) -> int:
+        return scoreboard.get(self.guild_id, user_id)
     
     def get_top_scores(self, limit: int = 10) -> List[tuple]:
-        sorted_scores = sorted(self.scores.items(), key=lambda x: x[1], reverse=True)
-        return sorted_scores[:limit]
+        return scoreboard.top(self.guild_id, limit)
     
     async def select_random_player(self) -> Optional[discord.Member]:
         if not self.guild:
-            print("❌ No hay guild configurado")
+            logger.error("❌ No hay guild configurado")
             return None
         
         try:
-            print("🔄 Obteniendo todos los miembros del servidor...")
-            all_members = []
-            async for member in self.guild.fetch_members():
-                all_members.append(member)
-            print(f"📊 Total de miembros en el servidor: {len(all_members)}")
-            
-            print("🔍 Lista completa de miembros:")
-            for i, member in enumerate(all_members):
-                print(f"   {i+1}. {member.display_name} (Bot: {member.bot}, ID: {member.id})")
-            
-            human_members = []
-            for member in all_members:
-                print(f"\n🔍 Analizando: {member.display_name}")
-                print(f"   - Bot: {member.bot}")
-                print(f"   - ID: {member.id}")
-                print(f"   - Nombre: {member.name}")
-                print(f"   - Display: {member.display_name}")
-                
-                is_real_bot = member.bot
-                print(f"   - Es bot real: {is_real_bot}")
-                
-                is_this_bot = member.id == self.guild.me.id
-                print(f"   - Es este bot: {is_this_bot}")
-                
-                is_application = False
-                if hasattr(member, 'flags'):
-                    try:
-                        is_application = member.flags.verified_bot
-                    except:
-                        is_application = False
-                print(f"   - Es aplicación: {is_application}")
-                
-                member_name_lower = member.display_name.lower()
-                member_username_lower = member.name.lower()
-                
-                app_indicators = [
-                    'bot', 'app', 'application', 'ce', 'english', 'translator',
-                    'emoji', 'gg', 'discord', 'server', 'mod', 'admin',
-                    'webhook', 'integration', 'api', 'service', 'tool',
-                    'helper', 'assistant', 'ai', 'gpt', 'chat'
-                ]
-                
-                has_app_name = any(indicator in member_name_lower or indicator in member_username_lower 
-                                 for indicator in app_indicators)
-                print(f"   - Tiene nombre de app: {has_app_name}")
-                
-                has_app_id = member.id < 1000000000000000000
-                print(f"   - Tiene ID de app: {has_app_id}")
-                
-                is_real_human = (
-                    not is_real_bot and
-                    not is_this_bot
-                )
-                print(f"   - Es humano real: {is_real_human}")
-                
-                if is_real_human:
-                    human_members.append(member)
-                    print(f"✅ Usuario REAL confirmado: {member.display_name}")
-                else:
-                    reason = []
-                    if is_real_bot: reason.append("Bot real")
-                    if is_this_bot: reason.append("Este bot")
-                    
-                    print(f"❌ Excluido: {member.display_name} - Razones: {', '.join(reason)}")
-            
-            if not human_members:
-                print("❌ No se encontraron usuarios REALES en el servidor")
+            # Pool mantenido por eventos del gateway: sin fetch_members ni recorrer el servidor
+            selected_player = await player_pools.choose(self.guild)
+            if not selected_player:
+                logger.error("❌ No se encontraron usuarios REALES en el servidor")
                 return None
             
-            print(f"✅ Encontrados {len(human_members)} usuarios REALES")
-            
-            print(f"✅ Usando todos los {len(human_members)} usuarios reales encontrados")
-            
-            selected_player = random.choice(human_members)
-            print(f"🎯 Jugador seleccionado: {selected_player.display_name} (ID: {selected_player.id})")
-            
+            logger.info("🎯 Jugador seleccionado: %s (ID: %s)", selected_player.display_name, selected_player.id)
             return selected_player
             
         except Exception as e:
-            print(f"❌ Error seleccionando jugador: {e}")
+            logger.error("❌ Error seleccionando jugador: %s", e)
             return None
     
-    async def start_game_loop(self, channel: discord.TextChannel, guild: discord.Guild):
+    async def start_game(self, channel: discord.TextChannel, guild: discord.Guild):
         self.channel = channel
         self.guild = guild
         self.is_game_active = True
-        self.load_scores()
-        
-        await self.channel.send("🎮 **¡El juego de traducción ha comenzado!** 🎮\n"
-                              f"Cada {GAME_INTERVAL // 60} minutos se seleccionará una palabra en inglés "
-                              "y un jugador aleatorio deberá traducirla al español.")
-        
-        while self.is_game_active:
-            try:
-                await asyncio.sleep(GAME_INTERVAL)
-                if self.is_game_active:
-                    await self.start_new_round()
-            except asyncio.CancelledError:
-                break
+        
+        outbound.send(self.channel, "🎮 **¡El juego de traducción ha comenzado!** 🎮\n"
+                      f"Cada {GAME_INTERVAL // 60} minutos se seleccionará una palabra en inglés "
+                      "y un jugador aleatorio deberá traducirla al español.")
+        
+        # Rondas a intervalos fijos sobre el reloj del loop, sin deriva por lo que tarde cada ronda
+        self.game_timer = scheduler.call_every(GAME_INTERVAL, self._scheduled_round)
+    
+    async def _scheduled_round(self):
+        if self.is_game_active:
+            await self.start_new_round()
+    
+    def schedule_deadline(self, duracion: float = ROUND_DURATION):
+        """Programar (o reprogramar) el fin de la ronda en curso"""
+        self.cancel_deadline()
+        self.round_deadline = scheduler.call_later(duracion, self.on_round_deadline)
+    
+    def cancel_deadline(self):
+        if self.round_deadline:
+            self.round_deadline.cancel()
+            self.round_deadline = None
     
     async def start_new_round(self):
         if not self.is_game_active:
             return
         
-        print("🎮 Iniciando nueva ronda...")
+        logger.info("🎮 Iniciando nueva ronda...")
         
-        self.current_word = self.get_random_word()
-        print(f"📝 Palabra seleccionada: {self.current_word}")
+        item = await self.draw_word()
+        logger.info("📝 Palabra seleccionada: %s (tipo: %s)", item.palabra, item.tipo)
         
-        self.current_player = await self.select_random_player()
+        player = await self.select_random_player()
         
-        if not self.current_player:
-            print("❌ No se pudo seleccionar un jugador")
-            await self.channel.send("❌ No se pudo seleccionar un jugador para esta ronda.")
+        if not player:
+            logger.error("❌ No se pudo seleccionar un jugador")
+            outbound.send(self.channel, "❌ No se pudo seleccionar un jugador para esta ronda.")
             return
         
-        if self.current_player.bot:
-            print(f"❌ Error: Se seleccionó un bot ({self.current_player.display_name})")
-            await self.channel.send("❌ Error: Se seleccionó un bot. Reiniciando ronda...")
+        if player.bot:
+            logger.error("❌ Error: Se seleccionó un bot (%s)", player.display_name)
+            outbound.send(self.channel, "❌ Error: Se seleccionó un bot. Reiniciando ronda...")
             await asyncio.sleep(2)
             await self.start_new_round()
             return
         
-        print(f"✅ Ronda configurada: {self.current_word} -> {self.current_player.display_name} (Humano: {not self.current_player.bot})")
+        # Traducción y alternativas se resuelven una sola vez para toda la ronda
+        await self.set_round(item.palabra, player, item.answers, item.tipo)
+        
+        logger.info("✅ Ronda configurada: %s -> %s (Humano: %s)", self.current_word, self.current_player.display_name, not self.current_player.bot)
         
         # Ping al jugador seleccionado
         ping_message = f"🎯 **¡{self.current_player.mention} es tu turno!** 🎯"
@@ -361,149 +516,78 @@ class GameManager:
         )
         embed.set_footer(text="Responde con la traducción en español")
         
-        # Enviar ping y embed juntos
-        await self.channel.send(ping_message)
-        await self.channel.send(embed=embed)
+        # Ping y embed salen en un solo mensaje, por delante de tablas y estadísticas
+        outbound.send(self.channel, ping_message, prioridad=PRIORIDAD_RONDA)
+        outbound.send(self.channel, embed=embed, prioridad=PRIORIDAD_RONDA)
         
-        print(f"⏰ Iniciando temporizador de {ROUND_DURATION} segundos...")
+        logger.debug("⏰ Iniciando temporizador de %s segundos...", ROUND_DURATION)
         
-        self.round_task = asyncio.create_task(self.wait_and_check())
-        print(f"⏰ Tarea del temporizador creada: {self.round_task}")
+        self.schedule_deadline()
+        logger.debug("⏰ Plazo de ronda programado (%s temporizadores pendientes)", scheduler.pending())
         
-        print(f"✅ Ronda iniciada completamente - Palabra: {self.current_word}, Jugador: {self.current_player.display_name}")
+        logger.info("✅ Ronda iniciada completamente - Palabra: %s, Jugador: %s", self.current_word, self.current_player.display_name)
     
-    async def wait_and_check(self):
-        print(f"⏰ WAIT_AND_CHECK: Iniciando espera de {ROUND_DURATION} segundos...")
-        print(f"⏰ WAIT_AND_CHECK: Palabra actual: {self.current_word}")
-        print(f"⏰ WAIT_AND_CHECK: Jugador actual: {self.current_player.display_name if self.current_player else 'None'}")
-        
-        await asyncio.sleep(ROUND_DURATION)
-        
-        print(f"⏰ WAIT_AND_CHECK: Tiempo completado después de {ROUND_DURATION} segundos")
-        print(f"⏰ WAIT_AND_CHECK: Verificando estado del juego...")
-        print(f"⏰ WAIT_AND_CHECK: is_game_active: {self.is_game_active}")
-        print(f"⏰ WAIT_AND_CHECK: current_word: {self.current_word}")
-        print(f"⏰ WAIT_AND_CHECK: current_player: {self.current_player.display_name if self.current_player else 'None'}")
+    async def on_round_deadline(self):
+        self.round_deadline = None
+        logger.debug("⏰ PLAZO: Tiempo completado después de %s segundos", ROUND_DURATION)
+        logger.debug("⏰ PLAZO: is_game_active: %s, current_word: %s, current_player: %s",
+                     self.is_game_active, self.current_word,
+                     self.current_player.display_name if self.current_player else 'None')
         
         if self.is_game_active and self.current_word and self.current_player:
-            print(f"⏰ WAIT_AND_CHECK: Enviando mensaje de tiempo agotado")
+            logger.debug("⏰ PLAZO: Enviando mensaje de tiempo agotado")
             
-            correct_translation = self.get_correct_translation(self.current_word)
-            self.update_score(self.current_player.id, POINTS_WRONG)
+            word, player, tipo = self.current_word, self.current_player, self.current_tipo
+            correct_translation = self.current_answers.traduccion
+            # Cerrar la ronda antes de enviar: una respuesta que llegue mientras tanto ya no cuenta
+            self.clear_round()
+            self.update_score(player.id, POINTS_WRONG)
+            round_stats.record(self.guild_id, player.id, word, tipo, False, fallos=self.round_fallos)
             
             embed = discord.Embed(
                 title="⏰ Tiempo Agotado",
-                description=f"**Palabra:** `{self.current_word.upper()}`\n"
+                description=f"**Palabra:** `{word.upper()}`\n"
                            f"**Traducción correcta:** `{correct_translation}`\n"
-                           f"**Jugador:** {self.current_player.mention}\n"
+                           f"**Jugador:** {player.mention}\n"
                            f"**Puntos perdidos:** {POINTS_WRONG}\n"
-                           f"**Puntuación total:** {self.scores.get(str(self.current_player.id), 0)}\n\n"
-                           "¡Nadie respondió correctamente en el tiempo límite!",
-                color=0xff0000
-            )
-            
-            await self.channel.send(embed=embed)
-            
-            self.current_word = None
-            self.current_player = None
-            print(f"⏰ WAIT_AND_CHECK: Estado limpiado")
-        else:
-            print(f"⏰ WAIT_AND_CHECK: Juego no activo o ronda ya terminada, NO enviando mensaje")
-    
-    async def simple_timer(self):
-        print(f"⏰ SIMPLE TIMER: Iniciando espera de {ROUND_DURATION} segundos...")
-        
-        await asyncio.sleep(ROUND_DURATION)
-        
-        print(f"⏰ SIMPLE TIMER: Tiempo completado, verificando estado...")
-        
-        if self.is_game_active and self.current_word and self.current_player:
-            print(f"⏰ SIMPLE TIMER: Enviando mensaje de tiempo agotado")
-            
-            correct_translation = self.get_correct_translation(self.current_word)
-            
-            embed = discord.Embed(
-                title="⏰ Tiempo Agotado",
-                description=f"**Palabra:** `{self.current_word.upper()}`\n"
-                           f"**Traducción correcta:** `{correct_translation}`\n"
-                           f"**Jugador:** {self.current_player.mention}\n\n"
+                           f"**Puntuación total:** {self.get_score(player.id)}\n\n"
                            "¡Nadie respondió correctamente en el tiempo límite!",
                 color=0xff0000
             )
             
-            await self.channel.send(embed=embed)
-            self.update_score(self.current_player.id, POINTS_WRONG)
-            
-            self.current_word = None
-            self.current_player = None
+            outbound.send(self.channel, embed=embed, prioridad=PRIORIDAD_RONDA)
         else:
-            print(f"⏰ SIMPLE TIMER: Juego no activo o ronda ya terminada, no enviando mensaje")
-    
-    async def round_timer(self):
-        try:
-            print(f"⏰ Temporizador iniciado, esperando {ROUND_DURATION} segundos...")
-            print(f"⏰ Palabra actual: {self.current_word}")
-            print(f"⏰ Jugador actual: {self.current_player.display_name if self.current_player else 'None'}")
-            
-            await asyncio.sleep(ROUND_DURATION)
-            
-            print(f"⏰ Temporizador terminado después de {ROUND_DURATION} segundos")
-            print(f"⏰ Verificando si la ronda sigue activa...")
-            
-            if self.current_player and self.current_word and self.is_game_active:
-                print(f"⏰ Enviando mensaje de tiempo agotado para {self.current_player.display_name}")
-                correct_translation = self.get_correct_translation(self.current_word)
-                
-                embed = discord.Embed(
-                    title="⏰ Tiempo Agotado",
-                    description=f"**Palabra:** `{self.current_word.upper()}`\n"
-                               f"**Traducción correcta:** `{correct_translation}`\n"
-                               f"**Jugador:** {self.current_player.mention}\n\n"
-                               "¡Nadie respondió correctamente en el tiempo límite!",
-                    color=0xff0000
-                )
-                
-                await self.channel.send(embed=embed)
-                
-                self.update_score(self.current_player.id, POINTS_WRONG)
-            else:
-                print(f"⏰ Ronda ya no está activa, no enviando mensaje de tiempo agotado")
-                
-        except asyncio.CancelledError:
-            print(f"⏰ Temporizador cancelado")
-            pass
-        except Exception as e:
-            print(f"⏰ Error en temporizador: {e}")
-        finally:
-            print(f"⏰ Limpiando estado de la ronda")
-            self.current_word = None
-            self.current_player = None
+            logger.debug("⏰ PLAZO: Juego no activo o ronda ya terminada, NO enviando mensaje")
     
     async def handle_translation_attempt(self, message: discord.Message) -> bool:
-        print(f"🔍 Procesando mensaje de {message.author.display_name}: '{message.content}'")
+        logger.debug("🔍 Procesando mensaje de %s: '%s'", message.author.display_name, message.content)
         
-        if not self.is_game_active or not self.current_word or not self.current_player:
-            print("❌ Juego no activo o no hay ronda en curso")
+        if not self.is_game_active or not self.current_answers or not self.current_player:
+            logger.debug("❌ Juego no activo o no hay ronda en curso")
             return False
         
         if message.author.id != self.current_player.id:
-            print(f"❌ Mensaje no es del jugador seleccionado (esperado: {self.current_player.id}, recibido: {message.author.id})")
+            logger.debug("❌ Mensaje no es del jugador seleccionado (esperado: %s, recibido: %s)", self.current_player.id, message.author.id)
             return False
         
         if message.author.bot:
-            print(f"🤖 Ignorando respuesta de bot: {message.author.display_name}")
+            logger.debug("🤖 Ignorando respuesta de bot: %s", message.author.display_name)
             return False
         
+        # Comprobación puramente en memoria contra las respuestas de la ronda
         user_translation = message.content.strip()
-        is_correct = self.check_translation(self.current_word, user_translation)
+        is_correct = self.current_answers.matches(user_translation)
         
         if is_correct:
-            if self.round_task and not self.round_task.done():
-                print(f"✅ Cancelando temporizador por respuesta correcta de {message.author.display_name}")
-                self.round_task.cancel()
+            if self.round_deadline:
+                logger.info("✅ Cancelando temporizador por respuesta correcta de %s", message.author.display_name)
+                self.cancel_deadline()
             
-            correct_translation = self.get_correct_translation(self.current_word)
+            correct_translation = self.current_answers.traduccion
             self.update_score(self.current_player.id, POINTS_CORRECT)
+            # Tiempo de respuesta según Discord: no cuenta lo que el mensaje esperó en la cola
+            round_stats.record(self.guild_id, self.current_player.id, self.current_word, self.current_tipo, True,
+                               message.created_at.timestamp() - self.round_started, self.round_fallos)
             
             embed = discord.Embed(
                 title="✅ ¡Respuesta Correcta!",
@@ -511,54 +595,39 @@ class GameManager:
                            f"**Traducción:** `{correct_translation}`\n"
                            f"**Jugador:** {self.current_player.mention}\n"
                            f"**Puntos ganados:** +{POINTS_CORRECT}\n"
-                           f"**Puntuación total:** {self.scores.get(str(self.current_player.id), 0)}",
+                           f"**Puntuación total:** {self.get_score(self.current_player.id)}",
                 color=0x00ff00
             )
             
-            await self.channel.send(embed=embed)
+            outbound.send(self.channel, embed=embed, prioridad=PRIORIDAD_RONDA)
             
-            print(f"🔄 Limpiando estado de la ronda después de respuesta correcta")
-            self.current_word = None
-            self.current_player = None
+            logger.debug("🔄 Limpiando estado de la ronda después de respuesta correcta")
+            self.clear_round()
             
             return True
         else:
-            print(f"🔄 Respuesta incorrecta de {message.author.display_name}: '{user_translation}', pero puede seguir intentando en silencio")
+            self.round_fallos += 1
+            logger.debug("🔄 Respuesta incorrecta de %s: '%s', pero puede seguir intentando en silencio", message.author.display_name, user_translation)
             return True
     
-    async def stop_game(self):
+    def save_config(self):
+        """Guardar el tipo y los pesos de palabras de este servidor en bot_config.json (o en el backend compartido)"""
+        save_guild_config(self.guild_id, self.tipo_palabras, self.perfil)
+    
+    def cancel_tasks(self):
         self.is_game_active = False
         
-        if self.round_task and not self.round_task.done():
-            self.round_task.cancel()
-        
-        if self.game_task and not self.game_task.done():
-            self.game_task.cancel()
+        self.cancel_deadline()
+        self.intake.stop()
         
-        await self.channel.send("🛑 **El juego de traducción se ha detenido.**")
+        if self.game_timer:
+            self.game_timer.cancel()
+            self.game_timer = None
     
-    async def show_leaderboard(self):
-        top_scores = self.get_top_scores(10)
-        
-        if not top_scores:
-            await self.channel.send("📊 No hay puntuaciones registradas aún.")
-            return
-        
-        embed = discord.Embed(
-            title="🏆 Tabla de Puntuaciones",
-            description="Los mejores traductores del servidor:",
-            color=0xffd700
-        )
-        
-        for i, (user_id, score) in enumerate(top_scores, 1):
-            user = self.guild.get_member(int(user_id))
-            username = user.display_name if user else f"Usuario {user_id}"
-            
-            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-            embed.add_field(
-                name=f"{medal} {username}",
-                value=f"**{score} puntos**",
-                inline=False
-            )
+    async def stop_game(self):
+        self.cancel_tasks()
         
-        await self.channel.send(embed=embed) 
\ No newline at end of file
+        outbound.send(self.channel, "🛑 **El juego de traducción se ha detenido.**")
+    
+    async def show_leaderboard(self, pagina: int = 1):
+        await send_leaderboard(self.channel, self.guild, pagina)
@@ -0,0 +1,268 @@
+# Tabla de puntuaciones indexada por servidor con consultas de posición en O(log n)
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from cluster import owns_guild
+from fenwick import FenwickTree
+from score_store import ScoreStore, score_store
+from score_table import LEGACY_GUILD, ScoreTable
+
+# (guild_id, desde, hasta): posiciones (desde 0) que cambiaron; hasta=None llega al final
+Observador = Callable[[int, int, Optional[int]], None]
+
+
+class _Bloque:
+    """Tramo ordenado del ranking en dos arrays int64 paralelos: -puntos y user_id"""
+
+    __slots__ = ("puntos", "ids")
+
+    def __init__(self, puntos: array, ids: array):
+        self.puntos = puntos
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def ultimo(self) -> Tuple[int, int]:
+        return self.puntos[-1], self.ids[-1]
+
+    def bisect(self, clave: Tuple[int, int]) -> int:
+        # Primero el tramo con los mismos puntos, luego el user_id dentro de él; todo en C
+        menos_score, user_id = clave
+        return bisect_left(self.ids, user_id, bisect_left(self.puntos, menos_score),
+                           bisect_right(self.puntos, menos_score))
+
+    def insert(self, clave: Tuple[int, int]):
+        i = self.bisect(clave)
+        self.puntos.insert(i, clave[0])
+        self.ids.insert(i, clave[1])
+
+    def remove(self, clave: Tuple[int, int]):
+        i = self.bisect(clave)
+        del self.puntos[i]
+        del self.ids[i]
+
+    def split(self, n: int) -> Tuple["_Bloque", "_Bloque"]:
+        return _Bloque(self.puntos[:n], self.ids[:n]), _Bloque(self.puntos[n:], self.ids[n:])
+
+
+class Leaderboard:
+    """Ranking de un servidor ordenado por (-puntos, user_id).
+
+    Se guarda como una lista de bloques ordenados de tamaño acotado (al estilo
+    de sortedcontainers) y un árbol de Fenwick con el tamaño de cada bloque:
+    localizar a un usuario es una bisección sobre los máximos de los bloques y
+    otra dentro del bloque, y su posición es la suma prefija de los tamaños.
+    Puntuaciones y bloques son arrays int64: unos 16 bytes por jugador en el
+    ranking más los 23-46 de su ScoreTable, que es la única copia en memoria
+    (el almacén no se queda con otra): de 39 a 62 bytes por jugador.
+    """
+
+    CARGA = 512  # Tamaño objetivo de cada bloque
+
+    def __init__(self, scores: Union[ScoreTable, Mapping[int, int], None] = None):
+        self._scores = scores if isinstance(scores, ScoreTable) else ScoreTable(scores)
+        claves = sorted((-score, user_id) for user_id, score in self._scores.items())
+        self._bloques: List[_Bloque] = [
+            _Bloque(array("q", (c[0] for c in tramo)), array("q", (c[1] for c in tramo)))
+            for tramo in (claves[i:i + self.CARGA] for i in range(0, len(claves), self.CARGA))
+        ]
+        self._reindexar()
+
+    def _reindexar(self):
+        self._maximos = [bloque.ultimo() for bloque in self._bloques]
+        self._tamanos = FenwickTree(len(bloque) for bloque in self._bloques)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._scores
+
+    def get(self, user_id: int, default: int = 0) -> int:
+        return self._scores.get(user_id, default)
+
+    def items(self):
+        return self._scores.items()
+
+    def nbytes(self) -> int:
+        return self._scores.nbytes() + sum(len(bloque) * 16 for bloque in self._bloques)
+
+    def update(self, user_id: int, score: int):
+        """Fijar la puntuación de un usuario recolocándolo en el ranking"""
+        anterior = self._scores.get(user_id)
+        if anterior == score:
+            return
+        if anterior is not None:
+            self._quitar((-anterior, user_id))
+        self._scores[user_id] = score
+        self._insertar((-score, user_id))
+
+    def _insertar(self, clave: Tuple[int, int]):
+        if not self._bloques:
+            self._bloques.append(_Bloque(array("q", [clave[0]]), array("q", [clave[1]])))
+            self._reindexar()
+            return
+
+        i = min(bisect_left(self._maximos, clave), len(self._bloques) - 1)
+        bloque = self._bloques[i]
+        bloque.insert(clave)
+        self._maximos[i] = bloque.ultimo()
+        self._tamanos.add(i, 1)
+
+        if len(bloque) > 2 * self.CARGA:
+            # Partir el bloque; es raro, así que basta con rehacer el índice
+            self._bloques[i:i + 1] = bloque.split(self.CARGA)
+            self._reindexar()
+
+    def _quitar(self, clave: Tuple[int, int]):
+        i = bisect_left(self._maximos, clave)
+        bloque = self._bloques[i]
+        bloque.remove(clave)
+
+        if bloque:
+            self._maximos[i] = bloque.ultimo()
+            self._tamanos.add(i, -1)
+        else:
+            del self._bloques[i]
+            self._reindexar()
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """Posición (desde 1) de un usuario, o None si no tiene puntuación"""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        clave = (-score, user_id)
+        i = bisect_left(self._maximos, clave)
+        return int(self._tamanos.prefix_sum(i)) + self._bloques[i].bisect(clave) + 1
+
+    def page(self, inicio: int, limite: int) -> List[Tuple[int, int]]:
+        """Entradas (user_id, puntos) desde la posición `inicio` (desde 0)"""
+        if inicio >= len(self._scores) or limite <= 0:
+            return []
+        i, j = self._tamanos.find(inicio)
+        j = int(j)
+        resultado = []
+        while i < len(self._bloques) and len(resultado) < limite:
+            bloque, hasta = self._bloques[i], j + limite - len(resultado)
+            for menos_score, user_id in zip(bloque.puntos[j:hasta], bloque.ids[j:hasta]):
+                resultado.append((user_id, -menos_score))
+            i, j = i + 1, 0
+        return resultado
+
+    def top(self, limite: int = 10) -> List[Tuple[int, int]]:
+        return self.page(0, limite)
+
+    def around(self, user_id: int, radio: int = 2) -> List[Tuple[int, int, int]]:
+        """Jugadores alrededor de un usuario como (posición, user_id, puntos)"""
+        posicion = self.rank(user_id)
+        if posicion is None:
+            return []
+        inicio = max(0, posicion - 1 - radio)
+        return [
+            (inicio + n + 1, uid, score)
+            for n, (uid, score) in enumerate(self.page(inicio, 2 * radio + 1))
+        ]
+
+
+class ScoreBoard:
+    """Puntuaciones de todos los servidores, cada uno con su propio Leaderboard.
+
+    El almacén entrega una ScoreTable por servidor, que pasa tal cual al
+    Leaderboard; las puntuaciones antiguas sin servidor se cargan en
+    LEGACY_GUILD hasta que se migran con migrate_legacy().
+    En modo clúster solo se cargan los servidores de los shards de este proceso,
+    que es el único que los escribe: lo que se lee aquí es siempre lo último.
+    """
+
+    def __init__(self, store: ScoreStore = score_store):
+        self.store = store
+        self._tablas: Dict[int, Leaderboard] = {}
+        self._observadores: List[Observador] = []
+        self.load()
+
+    def subscribe(self, observador: Observador):
+        """Avisar de qué tramo del ranking cambia con cada puntuación (para cachés de vistas)"""
+        self._observadores.append(observador)
+
+    def _avisar(self, guild_id: int, desde: int, hasta: Optional[int]):
+        for observador in self._observadores:
+            observador(guild_id, desde, hasta)
+
+    def load(self):
+        self._tablas = {
+            guild_id: Leaderboard(scores) for guild_id, scores in self.store.load().items()
+            if scores and (guild_id == LEGACY_GUILD or owns_guild(guild_id))
+        }
+
+    def table(self, guild_id: int) -> Leaderboard:
+        tabla = self._tablas.get(guild_id)
+        if tabla is None:
+            tabla = self._tablas[guild_id] = Leaderboard()
+        return tabla
+
+    def get(self, guild_id: int, user_id: int) -> int:
+        tabla = self._tablas.get(guild_id)
+        return tabla.get(user_id) if tabla else 0
+
+    def add(self, guild_id: int, user_id: int, puntos: int) -> int:
+        """Sumar puntos y devolver la nueva puntuación"""
+        tabla = self.table(guild_id)
+        score = tabla.get(user_id) + puntos
+        antes = tabla.rank(user_id) if self._observadores else None
+        tabla.update(user_id, score)
+        self.store.record(guild_id, user_id, score)
+
+        if self._observadores:
+            # Solo se mueven las posiciones entre la antigua y la nueva; un jugador nuevo desplaza hasta el final
+            despues = tabla.rank(user_id)
+            if antes is None:
+                self._avisar(guild_id, despues - 1, None)
+            else:
+                self._avisar(guild_id, min(antes, despues) - 1, max(antes, despues) - 1)
+        return score
+
+    def rank(self, guild_id: int, user_id: int) -> Optional[int]:
+        tabla = self._tablas.get(guild_id)
+        return tabla.rank(user_id) if tabla else None
+
+    def top(self, guild_id: int, limite: int = 10) -> List[Tuple[int, int]]:
+        tabla = self._tablas.get(guild_id)
+        return tabla.top(limite) if tabla else []
+
+    def page(self, guild_id: int, inicio: int, limite: int) -> List[Tuple[int, int]]:
+        tabla = self._tablas.get(guild_id)
+        return tabla.page(inicio, limite) if tabla else []
+
+    def count(self, guild_id: int) -> int:
+        tabla = self._tablas.get(guild_id)
+        return len(tabla) if tabla else 0
+
+    def around(self, guild_id: int, user_id: int, radio: int = 2) -> List[Tuple[int, int, int]]:
+        tabla = self._tablas.get(guild_id)
+        return tabla.around(user_id, radio) if tabla else []
+
+    def reset(self, guild_id: int):
+        """Borrar las puntuaciones de un servidor (solo sus claves: el resto puede ser de otro proceso)"""
+        tabla = self._tablas.pop(guild_id, None)
+        for user_id, _ in (tabla.items() if tabla else ()):
+            self.store.discard(guild_id, user_id)
+        self._avisar(guild_id, 0, None)
+
+    def migrate_legacy(self, guild_id: int) -> int:
+        """Pasar las puntuaciones antiguas (sin servidor) a `guild_id`"""
+        antiguas = self._tablas.pop(LEGACY_GUILD, None)
+        if not antiguas:
+            return 0
+        tabla = self.table(guild_id)
+        for user_id, score in antiguas.items():
+            tabla.update(user_id, tabla.get(user_id) + score)
+            self.store.discard(LEGACY_GUILD, user_id)
+            self.store.record(guild_id, user_id, tabla.get(user_id))
+        self._avisar(guild_id, 0, None)
+        return len(antiguas)
+
+
+# Puntuaciones compartidas por todas las partidas
+scoreboard = ScoreBoard()
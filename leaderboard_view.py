@@ -0,0 +1,202 @@
+# Páginas de la tabla de puntuaciones ya renderizadas, con nombres en caché y botones
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import discord
+
+from config import (
+    LEADERBOARD_PAGE_SIZE, LEADERBOARD_CACHE_PAGES, LEADERBOARD_NAME_TTL, LEADERBOARD_NAME_CACHE,
+    LEADERBOARD_VIEW_TIMEOUT
+)
+from leaderboard import ScoreBoard, scoreboard
+
+logger = logging.getLogger(__name__)
+
+
+class DisplayNameCache:
+    """Nombres visibles por (guild_id, user_id) con caducidad.
+
+    Se resuelven por lotes: primero la caché de miembros de discord.py y, para
+    quien no esté, una sola consulta al gateway con hasta 100 ids. Quien ya no
+    está en el servidor también se recuerda, para no volver a preguntar. Como
+    las páginas, es un LRU acotado: los nombres menos usados salen primero.
+    """
+
+    def __init__(self, ttl: float = LEADERBOARD_NAME_TTL, max_nombres: int = LEADERBOARD_NAME_CACHE):
+        self.ttl = ttl
+        self.max_nombres = max_nombres
+        self._nombres: "OrderedDict[tuple[int, int], tuple[float, str]]" = OrderedDict()
+        self.consultas = 0
+
+    def forget(self, guild_id: int, user_id: int):
+        self._nombres.pop((guild_id, user_id), None)
+
+    async def resolve(self, guild: discord.Guild, user_ids: List[int]) -> Dict[int, str]:
+        ahora = time.time()
+        nombres: Dict[int, str] = {}
+        faltan = []
+        for user_id in user_ids:
+            item = self._nombres.get((guild.id, user_id))
+            if item and item[0] > ahora:
+                self._nombres.move_to_end((guild.id, user_id))
+                nombres[user_id] = item[1]
+                continue
+            member = guild.get_member(user_id)
+            if member:
+                nombres[user_id] = member.display_name
+            else:
+                faltan.append(user_id)
+
+        if faltan and hasattr(guild, "query_members"):
+            try:
+                self.consultas += 1
+                for member in await guild.query_members(user_ids=faltan[:100], cache=True):
+                    nombres[member.id] = member.display_name
+            except Exception as e:
+                logger.debug("👥 No se pudieron consultar %s miembros: %s", len(faltan), e)
+
+        for user_id in user_ids:
+            nombre = nombres.setdefault(user_id, f"Usuario {user_id}")
+            self._nombres[(guild.id, user_id)] = (ahora + self.ttl, nombre)
+            self._nombres.move_to_end((guild.id, user_id))
+        while len(self._nombres) > self.max_nombres:
+            self._nombres.popitem(last=False)
+        return nombres
+
+    def __len__(self) -> int:
+        return len(self._nombres)
+
+
+class LeaderboardPages:
+    """Embeds de la tabla por (guild_id, página), válidos hasta que cambia su tramo.
+
+    ScoreBoard avisa del rango de posiciones que movió cada puntuación y solo
+    se descartan las páginas que lo tocan; un !table repetido devuelve el
+    mismo embed sin ordenar ni resolver nombres.
+    """
+
+    def __init__(self, tablero: ScoreBoard = scoreboard, por_pagina: int = LEADERBOARD_PAGE_SIZE,
+                 max_paginas: int = LEADERBOARD_CACHE_PAGES):
+        self.tablero = tablero
+        self.por_pagina = por_pagina
+        self.max_paginas = max_paginas
+        self.nombres = DisplayNameCache()
+        self._paginas: "OrderedDict[tuple[int, int], tuple[discord.Embed, set[int]]]" = OrderedDict()
+        tablero.subscribe(self.invalidate)
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.invalidaciones = 0
+
+    def total_pages(self, guild_id: int) -> int:
+        return max(1, -(-self.tablero.count(guild_id) // self.por_pagina))
+
+    def invalidate(self, guild_id: int, desde: int, hasta: Optional[int] = None):
+        """Descartar las páginas del servidor que contienen posiciones entre desde y hasta (desde 0)"""
+        primera = desde // self.por_pagina + 1
+        ultima = hasta // self.por_pagina + 1 if hasta is not None else None
+        for clave in [c for c in self._paginas if c[0] == guild_id]:
+            if clave[1] >= primera and (ultima is None or clave[1] <= ultima):
+                del self._paginas[clave]
+                self.invalidaciones += 1
+
+    def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Un cambio de nombre solo invalida las páginas donde aparece ese miembro"""
+        if before.display_name == after.display_name:
+            return
+        self.nombres.forget(after.guild.id, after.id)
+        for clave in [c for c, (_, ids) in self._paginas.items() if c[0] == after.guild.id and after.id in ids]:
+            del self._paginas[clave]
+            self.invalidaciones += 1
+
+    async def render(self, guild: discord.Guild, pagina: int = 1) -> Optional[discord.Embed]:
+        """Embed de una página (desde 1), o None si no hay nadie en ella"""
+        clave = (guild.id, pagina)
+        item = self._paginas.get(clave)
+        if item:
+            self._paginas.move_to_end(clave)
+            self.hits += 1
+            return item[0]
+
+        self.misses += 1
+        inicio = (pagina - 1) * self.por_pagina
+        entradas = self.tablero.page(guild.id, inicio, self.por_pagina)
+        if not entradas:
+            return None
+        nombres = await self.nombres.resolve(guild, [user_id for user_id, _ in entradas])
+
+        embed = discord.Embed(
+            title="🏆 Tabla de Puntuaciones",
+            description="Los mejores traductores del servidor:",
+            color=0xffd700
+        )
+        for i, (user_id, score) in enumerate(entradas, inicio + 1):
+            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+            embed.add_field(
+                name=f"{medal} {nombres[user_id]}",
+                value=f"**{score} puntos**",
+                inline=False
+            )
+        embed.set_footer(text=f"Página {pagina}")
+
+        self._paginas[clave] = (embed, {user_id for user_id, _ in entradas})
+        while len(self._paginas) > self.max_paginas:
+            self._paginas.popitem(last=False)
+        return embed
+
+    def view(self, guild: discord.Guild, pagina: int) -> Optional["LeaderboardView"]:
+        """Botones de navegación, o None si todo cabe en una página"""
+        if self.total_pages(guild.id) <= 1:
+            return None
+        return LeaderboardView(self, guild, pagina)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "paginas": len(self._paginas),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidaciones": self.invalidaciones,
+            "hit_rate": self.hits / total if total else 0.0,
+            "nombres": len(self.nombres),
+            "consultas_nombres": self.nombres.consultas
+        }
+
+
+class LeaderboardView(discord.ui.View):
+    """Botones ◀️/▶️ que cambian la página de la tabla editando el mismo mensaje"""
+
+    def __init__(self, paginas: LeaderboardPages, guild: discord.Guild, pagina: int):
+        super().__init__(timeout=LEADERBOARD_VIEW_TIMEOUT)
+        self.paginas = paginas
+        self.guild = guild
+        self.pagina = pagina
+        self._actualizar_botones()
+
+    def _actualizar_botones(self):
+        self.anterior.disabled = self.pagina <= 1
+        self.siguiente.disabled = self.pagina >= self.paginas.total_pages(self.guild.id)
+
+    async def _mostrar(self, interaction: discord.Interaction, pagina: int):
+        embed = await self.paginas.render(self.guild, pagina)
+        if embed is None:
+            await interaction.response.defer()
+            return
+        self.pagina = pagina
+        self._actualizar_botones()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def anterior(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._mostrar(interaction, self.pagina - 1)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def siguiente(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._mostrar(interaction, self.pagina + 1)
+
+
+# Páginas compartidas por todas las sesiones
+leaderboard_pages = LeaderboardPages()
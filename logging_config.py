@@ -0,0 +1,75 @@
+# Configuración de logging: el event loop solo encola, un hilo aparte escribe
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+from config import LOG_LEVEL, LOG_JSON
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, para agregadores de logs"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        if record.exc_info:
+            datos["exc"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que encola el registro sin formatearlo.
+
+    El prepare() de la librería estándar formatea el mensaje (y la traza de
+    la excepción) en el hilo que emite; aquí solo se copia el registro y el
+    formateo queda para el handler del listener. Los argumentos se encolan
+    tal cual: un objeto mutable se muestra como esté al escribirse.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return copy.copy(record)
+
+
+def setup_logging(level: str = LOG_LEVEL, as_json: bool = LOG_JSON):
+    """Instalar un QueueHandler en el logger raíz con su QueueListener.
+
+    Emitir un log desde una corrutina solo copia el registro y lo mete en una
+    cola; el formateo y la escritura en stdout ocurren en el hilo del listener.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    salida = logging.StreamHandler(sys.stdout)
+    if as_json:
+        salida.setFormatter(JsonFormatter())
+    else:
+        salida.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s"))
+
+    cola: queue.SimpleQueue = queue.SimpleQueue()
+    raiz = logging.getLogger()
+    raiz.setLevel(level)
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(_QueueHandler(cola))
+
+    _listener = logging.handlers.QueueListener(cola, salida, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Vaciar la cola y parar el hilo del listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
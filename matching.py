@@ -0,0 +1,148 @@
+# Comprobación de respuestas en memoria, sin llamadas a la API
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, Tuple
+
+# Artículos que se ignoran al principio de la respuesta ("el gato" == "gato")
+ARTICULOS = frozenset(["el", "la", "los", "las", "un", "una", "unos", "unas", "lo"])
+
+_NO_ALFANUMERICO = re.compile(r"[^\w\s]+")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar(texto: str) -> str:
+    """Forma canónica de una respuesta para compararla.
+
+    Minúsculas, sin tildes ni diéresis (NFKD sin marcas combinantes), sin
+    signos de puntuación, espacios colapsados y sin artículo inicial.
+    """
+    texto = texto.casefold()
+    if not texto.isascii():
+        texto = unicodedata.normalize("NFKD", texto)
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = _ESPACIOS.sub(" ", _NO_ALFANUMERICO.sub(" ", texto)).strip()
+
+    primera, _, resto = texto.partition(" ")
+    if resto and primera in ARTICULOS:
+        return resto
+    return texto
+
+
+def max_errores(longitud: int) -> int:
+    """Errores de tipeo tolerados según la longitud de la respuesta correcta"""
+    if longitud < 3:
+        return 0
+    if longitud < 8:
+        return 1
+    return 2
+
+
+def distancia_acotada(a: str, b: str, limite: int) -> int:
+    """Distancia de Damerau-Levenshtein (alineamiento óptimo) acotada por `limite`.
+
+    Solo calcula la banda diagonal de ancho 2*limite+1 y abandona en cuanto
+    toda una fila supera el límite; en ese caso devuelve limite + 1.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+
+    # Prefijo y sufijo comunes no aportan a la distancia
+    inicio = 0
+    while inicio < len(a) and inicio < len(b) and a[inicio] == b[inicio]:
+        inicio += 1
+    fin_a, fin_b = len(a), len(b)
+    while fin_a > inicio and fin_b > inicio and a[fin_a - 1] == b[fin_b - 1]:
+        fin_a -= 1
+        fin_b -= 1
+    a, b = a[inicio:fin_a], b[inicio:fin_b]
+    if not a or not b:
+        return min(max(len(a), len(b)), limite + 1)
+
+    fuera = limite + 1
+    lb = len(b)
+    anterior2 = None
+    anterior = list(range(lb + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [fuera] * lb
+        desde = max(1, i - limite)
+        hasta = min(lb, i + limite)
+        minimo = i if desde == 1 else fuera
+        ca = a[i - 1]
+        for j in range(desde, hasta + 1):
+            cb = b[j - 1]
+            valor = min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                valor = min(valor, anterior2[j - 2] + 1)
+            actual[j] = valor
+            if valor < minimo:
+                minimo = valor
+        if minimo > limite:
+            return fuera
+        anterior2, anterior = anterior, actual
+    return min(anterior[lb], fuera)
+
+
+def bigramas(texto: str) -> FrozenSet[str]:
+    """Pares de caracteres consecutivos, para descartar formas sin calcular distancias"""
+    return frozenset(texto[i:i + 2] for i in range(len(texto) - 1))
+
+
+def are_similar_words(word1: str, word2: str) -> bool:
+    """Verificar si dos palabras son muy similares (máximo 1 diferencia)"""
+    return distancia_acotada(word1, word2, 1) <= 1
+
+
+@dataclass(frozen=True)
+class AnswerMatcher:
+    """Respuestas aceptadas para la palabra de una ronda, ya normalizadas.
+
+    Se compila una sola vez al elegir la palabra y no cambia durante la ronda,
+    así el veredicto no depende de la API mientras el jugador responde.
+    `difusas` guarda cada forma con los errores que tolera y sus bigramas
+    distintos: cada edición destruye como mucho 3 de ellos, así que una
+    intersección de conjuntos (en C) descarta casi todas las formas antes de
+    calcular distancias.
+    """
+    palabra: str
+    traduccion: str
+    principal: str
+    formas: FrozenSet[str]
+    difusas: Tuple[Tuple[str, int, FrozenSet[str]], ...] = ()
+
+    def matches(self, texto: str) -> bool:
+        intento = normalizar(texto)
+        if intento in self.formas:
+            return True
+
+        # Errores de tipeo menores contra la traducción y todas las alternativas
+        longitud = len(intento)
+        bigramas_intento = None
+        for forma, limite, bigramas_forma in self.difusas:
+            if abs(longitud - len(forma)) > limite:
+                continue
+            # Cada edición rompe como mucho 3 posiciones de la forma: un bigrama distinto
+            # solo se pierde si se rompen todas las suyas, así que quedan al menos b - 3*limite
+            minimo_comun = len(bigramas_forma) - 3 * limite
+            if minimo_comun > 0:
+                if bigramas_intento is None:
+                    bigramas_intento = bigramas(intento)
+                if len(bigramas_intento & bigramas_forma) < minimo_comun:
+                    continue
+            if distancia_acotada(intento, forma, limite) <= limite:
+                return True
+        return False
+
+
+def compile_answers(palabra: str, traduccion: str, alternativas: Iterable[str] = ()) -> AnswerMatcher:
+    """Compilar la traducción y sus alternativas en un AnswerMatcher inmutable"""
+    principal = normalizar(traduccion)
+    formas = frozenset([principal, *(normalizar(alt) for alt in alternativas)]) - {""}
+    difusas = tuple(sorted(
+        ((forma, max_errores(len(forma)), bigramas(forma)) for forma in formas if max_errores(len(forma))),
+        key=lambda item: len(item[0])
+    ))
+    return AnswerMatcher(palabra=palabra, traduccion=traduccion, principal=principal,
+                         formas=formas, difusas=difusas)
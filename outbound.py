@@ -0,0 +1,221 @@
+# Salida de mensajes: colas por canal con prioridades, límites de ritmo y envíos combinados
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import discord
+
+from config import (
+    OUTBOUND_CANAL_RAFAGA, OUTBOUND_CANAL_PERIODO, OUTBOUND_GLOBAL_POR_SEGUNDO, OUTBOUND_ESPERA_429
+)
+
+logger = logging.getLogger(__name__)
+
+# Menor número = sale antes
+PRIORIDAD_RONDA = 0      # inicio de ronda, tiempo agotado, respuesta correcta
+PRIORIDAD_NORMAL = 1     # avisos del juego
+PRIORIDAD_BAJA = 2       # tablas de puntuación y estadísticas
+
+MAX_CONTENIDO = 2000     # Límites de Discord por mensaje
+MAX_EMBEDS = 10
+
+
+class _Pendiente:
+    __slots__ = ("prioridad", "content", "embeds", "view", "futuro", "llegada")
+
+    def __init__(self, prioridad: int, content: Optional[str], embeds: List[discord.Embed],
+                 view: Optional[discord.ui.View], futuro: asyncio.Future):
+        self.prioridad = prioridad
+        self.content = content
+        self.embeds = embeds
+        self.view = view
+        self.futuro = futuro
+        self.llegada = time.perf_counter()
+
+
+class _Ventana:
+    """Ventana deslizante: como mucho `limite` envíos cada `periodo` segundos"""
+
+    def __init__(self, limite: int, periodo: float):
+        self.limite = limite
+        self.periodo = periodo
+        self._envios: Deque[float] = deque()
+
+    def espera(self) -> float:
+        ahora = time.monotonic()
+        while self._envios and ahora - self._envios[0] >= self.periodo:
+            self._envios.popleft()
+        if len(self._envios) < self.limite:
+            return 0.0
+        return self.periodo - (ahora - self._envios[0])
+
+    def anotar(self):
+        self._envios.append(time.monotonic())
+
+
+class _Canal:
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        self.cola: List[Tuple[int, int, _Pendiente]] = []
+        self.ventana = _Ventana(OUTBOUND_CANAL_RAFAGA, OUTBOUND_CANAL_PERIODO)
+        self.tarea: Optional[asyncio.Task] = None
+
+
+class OutboundDispatcher:
+    """Todos los mensajes del juego salen por aquí.
+
+    Cada canal tiene una cola por prioridad y un worker que respeta el límite
+    de Discord por canal (OUTBOUND_CANAL_RAFAGA cada OUTBOUND_CANAL_PERIODO) y
+    uno global compartido. Antes de cada envío se juntan en un solo mensaje
+    los pendientes del canal con la misma prioridad que quepan (texto
+    concatenado y hasta 10 embeds), así que el ping y el embed de una ronda
+    son una sola petición.
+    """
+
+    def __init__(self):
+        self._canales: Dict[int, _Canal] = {}
+        self._global = _Ventana(OUTBOUND_GLOBAL_POR_SEGUNDO, 1.0)
+        self._lock_global = asyncio.Lock()
+        self._secuencia = itertools.count()
+
+        # Métricas
+        self.encolados = 0
+        self.envios = 0
+        self.combinados = 0
+        self.limitados = 0
+        self.errores = 0
+        self.latencia_total = 0.0
+        self.latencia_maxima = 0.0
+        self.entregados = 0
+
+    def send(self, channel: discord.abc.Messageable, content: Optional[str] = None, *,
+             embed: Optional[discord.Embed] = None, view: Optional[discord.ui.View] = None,
+             prioridad: int = PRIORIDAD_NORMAL) -> asyncio.Future:
+        """Encolar un mensaje; el futuro se resuelve a True al enviarse o False si falla.
+
+        No hace falta esperarlo: quien solo quiere que el mensaje salga puede seguir.
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        canal = self._canales.get(channel.id)
+        if canal is None:
+            canal = self._canales[channel.id] = _Canal(channel)
+        pendiente = _Pendiente(prioridad, content, [embed] if embed else [], view, futuro)
+        heapq.heappush(canal.cola, (prioridad, next(self._secuencia), pendiente))
+        self.encolados += 1
+        if canal.tarea is None or canal.tarea.done():
+            canal.tarea = asyncio.create_task(self._drenar(canal))
+        return futuro
+
+    def pending(self) -> int:
+        return sum(len(canal.cola) for canal in self._canales.values())
+
+    def forget(self, channel_id: int):
+        """Descartar la cola de un canal que ya no existe"""
+        canal = self._canales.pop(channel_id, None)
+        if canal:
+            if canal.tarea:
+                canal.tarea.cancel()
+            for _, _, pendiente in canal.cola:
+                if not pendiente.futuro.done():
+                    pendiente.futuro.set_result(False)
+
+    def _combinar(self, canal: _Canal) -> List[_Pendiente]:
+        """Sacar el primero de la cola y los siguientes de su misma prioridad que quepan en el mismo mensaje"""
+        lote = [heapq.heappop(canal.cola)[2]]
+        longitud = len(lote[0].content or "")
+        embeds = len(lote[0].embeds)
+        con_view = lote[0].view is not None
+        while canal.cola:
+            siguiente = canal.cola[0][2]
+            # Lo menos urgente espera su turno: no viaja pegado a un mensaje prioritario
+            if siguiente.prioridad != lote[0].prioridad:
+                break
+            extra = len(siguiente.content or "") + (1 if siguiente.content and longitud else 0)
+            if longitud + extra > MAX_CONTENIDO or embeds + len(siguiente.embeds) > MAX_EMBEDS:
+                break
+            # Un mensaje solo lleva un juego de botones
+            if con_view and siguiente.view is not None:
+                break
+            con_view = con_view or siguiente.view is not None
+            heapq.heappop(canal.cola)
+            lote.append(siguiente)
+            longitud += extra
+            embeds += len(siguiente.embeds)
+        self.combinados += len(lote) - 1
+        return lote
+
+    async def _esperar_turno(self, canal: _Canal):
+        espera = canal.ventana.espera()
+        while espera > 0:
+            await asyncio.sleep(espera)
+            espera = canal.ventana.espera()
+        async with self._lock_global:
+            espera = self._global.espera()
+            while espera > 0:
+                await asyncio.sleep(espera)
+                espera = self._global.espera()
+            self._global.anotar()
+        canal.ventana.anotar()
+
+    async def _drenar(self, canal: _Canal):
+        while canal.cola:
+            await self._esperar_turno(canal)
+            lote = self._combinar(canal)
+            content = "\n".join(p.content for p in lote if p.content) or None
+            kwargs = {"embeds": [e for p in lote for e in p.embeds]} if any(p.embeds for p in lote) else {}
+            view = next((p.view for p in lote if p.view is not None), None)
+            if view is not None:
+                kwargs["view"] = view
+            try:
+                await canal.channel.send(content, **kwargs)
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    # Nos adelantamos al límite: devolver el lote a la cola y frenar este canal
+                    self.limitados += 1
+                    for pendiente in lote:
+                        heapq.heappush(canal.cola, (pendiente.prioridad, next(self._secuencia), pendiente))
+                    await asyncio.sleep(OUTBOUND_ESPERA_429)
+                    continue
+                self._fallar(lote, e)
+                continue
+            except Exception as e:
+                self._fallar(lote, e)
+                continue
+
+            self.envios += 1
+            ahora = time.perf_counter()
+            for pendiente in lote:
+                latencia = ahora - pendiente.llegada
+                self.latencia_total += latencia
+                self.latencia_maxima = max(self.latencia_maxima, latencia)
+                self.entregados += 1
+                if not pendiente.futuro.done():
+                    pendiente.futuro.set_result(True)
+
+    def _fallar(self, lote: List[_Pendiente], error: Exception):
+        self.errores += 1
+        logger.error("❌ Error enviando mensaje: %s", error)
+        for pendiente in lote:
+            if not pendiente.futuro.done():
+                pendiente.futuro.set_result(False)
+
+    def stats(self) -> dict:
+        return {
+            "profundidad": self.pending(),
+            "canales": len(self._canales),
+            "encolados": self.encolados,
+            "envios": self.envios,
+            "combinados": self.combinados,
+            "limitados": self.limitados,
+            "errores": self.errores,
+            "latencia_media": self.latencia_total / self.entregados if self.entregados else 0.0,
+            "latencia_maxima": self.latencia_maxima
+        }
+
+
+# Salida compartida por todas las sesiones
+outbound = OutboundDispatcher()
@@ -0,0 +1,400 @@
+# Jugadores elegibles por servidor con pesos para un reparto justo, mantenidos con eventos del gateway
+import json
+import logging
+import os
+import heapq
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+from config import (
+    PLAYER_POOL_MODE, PLAYER_ACTIVE_WINDOW, PLAYER_OPTIN_FILE, PLAYER_OPTOUT_FILE,
+    PLAYER_PESO_ACTIVO, PLAYER_ENFRIAMIENTO
+)
+from fenwick import FenwickTree
+from shared_state import guild_settings
+
+logger = logging.getLogger(__name__)
+
+
+class IdPool:
+    """Conjunto de ids con alta, baja y elección aleatoria en O(1).
+
+    Lista densa más un diccionario id -> posición; al borrar se mueve el
+    último elemento al hueco.
+    """
+
+    def __init__(self):
+        self._ids: List[int] = []
+        self._pos: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._pos
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def add(self, user_id: int):
+        if user_id not in self._pos:
+            self._pos[user_id] = len(self._ids)
+            self._ids.append(user_id)
+
+    def discard(self, user_id: int):
+        pos = self._pos.pop(user_id, None)
+        if pos is None:
+            return
+        ultimo = self._ids.pop()
+        if pos < len(self._ids):
+            self._ids[pos] = ultimo
+            self._pos[ultimo] = pos
+
+    def random(self) -> Optional[int]:
+        return random.choice(self._ids) if self._ids else None
+
+
+class WeightedIdPool:
+    """Ids con peso entero: alta, baja y cambio de peso en O(log n), elección ponderada en O(log n).
+
+    Un árbol de Fenwick guarda el peso de cada hueco; los huecos que quedan
+    libres al dar de baja se reutilizan. Los pesos son enteros para que las
+    sumas no acumulen error tras millones de actualizaciones.
+    """
+
+    def __init__(self, pesos: Iterable[Tuple[int, int]] = ()):
+        items = list(pesos)
+        self._ids: List[Optional[int]] = [user_id for user_id, _ in items]
+        self._pos: Dict[int, int] = {user_id: i for i, user_id in enumerate(self._ids)}
+        self._arbol = FenwickTree(peso for _, peso in items)
+        self._libres: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._pos
+
+    def weight(self, user_id: int) -> int:
+        pos = self._pos.get(user_id)
+        return self._arbol[pos] if pos is not None else 0
+
+    def total(self) -> int:
+        return self._arbol.total()
+
+    def set(self, user_id: int, peso: int):
+        pos = self._pos.get(user_id)
+        if pos is not None:
+            if self._arbol[pos] != peso:
+                self._arbol.set(pos, peso)
+            return
+        if self._libres:
+            pos = self._libres.pop()
+            self._ids[pos] = user_id
+            self._arbol.set(pos, peso)
+        else:
+            pos = len(self._ids)
+            self._ids.append(user_id)
+            self._arbol.append(peso)
+        self._pos[user_id] = pos
+
+    def discard(self, user_id: int):
+        pos = self._pos.pop(user_id, None)
+        if pos is None:
+            return
+        self._arbol.set(pos, 0)
+        self._ids[pos] = None
+        self._libres.append(pos)
+
+    def random(self) -> Optional[int]:
+        total = self.total()
+        if total <= 0:
+            return None
+        pos, _ = self._arbol.find(random.randrange(total))
+        return self._ids[pos]
+
+
+class GuildPlayerPool:
+    """Jugadores elegibles de un servidor con un peso por miembro para un reparto justo.
+
+    El peso combina el modo (en "activos" y "voluntarios" el resto pesa 0),
+    la actividad reciente (PLAYER_PESO_ACTIVO) y el enfriamiento desde la
+    última vez que le tocó (PLAYER_ENFRIAMIENTO); quien se borró con !salir
+    pesa 0. Los cambios que dependen del tiempo (dejar de estar activo, pasar
+    de etapa de enfriamiento) se guardan en un montículo y se aplican al
+    elegir, así que cada actualización cuesta O(log n).
+    """
+
+    def __init__(self, guild_id: int, modo: str = PLAYER_POOL_MODE, excluidos: Iterable[int] = ()):
+        self.guild_id = guild_id
+        self.modo = modo
+        self.elegibles = IdPool()
+        self.voluntarios = IdPool()
+        self.excluidos: Set[int] = set(excluidos)
+        self.pesos = WeightedIdPool()
+        self.ultimo_mensaje: Dict[int, float] = {}
+        self.activos: Set[int] = set()
+        # user_id -> (cuándo le tocó, etapa de PLAYER_ENFRIAMIENTO)
+        self.enfriamiento: Dict[int, Tuple[float, int]] = {}
+        # (cuándo, user_id, etapa o -1 para "deja de estar activo", referencia)
+        self._pendientes: List[Tuple[float, int, int, float]] = []
+        self.elecciones = 0
+
+    def _peso(self, user_id: int) -> int:
+        if user_id in self.excluidos or user_id not in self.elegibles:
+            return 0
+        if self.modo == "voluntarios" and user_id not in self.voluntarios:
+            return 0
+        activo = user_id in self.activos
+        if self.modo == "activos" and not activo:
+            return 0
+        factor = PLAYER_PESO_ACTIVO if activo else 1
+        if user_id in self.enfriamiento:
+            factor *= PLAYER_ENFRIAMIENTO[self.enfriamiento[user_id][1]][1]
+        # Nunca 0 por enfriamiento: si solo queda quien acaba de jugar, le vuelve a tocar
+        return max(1, round(factor * 1000))
+
+    def update(self, user_id: int):
+        """Recalcular el peso de un miembro en O(log n)"""
+        peso = self._peso(user_id)
+        if peso:
+            self.pesos.set(user_id, peso)
+        else:
+            self.pesos.discard(user_id)
+
+    def add(self, user_id: int):
+        self.elegibles.add(user_id)
+        self.update(user_id)
+
+    def mark_active(self, user_id: int):
+        if user_id in self.elegibles:
+            ahora = time.time()
+            self.ultimo_mensaje[user_id] = ahora
+            if user_id not in self.activos:
+                self.activos.add(user_id)
+                heapq.heappush(self._pendientes, (ahora + PLAYER_ACTIVE_WINDOW, user_id, -1, ahora))
+                self.update(user_id)
+
+    def remove(self, user_id: int):
+        self.elegibles.discard(user_id)
+        self.activos.discard(user_id)
+        self.ultimo_mensaje.pop(user_id, None)
+        self.enfriamiento.pop(user_id, None)
+        self.pesos.discard(user_id)
+
+    def picked(self, user_id: int):
+        """Empezar el enfriamiento de quien acaba de ser elegido"""
+        ahora = time.time()
+        self.elecciones += 1
+        self.enfriamiento[user_id] = (ahora, 0)
+        if len(PLAYER_ENFRIAMIENTO) > 1:
+            heapq.heappush(self._pendientes, (ahora + PLAYER_ENFRIAMIENTO[1][0], user_id, 1, ahora))
+        self.update(user_id)
+
+    def refresh(self, ahora: Optional[float] = None):
+        """Aplicar los cambios de peso que ya han vencido (entradas obsoletas se descartan)"""
+        ahora = ahora or time.time()
+        while self._pendientes and self._pendientes[0][0] <= ahora:
+            _, user_id, etapa, referencia = heapq.heappop(self._pendientes)
+            if etapa < 0:
+                ultimo = self.ultimo_mensaje.get(user_id)
+                if ultimo is None or user_id not in self.activos:
+                    continue
+                if ultimo > referencia:
+                    # Volvió a escribir: revisar de nuevo cuando venza su último mensaje
+                    heapq.heappush(self._pendientes, (ultimo + PLAYER_ACTIVE_WINDOW, user_id, -1, ultimo))
+                    continue
+                self.activos.discard(user_id)
+                self.ultimo_mensaje.pop(user_id, None)
+            else:
+                estado = self.enfriamiento.get(user_id)
+                if estado is None or estado[0] != referencia:
+                    continue
+                self.enfriamiento[user_id] = (referencia, etapa)
+                if etapa + 1 < len(PLAYER_ENFRIAMIENTO):
+                    heapq.heappush(self._pendientes,
+                                   (referencia + PLAYER_ENFRIAMIENTO[etapa + 1][0], user_id, etapa + 1, referencia))
+                elif PLAYER_ENFRIAMIENTO[etapa][1] == 1:
+                    del self.enfriamiento[user_id]
+            self.update(user_id)
+
+    def rebuild_weights(self):
+        """Todos los pesos de golpe en O(n), al construir el pool o cambiar de modo"""
+        self.pesos = WeightedIdPool(
+            (user_id, peso) for user_id, peso in ((u, self._peso(u)) for u in self.elegibles) if peso
+        )
+
+    def random(self) -> Optional[int]:
+        self.refresh()
+        user_id = self.pesos.random()
+        if user_id is not None:
+            return user_id
+        # Nadie con peso (sin voluntarios ni activos): cualquiera que no se haya borrado
+        for _ in range(5):
+            user_id = self.elegibles.random()
+            if user_id is None or user_id not in self.excluidos:
+                return user_id
+        return None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "elegibles": len(self.elegibles),
+            "con_peso": len(self.pesos),
+            "activos": len(self.activos),
+            "enfriando": len(self.enfriamiento),
+            "excluidos": len(self.excluidos),
+            "pendientes": len(self._pendientes),
+            "elecciones": self.elecciones
+        }
+
+
+class PlayerPoolRegistry:
+    """Un GuildPlayerPool por servidor, construido desde la caché de miembros"""
+
+    def __init__(self, modo: str = PLAYER_POOL_MODE, archivo_voluntarios: str = PLAYER_OPTIN_FILE,
+                 archivo_excluidos: str = PLAYER_OPTOUT_FILE):
+        self.modo = modo
+        self.archivo_voluntarios = archivo_voluntarios
+        self.archivo_excluidos = archivo_excluidos
+        self._pools: Dict[int, GuildPlayerPool] = {}
+        self._voluntarios = self._cargar_ids(archivo_voluntarios)
+        self._excluidos = self._cargar_ids(archivo_excluidos)
+
+    @staticmethod
+    def is_eligible(member: discord.Member) -> bool:
+        return not member.bot and member.id != member.guild.me.id and not member.pending
+
+    @staticmethod
+    def _cargar_ids(archivo: str) -> Dict[int, Set[int]]:
+        try:
+            with open(archivo, 'r', encoding='utf-8') as f:
+                return {int(guild_id): set(ids) for guild_id, ids in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning("⚠️ Error cargando %s: %s", archivo, e)
+            return {}
+
+    @staticmethod
+    def _guardar_ids(archivo: str, por_servidor: Dict[int, Set[int]]):
+        datos = {str(guild_id): sorted(ids) for guild_id, ids in por_servidor.items() if ids}
+        tmp = f"{archivo}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
+        os.replace(tmp, archivo)
+
+    def build(self, guild: discord.Guild) -> GuildPlayerPool:
+        """(Re)construir el pool de un servidor desde guild.members, sin llamadas REST"""
+        if guild_settings:
+            # Otro proceso del clúster pudo cambiar las listas mientras este servidor no era nuestro
+            ajustes = guild_settings.get(guild.id)
+            if "voluntarios" in ajustes:
+                self._voluntarios[guild.id] = set(ajustes["voluntarios"])
+            if "excluidos" in ajustes:
+                self._excluidos[guild.id] = set(ajustes["excluidos"])
+        pool = GuildPlayerPool(guild.id, self.modo, self._excluidos.get(guild.id, ()))
+        for member in guild.members:
+            if self.is_eligible(member):
+                pool.elegibles.add(member.id)
+        for user_id in self._voluntarios.get(guild.id, ()):
+            if user_id in pool.elegibles:
+                pool.voluntarios.add(user_id)
+        # Árbol de pesos en O(n) en vez de n inserciones
+        pool.rebuild_weights()
+        self._pools[guild.id] = pool
+        logger.info("👥 Pool de jugadores de %s: %s elegibles", guild.name, len(pool.elegibles))
+        return pool
+
+    def get(self, guild_id: int) -> Optional[GuildPlayerPool]:
+        return self._pools.get(guild_id)
+
+    def forget(self, guild_id: int):
+        self._pools.pop(guild_id, None)
+
+    # Eventos del gateway
+    def on_member_join(self, member: discord.Member):
+        pool = self._pools.get(member.guild.id)
+        if pool and self.is_eligible(member):
+            pool.add(member.id)
+
+    def on_member_remove(self, member: discord.Member):
+        pool = self._pools.get(member.guild.id)
+        if pool:
+            pool.remove(member.id)
+            pool.voluntarios.discard(member.id)
+
+    def on_member_update(self, before: discord.Member, after: discord.Member):
+        pool = self._pools.get(after.guild.id)
+        if not pool:
+            return
+        if self.is_eligible(after):
+            if after.id in self._voluntarios.get(after.guild.id, ()):
+                pool.voluntarios.add(after.id)
+            pool.add(after.id)
+        else:
+            pool.remove(after.id)
+            pool.voluntarios.discard(after.id)
+
+    def mark_active(self, guild_id: int, user_id: int):
+        pool = self._pools.get(guild_id)
+        if pool:
+            pool.mark_active(user_id)
+
+    def set_opt_in(self, member: discord.Member, participar: bool):
+        """!jugar apunta como voluntario; !salir además pide que no le elijan en ningún modo"""
+        pool = self._pools.get(member.guild.id) or self.build(member.guild)
+        voluntarios = self._voluntarios.setdefault(member.guild.id, set())
+        excluidos = self._excluidos.setdefault(member.guild.id, set())
+        if participar:
+            voluntarios.add(member.id)
+            excluidos.discard(member.id)
+            if member.id in pool.elegibles:
+                pool.voluntarios.add(member.id)
+            pool.excluidos.discard(member.id)
+        else:
+            voluntarios.discard(member.id)
+            excluidos.add(member.id)
+            pool.voluntarios.discard(member.id)
+            pool.excluidos.add(member.id)
+        pool.update(member.id)
+        if guild_settings:
+            guild_settings.set(member.guild.id, voluntarios=sorted(voluntarios), excluidos=sorted(excluidos))
+            return
+        self._guardar_ids(self.archivo_voluntarios, self._voluntarios)
+        self._guardar_ids(self.archivo_excluidos, self._excluidos)
+
+    async def choose(self, guild: discord.Guild) -> Optional[discord.Member]:
+        """Elegir un jugador en O(log n), con más probabilidad para quien lleva más sin jugar"""
+        pool = self._pools.get(guild.id)
+        if pool is None:
+            if not guild.chunked:
+                await guild.chunk()
+            pool = self.build(guild)
+
+        # Pocos reintentos por si la caché va por detrás de algún evento
+        for _ in range(5):
+            user_id = pool.random()
+            if user_id is None:
+                return None
+            member = guild.get_member(user_id)
+            if member and self.is_eligible(member):
+                pool.picked(user_id)
+                return member
+            pool.remove(user_id)
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        totales = {"servidores": len(self._pools), "elegibles": 0, "activos": 0, "enfriando": 0,
+                   "excluidos": 0, "elecciones": 0}
+        for pool in self._pools.values():
+            datos = pool.stats()
+            for clave in ("elegibles", "activos", "enfriando", "excluidos", "elecciones"):
+                totales[clave] += datos[clave]
+        return totales
+
+
+# Pools compartidos por todas las partidas
+player_pools = PlayerPoolRegistry()
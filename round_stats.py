@@ -0,0 +1,356 @@
+# Estadísticas de rondas: diario de eventos de solo-añadir y agregados por columnas
+import asyncio
+import json
+import logging
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from config import ROUND_EVENTS_FILE, ROUND_STATS_FILE, ROUND_STATS_FLUSH_INTERVAL, ROUND_STATS_CHECKPOINT
+from scheduler import scheduler, Timer
+from word_selection import TIPOS_PALABRA
+
+logger = logging.getLogger(__name__)
+
+MAGIA = b"RST1"
+_CABECERA = struct.Struct("<4sI")
+
+# Columnas de cada tabla: nombre -> código de tipo de array ("I": 4 bytes, "Q": 8 bytes).
+# Fila de usuario: 12 columnas de 4 bytes + 1 de 8 = 56 bytes, más la entrada del
+# índice (id -> fila, unos 120 bytes en CPython): ~180 bytes por usuario, sin
+# importar cuántas rondas haya jugado. Los tiempos van en milisegundos.
+CAMPOS_USUARIO = {
+    "rondas": "I", "aciertos": "I", "fallos": "I", "tiempo_ms": "Q", "mejor_ms": "I",
+    "racha": "I", "racha_max": "I",
+    **{f"{campo}_{tipo}": "I" for tipo in TIPOS_PALABRA for campo in ("rondas", "aciertos")}
+}
+# Fila de palabra: 20 bytes más el índice (la cadena y su entrada, ~100-150 bytes)
+CAMPOS_PALABRA = {"rondas": "I", "aciertos": "I", "fallos": "I", "tiempo_ms": "Q"}
+
+
+class UserRoundStats(NamedTuple):
+    rondas: int
+    aciertos: int
+    fallos: int           # Respuestas incorrectas antes de acertar o agotar el tiempo
+    tiempo_medio: float   # Segundos hasta acertar, de media
+    mejor_tiempo: Optional[float]
+    racha: int
+    racha_max: int
+    por_tipo: Dict[str, Tuple[int, int]]   # tipo -> (rondas, aciertos)
+
+    @property
+    def agotadas(self) -> int:
+        return self.rondas - self.aciertos
+
+    @property
+    def precision(self) -> float:
+        return self.aciertos / self.rondas if self.rondas else 0.0
+
+
+class WordRoundStats(NamedTuple):
+    rondas: int
+    aciertos: int
+    fallos: int
+    tiempo_medio: float
+
+    @property
+    def precision(self) -> float:
+        return self.aciertos / self.rondas if self.rondas else 0.0
+
+
+class ColumnTable:
+    """Contadores en columnas (un array compacto por campo) con un índice clave -> fila.
+
+    Leer o actualizar una fila es O(1); una fila nueva añade un elemento a cada
+    columna. No hay objetos por fila más allá de la entrada del índice.
+    """
+
+    def __init__(self, campos: Dict[str, str]):
+        self.campos = campos
+        self.indice: Dict[Hashable, int] = {}
+        self.columnas: Dict[str, array] = {nombre: array(tipo) for nombre, tipo in campos.items()}
+
+    def __len__(self) -> int:
+        return len(self.indice)
+
+    def fila(self, clave: Hashable) -> int:
+        """Fila de la clave, creándola a ceros si no existe"""
+        i = self.indice.get(clave)
+        if i is None:
+            i = self.indice[clave] = len(self.indice)
+            for columna in self.columnas.values():
+                columna.append(0)
+        return i
+
+    def get(self, clave: Hashable) -> Optional[Dict[str, int]]:
+        i = self.indice.get(clave)
+        if i is None:
+            return None
+        return {nombre: columna[i] for nombre, columna in self.columnas.items()}
+
+    def nbytes(self) -> int:
+        return sum(len(columna) * columna.itemsize for columna in self.columnas.values())
+
+    def columnas_bytes(self) -> List[bytes]:
+        return [columna.tobytes() for columna in self.columnas.values()]
+
+    def cargar_columnas(self, claves: List[Hashable], datos: memoryview, intercambiar: bool) -> int:
+        """Rellenar desde columnas_bytes() concatenadas; devuelve los bytes consumidos"""
+        self.indice = {clave: i for i, clave in enumerate(claves)}
+        pos = 0
+        for nombre, tipo in self.campos.items():
+            columna = array(tipo)
+            tamano = len(claves) * columna.itemsize
+            columna.frombytes(datos[pos:pos + tamano])
+            if intercambiar:
+                columna.byteswap()
+            self.columnas[nombre] = columna
+            pos += tamano
+        return pos
+
+
+class RoundStats:
+    """Resultado de cada ronda en un diario JSONL de solo-añadir, más agregados por usuario y palabra.
+
+    record() actualiza los agregados en el sitio y deja el evento pendiente;
+    cada ROUND_STATS_FLUSH_INTERVAL se añaden al diario en lote. Cada
+    ROUND_STATS_CHECKPOINT eventos los agregados se vuelcan a un binario con
+    la posición del diario que cubren, así al arrancar solo se reaplica la cola
+    del diario en vez de toda la historia.
+    """
+
+    def __init__(self, diario: Optional[str] = ROUND_EVENTS_FILE, archivo: Optional[str] = ROUND_STATS_FILE,
+                 intervalo: float = ROUND_STATS_FLUSH_INTERVAL, cada: int = ROUND_STATS_CHECKPOINT):
+        self.diario = diario
+        self.archivo = archivo
+        self.intervalo = intervalo
+        self.cada = cada
+        self.usuarios = ColumnTable(CAMPOS_USUARIO)
+        self.palabras = ColumnTable(CAMPOS_PALABRA)
+        self._pendientes: List[dict] = []
+        self._desde_checkpoint = 0
+        self._lock = asyncio.Lock()
+        self._timer: Optional[Timer] = None
+
+        # Métricas
+        self.eventos = 0
+        self.reaplicados = 0
+        self.checkpoints = 0
+        self.carga_ms = 0.0
+
+        if diario:
+            self._cargar()
+
+    @staticmethod
+    def _clave_palabra(palabra: str) -> str:
+        return palabra.strip().casefold()
+
+    # ---- Agregados ----
+
+    def _aplicar(self, evento: dict):
+        acierto, ms, fallos, tipo = evento["ok"], evento.get("ms") or 0, evento.get("n", 0), evento.get("k")
+        u = self.usuarios.fila(evento["u"])
+        c = self.usuarios.columnas
+        c["rondas"][u] += 1
+        c["fallos"][u] += fallos
+        if tipo in TIPOS_PALABRA:
+            c[f"rondas_{tipo}"][u] += 1
+        if acierto:
+            c["aciertos"][u] += 1
+            c["tiempo_ms"][u] += ms
+            if not c["mejor_ms"][u] or ms < c["mejor_ms"][u]:
+                # 0 significa "sin aciertos"; un acierto instantáneo cuenta como 1 ms
+                c["mejor_ms"][u] = max(1, ms)
+            c["racha"][u] += 1
+            c["racha_max"][u] = max(c["racha_max"][u], c["racha"][u])
+            if tipo in TIPOS_PALABRA:
+                c[f"aciertos_{tipo}"][u] += 1
+        else:
+            c["racha"][u] = 0
+
+        p = self.palabras.fila(self._clave_palabra(evento["w"]))
+        c = self.palabras.columnas
+        c["rondas"][p] += 1
+        c["fallos"][p] += fallos
+        if acierto:
+            c["aciertos"][p] += 1
+            c["tiempo_ms"][p] += ms
+
+    def record(self, guild_id: int, user_id: int, palabra: str, tipo: Optional[str],
+               acierto: bool, segundos: Optional[float] = None, fallos: int = 0):
+        """Anotar el final de una ronda: acierto tras `segundos`, o tiempo agotado"""
+        evento = {"t": round(time.time(), 1), "g": guild_id, "u": user_id, "w": palabra, "k": tipo,
+                  "ok": acierto, "ms": max(0, round(segundos * 1000)) if acierto and segundos is not None else None,
+                  "n": fallos}
+        self._aplicar(evento)
+        self.eventos += 1
+        if self.diario:
+            self._pendientes.append(evento)
+
+    def user(self, user_id: int) -> Optional[UserRoundStats]:
+        fila = self.usuarios.get(user_id)
+        if fila is None:
+            return None
+        return UserRoundStats(
+            rondas=fila["rondas"], aciertos=fila["aciertos"], fallos=fila["fallos"],
+            tiempo_medio=fila["tiempo_ms"] / fila["aciertos"] / 1000 if fila["aciertos"] else 0.0,
+            mejor_tiempo=fila["mejor_ms"] / 1000 if fila["mejor_ms"] else None,
+            racha=fila["racha"], racha_max=fila["racha_max"],
+            por_tipo={tipo: (fila[f"rondas_{tipo}"], fila[f"aciertos_{tipo}"])
+                      for tipo in TIPOS_PALABRA if fila[f"rondas_{tipo}"]}
+        )
+
+    def word(self, palabra: str) -> Optional[WordRoundStats]:
+        fila = self.palabras.get(self._clave_palabra(palabra))
+        if fila is None:
+            return None
+        return WordRoundStats(
+            rondas=fila["rondas"], aciertos=fila["aciertos"], fallos=fila["fallos"],
+            tiempo_medio=fila["tiempo_ms"] / fila["aciertos"] / 1000 if fila["aciertos"] else 0.0
+        )
+
+    # ---- Persistencia ----
+
+    def _capturar(self) -> Tuple[bytes, List[str], List[bytes]]:
+        """Copia coherente de los agregados, tomada en el loop entre dos record()"""
+        ids = array("q", self.usuarios.indice).tobytes()
+        return ids, list(self.palabras.indice), self.usuarios.columnas_bytes() + self.palabras.columnas_bytes()
+
+    def _escribir(self, lote: List[dict], captura: Optional[tuple]):
+        with open(self.diario, 'ab') as f:
+            for evento in lote:
+                f.write(json.dumps(evento, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            posicion = f.tell()
+        if captura is None or not self.archivo:
+            return
+
+        try:
+            self._escribir_checkpoint(posicion, *captura)
+            self.checkpoints += 1
+        except OSError as e:
+            # El diario ya tiene los eventos: el próximo arranque solo reaplicará más
+            logger.warning("⚠️ Error guardando checkpoint de estadísticas: %s", e)
+
+    def _escribir_checkpoint(self, posicion: int, ids: bytes, palabras: List[str], columnas: List[bytes]):
+        cabecera = json.dumps({
+            "posicion": posicion, "orden": sys.byteorder, "usuarios": len(ids) // 8, "palabras": palabras,
+            "campos_usuario": CAMPOS_USUARIO, "campos_palabra": CAMPOS_PALABRA
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        tmp = f"{self.archivo}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(_CABECERA.pack(MAGIA, len(cabecera)))
+            f.write(cabecera)
+            f.write(ids)
+            for columna in columnas:
+                f.write(columna)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.archivo)
+
+    def _leer_checkpoint(self) -> int:
+        """Cargar los agregados guardados; devuelve la posición del diario que cubren (0 si no hay)"""
+        try:
+            with open(self.archivo, 'rb') as f:
+                datos = memoryview(f.read())
+        except (FileNotFoundError, TypeError):
+            return 0
+        try:
+            magia, largo = _CABECERA.unpack_from(datos)
+            if magia != MAGIA:
+                raise ValueError("formato desconocido")
+            cabecera = json.loads(bytes(datos[_CABECERA.size:_CABECERA.size + largo]))
+            if cabecera["campos_usuario"] != CAMPOS_USUARIO or cabecera["campos_palabra"] != CAMPOS_PALABRA:
+                # Columnas distintas: se reconstruye todo desde el diario
+                logger.info("📈 Columnas de estadísticas cambiadas, reconstruyendo desde el diario")
+                return 0
+            intercambiar = cabecera["orden"] != sys.byteorder
+            pos = _CABECERA.size + largo
+            ids = array("q")
+            ids.frombytes(datos[pos:pos + cabecera["usuarios"] * 8])
+            if intercambiar:
+                ids.byteswap()
+            pos += len(ids) * 8
+            pos += self.usuarios.cargar_columnas(ids.tolist(), datos[pos:], intercambiar)
+            pos += self.palabras.cargar_columnas(cabecera["palabras"], datos[pos:], intercambiar)
+            if pos != len(datos):
+                raise ValueError("tamaño inesperado")
+            return cabecera["posicion"]
+        except (ValueError, KeyError, struct.error) as e:
+            logger.warning("⚠️ Checkpoint de estadísticas ilegible, reconstruyendo desde el diario: %s", e)
+            self.usuarios = ColumnTable(CAMPOS_USUARIO)
+            self.palabras = ColumnTable(CAMPOS_PALABRA)
+            return 0
+
+    def _cargar(self):
+        inicio = time.perf_counter()
+        posicion = self._leer_checkpoint()
+        try:
+            with open(self.diario, 'rb+') as f:
+                f.seek(posicion)
+                for linea in f:
+                    try:
+                        if not linea.endswith(b"\n"):
+                            raise ValueError("línea cortada")
+                        self._aplicar(json.loads(linea))
+                    except (ValueError, KeyError):
+                        # Escritura interrumpida: lo anterior es válido y lo nuevo irá a continuación
+                        f.truncate(posicion)
+                        break
+                    posicion += len(linea)
+                    self.reaplicados += 1
+        except FileNotFoundError:
+            pass
+        self._desde_checkpoint = self.reaplicados
+        self.carga_ms = (time.perf_counter() - inicio) * 1000
+        if self.usuarios or self.reaplicados:
+            logger.info("📈 Estadísticas de %s jugadores y %s palabras cargadas en %.1f ms (%s eventos reaplicados)",
+                        len(self.usuarios), len(self.palabras), self.carga_ms, self.reaplicados)
+
+    async def flush(self, checkpoint: bool = False):
+        async with self._lock:
+            lote, self._pendientes = self._pendientes, []
+            if not lote and not (checkpoint and self._desde_checkpoint):
+                return
+            self._desde_checkpoint += len(lote)
+            captura = None
+            if self._desde_checkpoint >= self.cada or checkpoint:
+                captura = self._capturar()
+                self._desde_checkpoint = 0
+            try:
+                await asyncio.to_thread(self._escribir, lote, captura)
+            except OSError as e:
+                # Se reintenta en el siguiente lote
+                self._pendientes[:0] = lote
+                self._desde_checkpoint = self.cada
+                logger.error("❌ Error guardando estadísticas de rondas: %s", e)
+
+    def start(self):
+        if self.diario and self._timer is None:
+            self._timer = scheduler.call_every(self.intervalo, self.flush)
+
+    async def stop(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self.diario:
+            await self.flush(checkpoint=True)
+
+    def stats(self) -> dict:
+        return {
+            "usuarios": len(self.usuarios),
+            "palabras": len(self.palabras),
+            "eventos": self.eventos,
+            "pendientes": len(self._pendientes),
+            "bytes": self.usuarios.nbytes() + self.palabras.nbytes(),
+            "checkpoints": self.checkpoints,
+            "reaplicados": self.reaplicados,
+            "carga_ms": self.carga_ms
+        }
+
+
+round_stats = RoundStats()
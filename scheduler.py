@@ -0,0 +1,173 @@
+# Planificador central de temporizadores sobre el reloj del event loop
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[..., Awaitable[Any]]
+
+
+class Timer:
+    """Un plazo (o intervalo periódico) registrado en el planificador.
+
+    Cancelar es O(1): el temporizador se marca y el montículo lo descarta al
+    llegar a la cima, sin buscarlo.
+    """
+
+    __slots__ = ("cuando", "intervalo", "callback", "args", "cancelado", "_planificador", "_ejecucion")
+
+    def __init__(self, planificador: "TimerScheduler", cuando: float, callback: Callback,
+                 args: Tuple[Any, ...], intervalo: Optional[float] = None):
+        self._planificador = planificador
+        self.cuando = cuando
+        self.intervalo = intervalo
+        self.callback = callback
+        self.args = args
+        self.cancelado = False
+        self._ejecucion: Optional[asyncio.Task] = None
+
+    @property
+    def activo(self) -> bool:
+        return not self.cancelado
+
+    def restante(self) -> float:
+        """Segundos hasta el próximo disparo (0 si ya venció)"""
+        return max(0.0, self.cuando - self._planificador.time())
+
+    def cancel(self):
+        if not self.cancelado:
+            self.cancelado = True
+            self._planificador._cancelado(self)
+
+
+class TimerScheduler:
+    """Montículo de plazos con una sola tarea que duerme hasta el más próximo.
+
+    Sustituye a una tarea con asyncio.sleep por temporizador: miles de sesiones
+    comparten una tarea y un montículo ordenado por `loop.time()`. Los
+    intervalos periódicos se reprograman sobre su plazo anterior (no sobre
+    cuándo terminó el callback), así que no acumulan deriva.
+    """
+
+    def __init__(self):
+        self._monticulo: List[Tuple[float, int, Timer]] = []
+        self._secuencia = itertools.count()
+        self._cancelados = 0
+        self._despertar = asyncio.Event()
+        self._tarea: Optional[asyncio.Task] = None
+        self._ejecuciones: Set[asyncio.Task] = set()
+
+        # Métricas
+        self.disparos = 0
+        self.saltos = 0
+        self.retraso_maximo = 0.0
+
+    @staticmethod
+    def time() -> float:
+        return asyncio.get_running_loop().time()
+
+    def start(self):
+        """Arrancar la tarea del planificador (requiere un loop en ejecución)"""
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._tarea:
+            self._tarea.cancel()
+            await asyncio.gather(self._tarea, return_exceptions=True)
+            self._tarea = None
+        for tarea in list(self._ejecuciones):
+            tarea.cancel()
+        await asyncio.gather(*self._ejecuciones, return_exceptions=True)
+
+    def call_at(self, cuando: float, callback: Callback, *args) -> Timer:
+        """Ejecutar `await callback(*args)` en el instante `cuando` del reloj del loop"""
+        return self._push(Timer(self, cuando, callback, args))
+
+    def call_later(self, retraso: float, callback: Callback, *args) -> Timer:
+        return self.call_at(self.time() + retraso, callback, *args)
+
+    def call_every(self, intervalo: float, callback: Callback, *args, primera: Optional[float] = None) -> Timer:
+        """Ejecutar `callback` cada `intervalo` segundos; el primero tras `primera` (por defecto un intervalo)"""
+        retraso = intervalo if primera is None else primera
+        return self._push(Timer(self, self.time() + retraso, callback, args, intervalo=intervalo))
+
+    def pending(self) -> int:
+        """Temporizadores programados que no se han cancelado"""
+        return len(self._monticulo) - self._cancelados
+
+    def stats(self) -> dict:
+        return {
+            "pendientes": self.pending(),
+            "en_ejecucion": len(self._ejecuciones),
+            "disparos": self.disparos,
+            "saltos": self.saltos,
+            "retraso_maximo": self.retraso_maximo
+        }
+
+    def _push(self, timer: Timer) -> Timer:
+        heapq.heappush(self._monticulo, (timer.cuando, next(self._secuencia), timer))
+        # Solo hay que despertar al bucle si el nuevo plazo es ahora el más próximo
+        if self._monticulo[0][2] is timer:
+            self._despertar.set()
+        return timer
+
+    def _cancelado(self, timer: Timer):
+        self._cancelados += 1
+        # Compactar si la mayoría del montículo son plazos muertos
+        if self._cancelados > 64 and self._cancelados * 2 > len(self._monticulo):
+            self._monticulo = [item for item in self._monticulo if not item[2].cancelado]
+            heapq.heapify(self._monticulo)
+            self._cancelados = 0
+
+    def _dispatch(self, timer: Timer, ahora: float):
+        if timer._ejecucion and not timer._ejecucion.done():
+            # La ejecución anterior de un intervalo sigue en curso: no se solapan
+            self.saltos += 1
+            return
+        self.disparos += 1
+        self.retraso_maximo = max(self.retraso_maximo, ahora - timer.cuando)
+        tarea = asyncio.create_task(timer.callback(*timer.args))
+        timer._ejecucion = tarea
+        self._ejecuciones.add(tarea)
+        tarea.add_done_callback(self._fin_ejecucion)
+
+    def _fin_ejecucion(self, tarea: asyncio.Task):
+        self._ejecuciones.discard(tarea)
+        if not tarea.cancelled() and tarea.exception() is not None:
+            logger.error("⏰ Error en temporizador: %s", tarea.exception(), exc_info=tarea.exception())
+
+    async def _run(self):
+        while True:
+            self._despertar.clear()
+            ahora = self.time()
+            while self._monticulo and self._monticulo[0][0] <= ahora:
+                _, _, timer = heapq.heappop(self._monticulo)
+                if timer.cancelado:
+                    self._cancelados -= 1
+                    continue
+                self._dispatch(timer, ahora)
+                if timer.intervalo:
+                    # Siguiente plazo sobre el anterior; si nos retrasamos, saltar periodos perdidos
+                    timer.cuando += timer.intervalo
+                    if timer.cuando <= ahora:
+                        perdidos = int((ahora - timer.cuando) // timer.intervalo) + 1
+                        timer.cuando += perdidos * timer.intervalo
+                    heapq.heappush(self._monticulo, (timer.cuando, next(self._secuencia), timer))
+                else:
+                    # Un plazo único que ya disparó deja de contar como pendiente
+                    timer.cancelado = True
+
+            espera = self._monticulo[0][0] - ahora if self._monticulo else None
+            try:
+                async with asyncio.timeout(espera):
+                    await self._despertar.wait()
+            except TimeoutError:
+                pass
+
+
+# Planificador compartido por todas las sesiones
+scheduler = TimerScheduler()
@@ -0,0 +1,291 @@
+# Almacenamiento de puntuaciones con escritura diferida y a prueba de caídas
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from typing import Dict, Optional, Tuple
+
+from config import (
+    SCORE_BACKEND, SCORES_FILE, SCORES_BIN_FILE, SCORES_JOURNAL_FILE, SCORES_DB_FILE,
+    SCORE_FLUSH_INTERVAL, SCORE_COMPACT_THRESHOLD
+)
+
+from cluster import owns_guild
+from score_table import (
+    LEGACY_GUILD, ScoreTable, write_tables, read_tables, read_json_scores, parse_key, format_key
+)
+from shared_state import SharedBackend, shared_backend
+
+logger = logging.getLogger(__name__)
+
+# (guild_id, user_id) -> puntuación nueva, o None si se borra
+Lote = Dict[Tuple[int, int], Optional[int]]
+
+
+def _aplicar(tablas: Dict[int, ScoreTable], lote: Lote):
+    for (guild_id, user_id), score in lote.items():
+        tabla = tablas.get(guild_id)
+        if score is None:
+            if tabla is not None:
+                tabla.pop(user_id)
+            continue
+        if tabla is None:
+            tabla = tablas[guild_id] = ScoreTable()
+        tabla[user_id] = score
+
+
+def _lote_de(tablas: Dict[int, ScoreTable]) -> Lote:
+    return {(guild_id, user_id): score for guild_id, tabla in tablas.items() for user_id, score in tabla.items()}
+
+
+class ScoreStore:
+    """Base de los almacenes de puntuaciones.
+
+    Las claves son enteros (guild_id, user_id) y load() devuelve una
+    ScoreTable por servidor. record() solo anota el cambio en memoria; una
+    tarea en segundo plano agrupa los cambios y los escribe fuera del event
+    loop cada SCORE_FLUSH_INTERVAL. Las subclases implementan _load y _write_batch.
+    """
+
+    def __init__(self, intervalo: float = SCORE_FLUSH_INTERVAL):
+        self.intervalo = intervalo
+        self._pendientes: Lote = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.escrituras = 0
+
+    def load(self) -> Dict[int, ScoreTable]:
+        tablas = self._load()
+        _aplicar(tablas, self._pendientes)
+        return tablas
+
+    def record(self, guild_id: int, user_id: int, score: int):
+        self._pendientes[guild_id, user_id] = score
+
+    def discard(self, guild_id: int, user_id: int):
+        """Borrar una puntuación; en el lote va como None"""
+        self._pendientes[guild_id, user_id] = None
+
+    async def flush(self):
+        async with self._lock:
+            lote, self._pendientes = self._pendientes, {}
+            if lote:
+                await asyncio.to_thread(self._write_batch, lote)
+                self.escrituras += 1
+
+    def start(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("❌ Error guardando puntuaciones: %s", e)
+
+    async def close(self):
+        """Parar la tarea de fondo y volcar lo pendiente"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+
+    def _load(self) -> Dict[int, ScoreTable]:
+        raise NotImplementedError
+
+    def _write_batch(self, lote: Lote):
+        raise NotImplementedError
+
+
+class JournalScoreStore(ScoreStore):
+    """scores.bin (tablas compactas, ver score_table) como instantánea más un diario de solo-añadir.
+
+    Cada lote se añade al diario con fsync; cuando el diario crece más de
+    SCORE_COMPACT_THRESHOLD líneas se reescribe la instantánea con reemplazo
+    atómico y el diario se vacía. Una última línea cortada por una caída se
+    recorta al arrancar, para que los lotes siguientes no queden pegados a ella.
+    Si aún no hay scores.bin se importa el scores.json antiguo y se compacta en
+    el momento, así la migración ocurre una sola vez.
+
+    El almacén no guarda las tablas en memoria: load() las lee del disco y se
+    las queda el ranking, y al compactar se vuelven a leer (instantánea más
+    diario) en el hilo de escritura. Así cada jugador ocupa una sola ScoreTable.
+    """
+
+    def __init__(self, archivo: str = SCORES_BIN_FILE, diario: str = SCORES_JOURNAL_FILE,
+                 legado: str = SCORES_FILE, umbral_compactacion: int = SCORE_COMPACT_THRESHOLD, **kwargs):
+        super().__init__(**kwargs)
+        self.archivo = archivo
+        self.diario = diario
+        self.umbral_compactacion = umbral_compactacion
+        self._lineas_diario = 0
+        if os.path.exists(archivo):
+            # Solo para contar las líneas del diario y recortar una cortada antes de añadir nada
+            self._leer_diario()
+            return
+        antiguas = read_json_scores(legado)
+        if antiguas:
+            self._compactar(antiguas)
+            logger.info("💾 Migradas %s puntuaciones desde %s a %s",
+                        sum(len(tabla) for tabla in antiguas.values()), legado, archivo)
+        else:
+            self._leer_diario()
+
+    def _leer_diario(self) -> Lote:
+        lote: Lote = {}
+        posicion = 0
+        self._lineas_diario = 0
+        try:
+            with open(self.diario, 'rb+') as f:
+                for linea in f:
+                    try:
+                        if not linea.endswith(b"\n"):
+                            raise ValueError("línea cortada")
+                        cambio = json.loads(linea)
+                        # Las líneas antiguas llevan la clave de texto "guild:user" en "u"
+                        clave = (cambio["g"], cambio["u"]) if "g" in cambio else parse_key(cambio["u"])
+                        lote[clave] = cambio["s"]
+                    except (ValueError, KeyError, TypeError):
+                        # Escritura interrumpida: lo anterior es válido y los lotes nuevos irán a continuación
+                        logger.warning("⚠️ %s cortado en el byte %s: se descarta el resto", self.diario, posicion)
+                        f.truncate(posicion)
+                        break
+                    posicion += len(linea)
+                    self._lineas_diario += 1
+        except FileNotFoundError:
+            pass
+        return lote
+
+    def _load(self) -> Dict[int, ScoreTable]:
+        try:
+            tablas = read_tables(self.archivo)
+        except FileNotFoundError:
+            tablas = {}
+        _aplicar(tablas, self._leer_diario())
+        return tablas
+
+    def _write_batch(self, lote: Lote):
+        with open(self.diario, 'a', encoding='utf-8') as f:
+            for (guild_id, user_id), score in lote.items():
+                f.write(json.dumps({"g": guild_id, "u": user_id, "s": score}, separators=(',', ':')) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._lineas_diario += len(lote)
+
+        if self._lineas_diario >= self.umbral_compactacion:
+            self._compactar()
+
+    def _compactar(self, base: Optional[Dict[int, ScoreTable]] = None):
+        """Reescribir la instantánea con todo lo del diario (sobre `base` al migrar) y vaciar el diario"""
+        if base is None:
+            tablas = self._load()
+        else:
+            tablas = base
+            _aplicar(tablas, self._leer_diario())
+        write_tables(self.archivo, {guild_id: tabla for guild_id, tabla in tablas.items() if tabla})
+        open(self.diario, 'w').close()
+        self._lineas_diario = 0
+
+
+class SqliteScoreStore(ScoreStore):
+    """Puntuaciones en SQLite en modo WAL; importa scores.json la primera vez"""
+
+    def __init__(self, archivo: str = SCORES_DB_FILE, legado: str = SCORES_FILE, **kwargs):
+        super().__init__(**kwargs)
+        # Varios procesos del clúster pueden compartir el archivo: esperar al bloqueo en vez de fallar
+        self._conn = sqlite3.connect(archivo, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores (user_id TEXT PRIMARY KEY, score INTEGER NOT NULL)"
+        )
+        vacia = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] == 0
+        if vacia:
+            antiguas = _lote_de(read_json_scores(legado))
+            if antiguas:
+                self._write_batch(antiguas)
+                logger.info("💾 Migradas %s puntuaciones desde %s", len(antiguas), legado)
+
+    def _load(self) -> Dict[int, ScoreTable]:
+        # La columna user_id guarda la clave de texto "guild:user" de siempre
+        tablas: Dict[int, ScoreTable] = {}
+        _aplicar(tablas, {parse_key(clave): score
+                          for clave, score in self._conn.execute("SELECT user_id, score FROM scores")})
+        return tablas
+
+    def _write_batch(self, lote: Lote):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO scores (user_id, score) VALUES (?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET score = excluded.score",
+                [(format_key(*clave), score) for clave, score in lote.items() if score is not None]
+            )
+            self._conn.executemany(
+                "DELETE FROM scores WHERE user_id = ?",
+                [(format_key(*clave),) for clave, score in lote.items() if score is None]
+            )
+
+    async def close(self):
+        await super().close()
+        self._conn.close()
+
+
+class SharedScoreStore(ScoreStore):
+    """Puntuaciones en el backend compartido del clúster (CLUSTER_BACKEND), un hash por servidor.
+
+    Cada servidor vive en un solo proceso (el de su shard), que es el único que
+    escribe su hash; al arrancar, cada proceso lee solo los servidores que le
+    tocan. Las puntuaciones antiguas sin servidor van al hash del servidor 0.
+    """
+
+    PREFIJO = "puntuaciones:"
+
+    def __init__(self, backend: Optional[SharedBackend] = None, legado: str = SCORES_FILE, **kwargs):
+        super().__init__(**kwargs)
+        self.backend = backend or shared_backend
+        if self.backend is None:
+            raise ValueError('SCORE_BACKEND="shared" necesita CLUSTER_BACKEND')
+        if not self.backend.keys(self.PREFIJO):
+            antiguas = _lote_de(read_json_scores(legado))
+            if antiguas:
+                self._write_batch(antiguas)
+                logger.info("💾 Migradas %s puntuaciones desde %s", len(antiguas), legado)
+
+    def _load(self) -> Dict[int, ScoreTable]:
+        tablas = {}
+        for hash_ in self.backend.keys(self.PREFIJO):
+            guild_id = int(hash_[len(self.PREFIJO):])
+            if guild_id != LEGACY_GUILD and not owns_guild(guild_id):
+                continue
+            tablas[guild_id] = ScoreTable((int(user_id), int(score))
+                                          for user_id, score in self.backend.hgetall(hash_).items())
+        return tablas
+
+    def _write_batch(self, lote: Lote):
+        por_hash: Dict[str, Dict[str, Optional[int]]] = {}
+        for (guild_id, user_id), score in lote.items():
+            por_hash.setdefault(f"{self.PREFIJO}{guild_id}", {})[str(user_id)] = score
+        for hash_, cambios in por_hash.items():
+            self.backend.hset(hash_, {u: str(s) for u, s in cambios.items() if s is not None})
+            self.backend.hdel(hash_, [u for u, s in cambios.items() if s is None])
+
+
+BACKENDS = {
+    "journal": JournalScoreStore,
+    "sqlite": SqliteScoreStore,
+    "shared": SharedScoreStore
+}
+
+
+def crear_score_store(backend: str = SCORE_BACKEND) -> ScoreStore:
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de puntuaciones desconocido: {backend}")
+    return BACKENDS[backend]()
+
+
+# Almacén compartido por todo el bot
+score_store = crear_score_store()
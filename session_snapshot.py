@@ -0,0 +1,134 @@
+# Instantáneas periódicas de las partidas en curso para reanudarlas tras un reinicio
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+import discord
+
+from config import SESSION_SNAPSHOT_FILE, SESSION_SNAPSHOT_INTERVAL, SESSION_SNAPSHOT_MAX_AGE
+from scheduler import scheduler, Timer
+from sessions import sessions, SessionRegistry
+
+logger = logging.getLogger(__name__)
+
+VERSION = 1
+
+
+def _escritura_atomica(archivo: str, datos: bytes):
+    tmp = f"{archivo}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(datos)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, archivo)
+
+
+class SessionSnapshotter:
+    """Guarda cada pocos segundos el estado de todas las sesiones activas.
+
+    La instantánea es un único JSON compacto que solo se reescribe si ha
+    cambiado; al arrancar se lee de una vez y cada sesión se reanuda con su
+    ronda (tiempo restante incluido) y su calendario de rondas original.
+    """
+
+    def __init__(self, registro: SessionRegistry, archivo: str = SESSION_SNAPSHOT_FILE,
+                 intervalo: float = SESSION_SNAPSHOT_INTERVAL, max_edad: float = SESSION_SNAPSHOT_MAX_AGE):
+        self.registro = registro
+        self.archivo = archivo
+        self.intervalo = intervalo
+        self.max_edad = max_edad
+        self._timer: Optional[Timer] = None
+        self._ultimo: Optional[bytes] = None
+        self.restaurado = False
+
+        # Métricas
+        self.escrituras = 0
+        self.sesiones_guardadas = 0
+        self.sesiones_restauradas = 0
+        self.rondas_perdidas = 0
+        self.carga_ms = 0.0
+        self.arranque_s: Optional[float] = None
+
+    def start(self):
+        if self._timer is None:
+            self._timer = scheduler.call_every(self.intervalo, self.save)
+
+    async def stop(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        await self.save()
+
+    def capture(self) -> bytes:
+        estados = [estado for estado in (sesion.snapshot() for sesion in self.registro) if estado]
+        self.sesiones_guardadas = len(estados)
+        return json.dumps({"v": VERSION, "sesiones": estados}, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+    async def save(self):
+        # Hasta que se haya intentado restaurar, no pisar la instantánea anterior con una vacía
+        if not self.restaurado:
+            return
+        datos = self.capture()
+        if datos == self._ultimo:
+            return
+        try:
+            await asyncio.to_thread(_escritura_atomica, self.archivo, datos)
+            self._ultimo = datos
+            self.escrituras += 1
+        except OSError as e:
+            logger.warning("⚠️ Error guardando instantánea de sesiones: %s", e)
+
+    def restore(self, bot: discord.Client) -> int:
+        """Reanudar las sesiones guardadas; solo la primera vez que se llama"""
+        if self.restaurado:
+            return 0
+        self.restaurado = True
+        inicio = time.perf_counter()
+
+        try:
+            edad = time.time() - os.path.getmtime(self.archivo)
+            with open(self.archivo, 'rb') as f:
+                datos = json.loads(f.read())
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ Instantánea de sesiones ilegible: %s", e)
+            return 0
+
+        if datos.get("v") != VERSION or edad > self.max_edad:
+            logger.info("💾 Instantánea de sesiones descartada (versión %s, %.0f s de antigüedad)", datos.get("v"), edad)
+            return 0
+
+        for estado in datos.get("sesiones", []):
+            guild = bot.get_guild(estado["guild"])
+            channel = guild.get_channel(estado["canal"]) if guild else None
+            if channel is None:
+                continue
+            sesion = self.registro.get_or_create(channel, guild)
+            if sesion.is_game_active:
+                continue
+            if not sesion.restore(estado):
+                self.rondas_perdidas += 1
+            self.sesiones_restauradas += 1
+
+        self.carga_ms = (time.perf_counter() - inicio) * 1000
+        logger.info("💾 %s sesiones reanudadas en %.1f ms (%s rondas sin jugador)",
+                    self.sesiones_restauradas, self.carga_ms, self.rondas_perdidas)
+        return self.sesiones_restauradas
+
+    def stats(self) -> dict:
+        return {
+            "guardadas": self.sesiones_guardadas,
+            "escrituras": self.escrituras,
+            "restauradas": self.sesiones_restauradas,
+            "rondas_perdidas": self.rondas_perdidas,
+            "carga_ms": self.carga_ms,
+            "arranque_s": self.arranque_s
+        }
+
+
+session_snapshot = SessionSnapshotter(sessions)
@@ -0,0 +1,83 @@
+# Registro de partidas por servidor y canal
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import discord
+
+from game_manager import GameManager
+from outbound import outbound
+
+logger = logging.getLogger(__name__)
+
+SessionKey = Tuple[int, int]
+
+
+class SessionRegistry:
+    """Una GameManager por (guild_id, channel_id).
+
+    Cada sesión tiene su propio estado de ronda, temporizadores y tipo de
+    palabras; on_message la encuentra con una sola búsqueda en diccionario.
+    """
+
+    def __init__(self):
+        self._sesiones: Dict[SessionKey, GameManager] = {}
+
+    def __len__(self) -> int:
+        return len(self._sesiones)
+
+    def __iter__(self) -> Iterator[GameManager]:
+        return iter(list(self._sesiones.values()))
+
+    def get(self, guild_id: Optional[int], channel_id: int) -> Optional[GameManager]:
+        if guild_id is None:
+            return None
+        return self._sesiones.get((guild_id, channel_id))
+
+    def get_for_message(self, message: discord.Message) -> Optional[GameManager]:
+        """Sesión activa del canal del mensaje, o None si no hay partida ahí"""
+        if message.guild is None:
+            return None
+        sesion = self._sesiones.get((message.guild.id, message.channel.id))
+        return sesion if sesion and sesion.is_game_active else None
+
+    def get_or_create(self, channel: discord.TextChannel, guild: discord.Guild) -> GameManager:
+        clave = (guild.id, channel.id)
+        sesion = self._sesiones.get(clave)
+        if sesion is None:
+            sesion = self._sesiones[clave] = GameManager(channel=channel, guild=guild)
+            logger.info("🆕 Sesión creada en %s #%s (%s sesiones)", guild.name, channel.name, len(self._sesiones))
+        return sesion
+
+    def remove(self, guild_id: int, channel_id: int) -> Optional[GameManager]:
+        return self._sesiones.pop((guild_id, channel_id), None)
+
+    def for_guild(self, guild_id: int) -> List[GameManager]:
+        return [sesion for (g, _), sesion in self._sesiones.items() if g == guild_id]
+
+    def drop_guild(self, guild_id: int):
+        """Cancelar y olvidar las sesiones de un servidor que ya no está disponible"""
+        for sesion in self.for_guild(guild_id):
+            sesion.cancel_tasks()
+            outbound.forget(sesion.channel.id)
+            self.remove(guild_id, sesion.channel.id)
+
+    def active_count(self) -> int:
+        return sum(1 for sesion in self._sesiones.values() if sesion.is_game_active)
+
+    def intake_stats(self) -> Dict[str, float]:
+        """Métricas de las colas de respuestas sumadas para todas las sesiones"""
+        total: Dict[str, float] = dict.fromkeys(
+            ("profundidad", "encolados", "procesados", "coalescidos", "obsoletos", "descartados"), 0)
+        esperas = 0.0
+        for sesion in self._sesiones.values():
+            stats = sesion.intake.stats()
+            esperas += stats.pop("espera_media") * (stats["procesados"] + stats["obsoletos"])
+            for clave, valor in stats.items():
+                total[clave] += valor
+        atendidos = total["procesados"] + total["obsoletos"]
+        total["espera_media"] = esperas / atendidos if atendidos else 0.0
+        return total
+
+
+# Sesiones de todo el bot
+sessions = SessionRegistry()
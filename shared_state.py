@@ -0,0 +1,147 @@
+# Estado compartido entre los procesos del clúster: hashes clave -> {campo: valor} en SQLite o Redis
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import CLUSTER_BACKEND
+
+logger = logging.getLogger(__name__)
+
+
+class SharedBackend:
+    """Operaciones de hash al estilo Redis (HGETALL, HSET, HDEL, SCAN).
+
+    Son síncronas, como el resto de almacenes del bot: quien las use en el
+    camino caliente las lanza con asyncio.to_thread.
+    """
+
+    def hgetall(self, clave: str) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def hset(self, clave: str, valores: Dict[str, str]):
+        raise NotImplementedError
+
+    def hdel(self, clave: str, campos: Iterable[str]):
+        raise NotImplementedError
+
+    def keys(self, prefijo: str) -> List[str]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SqliteBackend(SharedBackend):
+    """Sustituto local de Redis: un archivo SQLite en modo WAL que pueden abrir varios procesos"""
+
+    def __init__(self, archivo: str):
+        self.archivo = archivo
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(archivo, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "clave TEXT NOT NULL, campo TEXT NOT NULL, valor TEXT NOT NULL, "
+            "PRIMARY KEY (clave, campo)) WITHOUT ROWID"
+        )
+
+    def hgetall(self, clave: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT campo, valor FROM hashes WHERE clave = ?", (clave,)).fetchall())
+
+    def hset(self, clave: str, valores: Dict[str, str]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO hashes (clave, campo, valor) VALUES (?, ?, ?) "
+                "ON CONFLICT(clave, campo) DO UPDATE SET valor = excluded.valor",
+                [(clave, campo, valor) for campo, valor in valores.items()]
+            )
+
+    def hdel(self, clave: str, campos: Iterable[str]):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM hashes WHERE clave = ? AND campo = ?",
+                                   [(clave, campo) for campo in campos])
+
+    def keys(self, prefijo: str) -> List[str]:
+        with self._lock:
+            filas = self._conn.execute(
+                "SELECT DISTINCT clave FROM hashes WHERE clave >= ? AND clave < ?",
+                (prefijo, prefijo + "\U0010ffff")
+            ).fetchall()
+        return [fila[0] for fila in filas]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend(SharedBackend):
+    """Redis (o compatible: KeyDB, Valkey...) con el cliente síncrono de redis-py"""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CLUSTER_BACKEND con redis:// necesita el paquete redis (pip install redis)")
+        self.url = url
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def hgetall(self, clave: str) -> Dict[str, str]:
+        return self._redis.hgetall(clave)
+
+    def hset(self, clave: str, valores: Dict[str, str]):
+        if valores:
+            self._redis.hset(clave, mapping=valores)
+
+    def hdel(self, clave: str, campos: Iterable[str]):
+        campos = list(campos)
+        if campos:
+            self._redis.hdel(clave, *campos)
+
+    def keys(self, prefijo: str) -> List[str]:
+        return list(self._redis.scan_iter(match=f"{prefijo}*", count=1000))
+
+    def close(self):
+        self._redis.close()
+
+
+def crear_backend(url: str) -> SharedBackend:
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    if url.startswith("sqlite:///"):
+        return SqliteBackend(url[len("sqlite:///"):])
+    raise ValueError(f"CLUSTER_BACKEND no reconocido: {url}")
+
+
+class GuildSettings:
+    """Ajustes de cada servidor (tipo de palabras, pesos, voluntarios...) en el hash "ajustes:<guild_id>".
+
+    Cada campo se guarda por separado como JSON, así dos procesos que cambian
+    campos distintos no se pisan.
+    """
+
+    def __init__(self, backend: SharedBackend):
+        self.backend = backend
+
+    @staticmethod
+    def _clave(guild_id: int) -> str:
+        return f"ajustes:{guild_id}"
+
+    def get(self, guild_id: int) -> Dict[str, Any]:
+        return {campo: json.loads(valor) for campo, valor in self.backend.hgetall(self._clave(guild_id)).items()}
+
+    def set(self, guild_id: int, **valores: Any):
+        self.backend.hset(self._clave(guild_id), {
+            campo: json.dumps(valor, ensure_ascii=False) for campo, valor in valores.items()
+        })
+
+    def delete(self, guild_id: int, *campos: str):
+        self.backend.hdel(self._clave(guild_id), campos)
+
+
+# Sin CLUSTER_BACKEND el bot es un solo proceso y cada módulo usa sus archivos locales
+shared_backend: Optional[SharedBackend] = crear_backend(CLUSTER_BACKEND) if CLUSTER_BACKEND else None
+guild_settings: Optional[GuildSettings] = GuildSettings(shared_backend) if shared_backend else None
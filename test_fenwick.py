@@ -0,0 +1,51 @@
+import random
+
+from fenwick import FenwickTree
+
+
+def _find_lineal(valores, objetivo):
+    for i, valor in enumerate(valores):
+        if objetivo < valor:
+            return i, objetivo
+        objetivo -= valor
+    return len(valores), objetivo
+
+
+def test_sumas_prefijas():
+    valores = [3, 0, 5, 1, 4]
+    arbol = FenwickTree(valores)
+    assert [arbol.prefix_sum(i) for i in range(6)] == [0, 3, 3, 8, 9, 13]
+    arbol.set(2, 1)
+    arbol.add(0, -2)
+    assert arbol.total() == 7 and arbol[2] == 1
+
+
+def test_find_como_busqueda_lineal():
+    rng = random.Random(4)
+    valores = [rng.randrange(4) for _ in range(37)]
+    arbol = FenwickTree(valores)
+    for objetivo in range(sum(valores) + 2):
+        assert arbol.find(objetivo) == _find_lineal(valores, objetivo), objetivo
+
+
+def test_find_tras_append_y_cambios():
+    rng = random.Random(5)
+    valores, arbol = [], FenwickTree()
+    for _ in range(200):
+        if valores and rng.random() < 0.5:
+            i = rng.randrange(len(valores))
+            valores[i] += 1
+            arbol.add(i, 1)
+        else:
+            valor = rng.randrange(3)
+            valores.append(valor)
+            arbol.append(valor)
+        objetivo = rng.randrange(sum(valores) + 1)
+        assert arbol.find(objetivo) == _find_lineal(valores, objetivo)
+
+
+def test_find_con_pesos_reales():
+    arbol = FenwickTree([0.5, 0.0, 1.5, 2.0])
+    assert arbol.find(0.25) == (0, 0.25)
+    assert arbol.find(0.5) == (2, 0.0)
+    assert arbol.find(3.0) == (3, 1.0)
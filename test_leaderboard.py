@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from leaderboard import Leaderboard
+
+
+def _ordenado(puntos):
+    return sorted(puntos.items(), key=lambda par: (-par[1], par[0]))
+
+
+@pytest.fixture
+def carga_pequena(monkeypatch):
+    # Bloques diminutos para que se partan y se vacíen a menudo
+    monkeypatch.setattr(Leaderboard, "CARGA", 4)
+
+
+def test_top_rank_y_page_tras_cambios(carga_pequena):
+    rng = random.Random(3)
+    puntos = {user_id: rng.randrange(50) for user_id in range(1, 200)}
+    tabla = Leaderboard(puntos)
+    for _ in range(3000):
+        user_id = rng.randrange(1, 300)
+        puntos[user_id] = rng.randrange(-10, 60)
+        tabla.update(user_id, puntos[user_id])
+
+    orden = _ordenado(puntos)
+    assert len(tabla) == len(puntos)
+    assert tabla.top(10) == orden[:10]
+    for inicio in (0, 1, 7, 50, len(orden) - 3, len(orden), len(orden) + 5):
+        assert tabla.page(inicio, 9) == orden[inicio:inicio + 9]
+    posiciones = {user_id: n for n, (user_id, _) in enumerate(orden, 1)}
+    assert all(tabla.rank(user_id) == posicion for user_id, posicion in posiciones.items())
+
+
+def test_empates_por_user_id():
+    tabla = Leaderboard({30: 5, 10: 5, 20: 5, 40: 7})
+    assert tabla.top() == [(40, 7), (10, 5), (20, 5), (30, 5)]
+    assert tabla.rank(20) == 3
+
+
+def test_vacio_y_desconocidos():
+    tabla = Leaderboard()
+    assert tabla.top() == [] and tabla.page(0, 5) == []
+    assert tabla.rank(1) is None and tabla.around(1) == []
+    tabla.update(1, 3)
+    assert tabla.top() == [(1, 3)] and tabla.rank(1) == 1
+    assert tabla.page(0, 0) == []
+
+
+def test_around(carga_pequena):
+    tabla = Leaderboard({user_id: 100 - user_id for user_id in range(20)})
+    # Cerca del principio no hay nadie por encima: la ventana se queda en 2 * radio + 1
+    assert tabla.around(0) == [(n + 1, n, 100 - n) for n in range(5)]
+    assert tabla.around(10, radio=1) == [(10, 9, 91), (11, 10, 90), (12, 11, 89)]
+    assert tabla.around(19) == [(18, 17, 83), (19, 18, 82), (20, 19, 81)]
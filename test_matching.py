@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from matching import compile_answers, distancia_acotada, max_errores, normalizar
+
+
+def _distancia_completa(a: str, b: str) -> int:
+    """Damerau-Levenshtein (alineamiento óptimo) sin bandas ni atajos, como referencia"""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def _mutar(rng: random.Random, palabra: str, ediciones: int) -> str:
+    letras = list(palabra)
+    for _ in range(ediciones):
+        i = rng.randrange(len(letras) + 1)
+        operacion = rng.randrange(4)
+        if operacion == 0 and i < len(letras):
+            letras[i] = rng.choice("aeiounrlt")
+        elif operacion == 1:
+            letras.insert(i, rng.choice("aeiounrlt"))
+        elif operacion == 2 and i < len(letras) and len(letras) > 1:
+            del letras[i]
+        elif operacion == 3 and i < len(letras) - 1:
+            letras[i], letras[i + 1] = letras[i + 1], letras[i]
+    return "".join(letras)
+
+
+@pytest.mark.parametrize("a,b", [
+    ("gato", "gato"), ("gato", "gaot"), ("perro", "pero"), ("murcielago", "murcielgao"),
+    ("entretenimiento", "entertenmiento"), ("abc", "xyz"), ("", "ab")
+])
+def test_distancia_acotada_coincide_con_la_completa(a, b):
+    for limite in range(4):
+        assert distancia_acotada(a, b, limite) == min(_distancia_completa(a, b), limite + 1)
+
+
+def test_normalizar_quita_tildes_articulo_y_puntuacion():
+    assert normalizar("  ¡El  Murciélago! ") == "murcielago"
+    assert normalizar("la") == "la"
+
+
+@pytest.mark.parametrize("forma", [
+    "entretenimiento", "otorrinolaringologo", "cocorococo", "lalalalala", "ferrocarril", "murcielago", "arroz"
+])
+def test_matches_acepta_lo_mismo_que_la_distancia(forma):
+    # Palabras con bigramas repetidos: el prefiltro no puede rechazar intentos dentro del límite
+    rng = random.Random(forma)
+    matcher = compile_answers("x", forma)
+    limite = max_errores(len(forma))
+    for _ in range(2000):
+        intento = _mutar(rng, forma, rng.randint(0, 3))
+        esperado = intento == forma or _distancia_completa(intento, forma) <= limite
+        assert matcher.matches(intento) == esperado, intento
+
+
+def test_matches_caso_reportado():
+    assert compile_answers("entertainment", "entretenimiento").matches("entertenmiento")
+
+
+def test_matches_alternativas():
+    matcher = compile_answers("bat", "murciélago", ["el quiróptero"])
+    assert matcher.matches("Quiroptero")
+    assert matcher.matches("murcielgao")
+    assert not matcher.matches("perro")
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from scheduler import TimerScheduler
+
+# Sin plugin de asyncio para pytest: cada prueba lanza su propio loop
+
+
+def _con_planificador(prueba):
+    async def ejecutar():
+        planificador = TimerScheduler()
+        planificador.start()
+        try:
+            return await prueba(planificador)
+        finally:
+            await planificador.stop()
+    return asyncio.run(ejecutar())
+
+
+def test_call_later_en_orden():
+    async def prueba(planificador):
+        orden = []
+
+        async def anotar(nombre):
+            orden.append(nombre)
+
+        planificador.call_later(0.03, anotar, "c")
+        planificador.call_later(0.01, anotar, "a")
+        planificador.call_later(0.02, anotar, "b")
+        await asyncio.sleep(0.08)
+        assert orden == ["a", "b", "c"]
+        assert planificador.pending() == 0
+    _con_planificador(prueba)
+
+
+def test_cancel_evita_el_disparo():
+    async def prueba(planificador):
+        disparos = []
+
+        async def anotar():
+            disparos.append(1)
+
+        timer = planificador.call_later(0.02, anotar)
+        assert timer.activo and planificador.pending() == 1
+        timer.cancel()
+        timer.cancel()
+        assert not timer.activo and planificador.pending() == 0
+        await asyncio.sleep(0.05)
+        assert disparos == []
+    _con_planificador(prueba)
+
+
+def test_cancelar_muchos_compacta_el_monticulo():
+    async def prueba(planificador):
+        async def nada():
+            pass
+
+        timers = [planificador.call_later(60, nada) for _ in range(200)]
+        for timer in timers[:150]:
+            timer.cancel()
+        assert planificador.pending() == 50
+        assert len(planificador._monticulo) < 200
+    _con_planificador(prueba)
+
+
+def test_call_every_sin_deriva_y_cancelable():
+    async def prueba(planificador):
+        instantes = []
+
+        async def anotar():
+            instantes.append(planificador.time())
+
+        timer = planificador.call_every(0.02, anotar)
+        primero = timer.cuando
+        await asyncio.sleep(0.11)
+        timer.cancel()
+        vistos = len(instantes)
+        await asyncio.sleep(0.05)
+
+        assert 4 <= vistos <= 6 and len(instantes) == vistos
+        # Cada disparo va sobre el plazo anterior, no sobre cuándo acabó el callback
+        for n, instante in enumerate(instantes, 1):
+            assert instante >= primero + (n - 1) * 0.02
+        periodos = (timer.cuando - primero) / 0.02
+        assert periodos == pytest.approx(round(periodos)) and round(periodos) >= vistos
+    _con_planificador(prueba)
+
+
+def test_call_every_primera_y_sin_solapes():
+    async def prueba(planificador):
+        en_curso = []
+
+        async def lento():
+            en_curso.append(1)
+            await asyncio.sleep(0.05)
+
+        timer = planificador.call_every(0.01, lento, primera=0)
+        await asyncio.sleep(0.035)
+        timer.cancel()
+        # La primera ejecución sigue en curso: los siguientes plazos se saltan
+        assert len(en_curso) == 1
+        assert planificador.saltos >= 2
+    _con_planificador(prueba)
+
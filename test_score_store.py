@@ -0,0 +1,65 @@
+import asyncio
+
+from score_store import JournalScoreStore
+
+
+def _abrir(tmp_path, **kwargs) -> JournalScoreStore:
+    return JournalScoreStore(str(tmp_path / "scores.bin"), str(tmp_path / "scores.journal"),
+                             str(tmp_path / "scores.json"), **kwargs)
+
+
+def _cargar(store):
+    return {guild_id: dict(tabla.items()) for guild_id, tabla in store.load().items()}
+
+
+def test_diario_sobrevive_a_reinicios(tmp_path):
+    store = _abrir(tmp_path)
+    store.record(1, 10, 5)
+    store.record(2, 20, 8)
+    asyncio.run(store.flush())
+    store.discard(2, 20)
+    asyncio.run(store.flush())
+    assert _cargar(_abrir(tmp_path)) == {1: {10: 5}}
+
+
+def test_linea_cortada_y_mas_escrituras(tmp_path):
+    store = _abrir(tmp_path)
+    store._write_batch({(1, 10): 5})
+    with open(tmp_path / "scores.journal", "a", encoding="utf-8") as f:
+        f.write('{"g":1,"u":11,"s":')
+
+    # Al reiniciar se recorta la línea cortada y lo siguiente se escribe detrás de lo válido
+    store = _abrir(tmp_path)
+    assert _cargar(store) == {1: {10: 5}}
+    store._write_batch({(1, 12): 7})
+    store._write_batch({(1, 10): 6})
+
+    assert _cargar(_abrir(tmp_path)) == {1: {10: 6, 12: 7}}
+
+
+def test_linea_completa_sin_salto_final(tmp_path):
+    store = _abrir(tmp_path)
+    store._write_batch({(1, 10): 5})
+    with open(tmp_path / "scores.journal", "a", encoding="utf-8") as f:
+        f.write('{"g":1,"u":11,"s":3}')
+    store = _abrir(tmp_path)
+    store._write_batch({(1, 12): 7})
+    assert _cargar(_abrir(tmp_path)) == {1: {10: 5, 12: 7}}
+
+
+def test_compactacion_vacia_el_diario(tmp_path):
+    store = _abrir(tmp_path, umbral_compactacion=3)
+    for user_id in range(5):
+        store._write_batch({(1, user_id): user_id})
+    assert (tmp_path / "scores.bin").exists()
+    assert (tmp_path / "scores.journal").read_text(encoding="utf-8").count("\n") < 3
+    assert _cargar(_abrir(tmp_path)) == {1: {n: n for n in range(5)}}
+
+
+def test_migra_scores_json_una_vez(tmp_path):
+    (tmp_path / "scores.json").write_text('{"5": 3, "7:8": 4}', encoding="utf-8")
+    store = _abrir(tmp_path)
+    assert (tmp_path / "scores.bin").exists()
+    store._write_batch({(7, 8): 9})
+    (tmp_path / "scores.json").write_text('{"5": 100}', encoding="utf-8")
+    assert _cargar(_abrir(tmp_path)) == {0: {5: 3}, 7: {8: 9}}
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from score_table import LEGACY_GUILD, ScoreTable, format_key, parse_key, read_tables, write_tables
+
+
+def test_operaciones_como_un_dict():
+    rng = random.Random(1)
+    tabla, esperado = ScoreTable(), {}
+    for _ in range(20000):
+        user_id = rng.randrange(1 << 62) if rng.random() < 0.5 or not esperado else rng.choice(list(esperado))
+        if rng.random() < 0.2:
+            assert tabla.pop(user_id) == esperado.pop(user_id, None)
+        else:
+            score = rng.randrange(-1000, 1000)
+            tabla[user_id] = esperado[user_id] = score
+    assert len(tabla) == len(esperado)
+    assert dict(tabla.items()) == esperado
+    assert all(tabla[user_id] == score for user_id, score in esperado.items())
+    assert tabla.get(-5 + (1 << 62) * 2, "nada") == "nada"
+
+
+def test_borrados_no_agotan_la_tabla():
+    tabla = ScoreTable()
+    for user_id in range(10000):
+        tabla[user_id] = user_id
+        tabla.pop(user_id)
+    tabla[7] = 1
+    assert len(tabla) == 1 and tabla.nbytes() <= 16 * 64
+
+
+def test_rechaza_ids_negativos():
+    with pytest.raises(ValueError):
+        ScoreTable()[-1] = 3
+    with pytest.raises(KeyError):
+        ScoreTable()[1]
+
+
+def test_copy_es_independiente():
+    tabla = ScoreTable({1: 10, 2: 20})
+    copia = tabla.copy()
+    copia[1] = 99
+    copia[3] = 30
+    assert dict(tabla.items()) == {1: 10, 2: 20}
+    assert dict(copia.items()) == {1: 99, 2: 20, 3: 30}
+
+
+def test_ida_y_vuelta_en_binario(tmp_path):
+    rng = random.Random(2)
+    tablas = {
+        guild_id: ScoreTable({rng.randrange(1 << 63): rng.randrange(-(1 << 40), 1 << 40) for _ in range(n)})
+        for guild_id, n in ((LEGACY_GUILD, 5), (123456789012345678, 3000), (42, 0))
+    }
+    archivo = tmp_path / "scores.bin"
+    write_tables(str(archivo), tablas)
+    leidas = read_tables(str(archivo))
+    assert leidas.keys() == tablas.keys()
+    for guild_id, tabla in tablas.items():
+        assert dict(leidas[guild_id].items()) == dict(tabla.items())
+    assert archivo.stat().st_size == 8 + sum(12 + 16 * len(tabla) for tabla in tablas.values())
+    assert not (tmp_path / "scores.bin.tmp").exists()
+
+
+def test_archivo_cortado_o_ajeno(tmp_path):
+    archivo = tmp_path / "scores.bin"
+    write_tables(str(archivo), {1: ScoreTable({5: 50, 6: 60})})
+    archivo.write_bytes(archivo.read_bytes()[:-8])
+    with pytest.raises(ValueError):
+        read_tables(str(archivo))
+    archivo.write_bytes(b"{}\0\0\0\0\0\0")
+    with pytest.raises(ValueError):
+        read_tables(str(archivo))
+    with pytest.raises(FileNotFoundError):
+        read_tables(str(tmp_path / "no_existe.bin"))
+
+
+def test_claves_de_texto():
+    assert parse_key("123:456") == (123, 456)
+    assert parse_key("456") == (LEGACY_GUILD, 456)
+    assert format_key(*parse_key("123:456")) == "123:456"
+    assert format_key(LEGACY_GUILD, 456) == "456"
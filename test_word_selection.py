@@ -0,0 +1,66 @@
+import random
+from collections import Counter
+
+import pytest
+
+from word_selection import AliasTable, RecentWords
+
+
+def test_alias_sigue_los_pesos():
+    pesos = {"normal": 5, "warframe": 3, "mixto": 2, "nunca": 0}
+    tabla = AliasTable(pesos)
+    assert len(tabla) == 3
+    rng = random.Random(6)
+    n = 100000
+    veces = Counter(tabla.sample(rng) for _ in range(n))
+    assert "nunca" not in veces
+    for opcion, peso in pesos.items():
+        assert veces[opcion] / n == pytest.approx(peso / 10, abs=0.01)
+
+
+def test_alias_una_opcion_y_pesos_no_validos():
+    assert AliasTable({"solo": 0.1}).sample(random.Random(7)) == "solo"
+    with pytest.raises(ValueError):
+        AliasTable({"a": 0, "b": 0})
+    with pytest.raises(ValueError):
+        AliasTable({"a": 1, "b": -1})
+
+
+@pytest.mark.parametrize("bloom_desde", [1000, 1])
+def test_recientes_ventana_deslizante(bloom_desde):
+    recientes = RecentWords(3, bloom_desde=bloom_desde)
+    for palabra in ("Gato", "perro", "pez"):
+        recientes.add(palabra)
+    assert " gato " in recientes and "PERRO" in recientes
+    recientes.add("loro")
+    if bloom_desde > 3:
+        # Con el filtro de Bloom podría ser un falso positivo
+        assert "gato" not in recientes
+    assert recientes.items() == ["perro", "pez", "loro"]
+    assert len(recientes) == 3
+
+
+def test_recientes_repetida_dentro_de_la_ventana():
+    recientes = RecentWords(3)
+    for palabra in ("gato", "gato", "pez", "loro"):
+        recientes.add(palabra)
+    # Salió una de las dos copias: la otra sigue en la ventana
+    assert "gato" in recientes
+    recientes.add("oso")
+    assert "gato" not in recientes
+
+
+def test_recientes_con_bloom_no_olvida_ninguna():
+    recientes = RecentWords(500, bloom_desde=100)
+    palabras = [f"palabra{i}" for i in range(2000)]
+    for palabra in palabras:
+        recientes.add(palabra)
+    assert all(palabra in recientes for palabra in palabras[-500:])
+    falsos = sum(palabra in recientes for palabra in palabras[:1500])
+    assert falsos < 1500 * 0.05
+
+
+def test_recientes_sin_capacidad():
+    recientes = RecentWords(0)
+    recientes.add("gato")
+    assert "gato" not in recientes and len(recientes) == 0
@@ -0,0 +1,119 @@
+# Caché en memoria de traducciones con expulsión LRU/TTL
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from config import TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL, TRANSLATION_CACHE_FILE
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationEntry(NamedTuple):
+    traduccion: str
+    alternativas: Tuple[str, ...] = ()
+
+
+class TranslationCache:
+    """Caché de traducciones por (palabra, tipo) con tamaño máximo y caducidad.
+
+    Las entradas se guardan junto a su hora de expiración (reloj de pared, para
+    que sigan siendo válidas al recargarlas de disco tras un reinicio).
+    """
+
+    def __init__(self, max_entradas: int = TRANSLATION_CACHE_SIZE,
+                 ttl: float = TRANSLATION_CACHE_TTL,
+                 archivo: Optional[str] = TRANSLATION_CACHE_FILE):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.archivo = archivo
+        self._entradas: "OrderedDict[Tuple[str, str], Tuple[float, TranslationEntry]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expulsiones = 0
+
+    @staticmethod
+    def _clave(word: str, tipo: str) -> Tuple[str, str]:
+        return (word.lower().strip(), tipo)
+
+    def get(self, word: str, tipo: str) -> Optional[TranslationEntry]:
+        clave = self._clave(word, tipo)
+        item = self._entradas.get(clave)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expira, entrada = item
+        if expira < time.time():
+            del self._entradas[clave]
+            self.expulsiones += 1
+            self.misses += 1
+            return None
+
+        self._entradas.move_to_end(clave)
+        self.hits += 1
+        return entrada
+
+    def put(self, word: str, tipo: str, entrada: TranslationEntry, expira: Optional[float] = None):
+        clave = self._clave(word, tipo)
+        self._entradas[clave] = (expira if expira is not None else time.time() + self.ttl, entrada)
+        self._entradas.move_to_end(clave)
+
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+            self.expulsiones += 1
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entradas": len(self._entradas),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expulsiones": self.expulsiones,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def load(self):
+        """Cargar entradas no caducadas desde disco (si la persistencia está activada)"""
+        if not self.archivo:
+            return
+        try:
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning("⚠️ Error cargando caché de traducciones: %s", e)
+            return
+
+        ahora = time.time()
+        for word, tipo, expira, traduccion, alternativas in datos:
+            if expira > ahora:
+                self.put(word, tipo, TranslationEntry(traduccion, tuple(alternativas)), expira=expira)
+        logger.info("💾 Caché de traducciones cargada: %s entradas", len(self._entradas))
+
+    def save(self):
+        """Guardar la caché en disco con reemplazo atómico"""
+        if not self.archivo:
+            return
+        datos = [
+            [word, tipo, expira, entrada.traduccion, list(entrada.alternativas)]
+            for (word, tipo), (expira, entrada) in self._entradas.items()
+        ]
+        tmp = f"{self.archivo}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, self.archivo)
+        except Exception as e:
+            logger.warning("⚠️ Error guardando caché de traducciones: %s", e)
+
+
+# Caché compartida por todas las rutas que comprueban respuestas
+translation_cache = TranslationCache()
+translation_cache.load()
@@ -0,0 +1,330 @@
+# Copia local (SQLite) del corpus de palabras, sincronizada poco a poco desde la API
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import (
+    CLUSTER_ID, CORPUS_FILE, CORPUS_SYNC_INTERVAL, CORPUS_SYNC_BATCH,
+    CORPUS_MIN_COBERTURA
+)
+from api_client import ApiError, ruta_traduccion
+from api_resilience import resilient_api, CircuitOpenError
+from translation_cache import TranslationEntry
+from word_selection import perfil_por_defecto
+
+logger = logging.getLogger(__name__)
+
+# Tipos que existen como tales en la API; "mixto" es la unión de ambos
+TIPOS_CORPUS = ("normal", "warframe")
+ENDPOINTS_TIPO = {"normal": "/palabra-normal", "warframe": "/palabra-warframe"}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS palabras (
+    id INTEGER PRIMARY KEY,
+    palabra TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    tipo TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    traduccion TEXT NOT NULL,
+    alternativas TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_palabras_tipo_categoria ON palabras (tipo, categoria);
+CREATE TABLE IF NOT EXISTS sincronizacion (
+    tipo TEXT PRIMARY KEY,
+    total_remoto INTEGER NOT NULL,
+    por_categoria TEXT NOT NULL,
+    actualizado REAL NOT NULL
+);
+"""
+
+
+class WordCorpus:
+    """Corpus de palabras en disco con índice en memoria por tipo y categoría.
+
+    Los índices guardan solo los ids de cada fila, así elegir una palabra al azar
+    es un random.choice más una lectura por clave primaria. Las lecturas del
+    event loop van por su propia conexión, sin el cerrojo de las escrituras: en
+    modo WAL no esperan a que termine un lote de la sincronización.
+    """
+
+    def __init__(self, archivo: str = CORPUS_FILE):
+        self.archivo = archivo
+        self._conn: Optional[sqlite3.Connection] = None      # Escrituras, en hilos y con el cerrojo
+        self._lectura: Optional[sqlite3.Connection] = None   # Lecturas desde el event loop
+        self._lock = threading.Lock()
+        self._ids_tipo: Dict[str, List[int]] = {}
+        self._ids_categoria: Dict[str, List[int]] = {}
+        self._categorias_tipo: Dict[str, Set[str]] = {}
+        self._ids_todos: List[int] = []
+        self._ultimo_id = 0
+        self._totales_remotos: Dict[str, int] = {}
+        # Categorías que cambiaron en remoto y aún no se han completado, por tipo
+        self._por_completar: Dict[str, Set[str]] = {}
+        self._sync_task: Optional[asyncio.Task] = None
+        self.ultima_sincronizacion = 0.0
+
+    def _abrir(self):
+        """Abrir el archivo y cargar los índices la primera vez que hacen falta (no al importar)"""
+        if self._conn is not None:
+            return
+        conn = sqlite3.connect(self.archivo, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_ESQUEMA)
+        self._lectura = sqlite3.connect(self.archivo, timeout=30, check_same_thread=False)
+        self._conn = conn
+        self._cargar_indices()
+
+    def _cargar_indices(self):
+        with self._lock:
+            filas = self._conn.execute("SELECT id, tipo, categoria FROM palabras").fetchall()
+            remotos = self._conn.execute("SELECT tipo, total_remoto, actualizado FROM sincronizacion").fetchall()
+        for id_, tipo, categoria in filas:
+            self._indexar(id_, tipo, categoria)
+        for tipo, total, actualizado in remotos:
+            self._totales_remotos[tipo] = total
+            self.ultima_sincronizacion = max(self.ultima_sincronizacion, actualizado)
+        logger.info("📚 Corpus local cargado: %s palabras", len(self._ids_todos))
+
+    def _indexar(self, id_: int, tipo: str, categoria: str):
+        self._ids_tipo.setdefault(tipo, []).append(id_)
+        self._ids_categoria.setdefault(categoria, []).append(id_)
+        self._categorias_tipo.setdefault(tipo, set()).add(categoria)
+        self._ids_todos.append(id_)
+        self._ultimo_id = max(self._ultimo_id, id_)
+
+    def __len__(self) -> int:
+        self._abrir()
+        return len(self._ids_todos)
+
+    def count(self, tipo: Optional[str] = None, categoria: Optional[str] = None) -> int:
+        self._abrir()
+        if categoria:
+            return len(self._ids_categoria.get(categoria, ()))
+        if tipo and tipo != "mixto":
+            return len(self._ids_tipo.get(tipo, ()))
+        return len(self._ids_todos)
+
+    def category_counts(self, tipo: str) -> Dict[str, int]:
+        """Palabras locales por categoría, con el mismo formato que /estadisticas"""
+        self._abrir()
+        tipos = TIPOS_CORPUS if tipo == "mixto" else (tipo,)
+        return {
+            categoria: len(self._ids_categoria[categoria])
+            for t in tipos for categoria in sorted(self._categorias_tipo.get(t, ()))
+        }
+
+    def is_ready(self, tipo: str) -> bool:
+        """El corpus cubre lo suficiente del remoto como para servir ese tipo en local"""
+        self._abrir()
+        tipos = TIPOS_CORPUS if tipo == "mixto" else (tipo,)
+        for t in tipos:
+            remoto = self._totales_remotos.get(t)
+            if not remoto or self.count(t) < remoto * CORPUS_MIN_COBERTURA:
+                return False
+        return True
+
+    def _ids_para(self, tipo: str, categoria: Optional[str] = None) -> List[int]:
+        self._abrir()
+        # Igual que la API: normal y mixto eligen primero una categoría preferida
+        if tipo in ("normal", "mixto"):
+            ids = self._ids_categoria.get(categoria or perfil_por_defecto.categoria(tipo))
+            if ids:
+                return ids
+        if tipo == "mixto":
+            return self._ids_todos
+        return self._ids_tipo.get(tipo, [])
+
+    def random_word(self, tipo: str, categoria: Optional[str] = None) -> Optional[Tuple[str, TranslationEntry]]:
+        """Palabra aleatoria del tipo (y categoría, si se indica) con su traducción, en O(1)"""
+        ids = self._ids_para(tipo, categoria)
+        if not ids:
+            return None
+        fila = self._lectura.execute(
+            "SELECT palabra, traduccion, alternativas FROM palabras WHERE id = ?",
+            (random.choice(ids),)
+        ).fetchone()
+        if fila is None:
+            return None
+        return fila[0], TranslationEntry(fila[1], tuple(json.loads(fila[2])))
+
+    def lookup(self, word: str) -> Optional[TranslationEntry]:
+        """Traducción de una palabra si está en el corpus"""
+        self._abrir()
+        fila = self._lectura.execute(
+            "SELECT traduccion, alternativas FROM palabras WHERE palabra = ?",
+            (word.strip(),)
+        ).fetchone()
+        if fila is None:
+            return None
+        return TranslationEntry(fila[0], tuple(json.loads(fila[1])))
+
+    def _insertar(self, filas: List[Tuple[str, str, str, str, str]]) -> List[Tuple[int, str, str]]:
+        nuevas = []
+        with self._lock, self._conn:
+            for fila in filas:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO palabras (palabra, tipo, categoria, traduccion, alternativas) "
+                    "VALUES (?, ?, ?, ?, ?)", fila
+                )
+                if cursor.rowcount == 1:
+                    nuevas.append((cursor.lastrowid, fila[1], fila[2]))
+        return nuevas
+
+    def _guardar_remoto(self, tipo: str, total: int, por_categoria: Dict[str, int]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sincronizacion (tipo, total_remoto, por_categoria, actualizado) "
+                "VALUES (?, ?, ?, ?)", (tipo, total, json.dumps(por_categoria), time.time())
+            )
+
+    def _remoto_guardado(self, tipo: str) -> Optional[Dict[str, int]]:
+        self._abrir()
+        fila = self._lectura.execute(
+            "SELECT por_categoria FROM sincronizacion WHERE tipo = ?", (tipo,)
+        ).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def remote_stats(self, tipo: str) -> Optional[Tuple[int, Dict[str, int], float]]:
+        """Última respuesta de /estadisticas guardada al sincronizar: (total, por_categoria, cuándo)"""
+        self._abrir()
+        fila = self._lectura.execute(
+            "SELECT total_remoto, por_categoria, actualizado FROM sincronizacion WHERE tipo = ?", (tipo,)
+        ).fetchone()
+        return (fila[0], json.loads(fila[1]), fila[2]) if fila else None
+
+    async def sync(self, presupuesto: int = CORPUS_SYNC_BATCH) -> int:
+        """Sincronización incremental: solo pide palabras de categorías incompletas.
+
+        La API no ofrece un listado, así que se usan los conteos de /estadisticas
+        para saber qué falta y se muestrea la categoría hasta agotar el presupuesto
+        de peticiones. Con el tipo ya cubierto solo se vuelven a muestrear las
+        categorías cuyo conteo cambió respecto a la sincronización anterior (y
+        siguen incompletas). Devuelve el número de palabras nuevas.
+        """
+        self._abrir()
+        nuevas = 0
+        for tipo in TIPOS_CORPUS:
+            try:
+                data = await resilient_api.get_json("/estadisticas", params={"tipo": tipo}, hedge=False)
+                stats = data["estadisticas"]
+            except (ApiError, KeyError) as e:
+                logger.warning("⚠️ Corpus: no se pudieron obtener estadísticas de %s: %s", tipo, e)
+                continue
+
+            por_categoria = stats.get("por_categoria", {})
+            guardado = self._remoto_guardado(tipo) or {}
+            cambiadas = {categoria for categoria, total in por_categoria.items() if guardado.get(categoria) != total}
+            if cambiadas:
+                logger.info("📚 Corpus: cambios en %s: %s (%s palabras en remoto)",
+                            tipo, ", ".join(sorted(cambiadas)), stats.get('total'))
+            por_completar = self._por_completar.setdefault(tipo, set())
+            por_completar |= cambiadas
+
+            # Hasta cubrir el tipo se muestrea todo lo incompleto; después, solo lo que cambió en remoto
+            incompletas = [
+                categoria for categoria, total in por_categoria.items()
+                if self.count(categoria=categoria) < total
+            ]
+            listo = self.is_ready(tipo)
+            pendientes = [categoria for categoria in incompletas if not listo or categoria in por_completar]
+            filas = []
+            try:
+                for categoria in pendientes:
+                    for _ in range(max(1, presupuesto // len(pendientes))):
+                        fila = await self._descargar(tipo, categoria)
+                        if fila:
+                            filas.append(fila)
+            except CircuitOpenError as e:
+                # La API está caída: guardar lo descargado y no insistir hasta la próxima sincronización
+                logger.warning("⚠️ Corpus: sincronización de %s interrumpida: %s", tipo, e)
+
+            for id_, tipo_fila, categoria in await asyncio.to_thread(self._insertar, filas):
+                self._indexar(id_, tipo_fila, categoria)
+                nuevas += 1
+
+            por_completar.intersection_update(
+                categoria for categoria, total in por_categoria.items() if self.count(categoria=categoria) < total
+            )
+            self._totales_remotos[tipo] = stats.get("total", 0)
+            await asyncio.to_thread(self._guardar_remoto, tipo, stats.get("total", 0), por_categoria)
+
+        self.ultima_sincronizacion = time.time()
+        logger.info("📚 Corpus sincronizado: %s palabras nuevas, %s en total", nuevas, len(self))
+        return nuevas
+
+    async def _descargar(self, tipo: str, categoria: str) -> Optional[Tuple[str, str, str, str, str]]:
+        try:
+            params = {"categoria": categoria} if tipo == "normal" else None
+            data = await resilient_api.get_json(ENDPOINTS_TIPO[tipo], params=params, hedge=False)
+            palabra = data["palabra"].strip()
+            if self.lookup(palabra):
+                return None
+            traduccion = await resilient_api.get_json(ruta_traduccion(palabra), params={"tipo": tipo}, hedge=False)
+            return (
+                palabra, tipo, data.get("categoria", categoria), traduccion["traduccion"],
+                json.dumps(traduccion.get("alternativas", []), ensure_ascii=False)
+            )
+        except CircuitOpenError:
+            raise
+        except (ApiError, KeyError) as e:
+            logger.warning("⚠️ Corpus: error descargando palabra de %s: %s", categoria, e)
+            return None
+
+    def _filas_nuevas(self):
+        with self._lock:
+            filas = self._conn.execute(
+                "SELECT id, tipo, categoria FROM palabras WHERE id > ? ORDER BY id", (self._ultimo_id,)
+            ).fetchall()
+            remotos = self._conn.execute("SELECT tipo, total_remoto, actualizado FROM sincronizacion").fetchall()
+        return filas, remotos
+
+    async def reload(self) -> int:
+        """Indexar las palabras que otro proceso añadió al archivo; devuelve cuántas"""
+        self._abrir()
+        filas, remotos = await asyncio.to_thread(self._filas_nuevas)
+        for id_, tipo, categoria in filas:
+            self._indexar(id_, tipo, categoria)
+        for tipo, total, actualizado in remotos:
+            self._totales_remotos[tipo] = total
+            self.ultima_sincronizacion = max(self.ultima_sincronizacion, actualizado)
+        return len(filas)
+
+    def start(self):
+        """Arrancar la sincronización periódica en segundo plano"""
+        self._abrir()
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._sync_task:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+
+    async def _sync_loop(self):
+        # En el clúster solo el proceso 0 descarga; el resto lee lo que este escribe
+        sincroniza = CLUSTER_ID in (None, "0")
+        while True:
+            try:
+                if sincroniza:
+                    await self.sync()
+                else:
+                    await self.reload()
+            except Exception as e:
+                logger.warning("⚠️ Error sincronizando corpus: %s", e)
+            await asyncio.sleep(CORPUS_SYNC_INTERVAL)
+
+    def close(self):
+        if self._conn is None:
+            return
+        self._lectura.close()
+        with self._lock:
+            self._conn.close()
+
+
+# Corpus compartido por todas las partidas
+word_corpus = WordCorpus()
@@ -0,0 +1,139 @@
+# Búfer de palabras precargadas en segundo plano, una cola por tipo
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, NamedTuple, Optional
+
+from config import PREFETCH_SIZE, PREFETCH_LOW_WATERMARK, PREFETCH_RETRY_DELAY
+from matching import AnswerMatcher, compile_answers
+
+TIPOS_PREFETCH = ("normal", "warframe", "mixto")
+
+
+class PrefetchedWord(NamedTuple):
+    palabra: str
+    tipo: str
+    answers: AnswerMatcher
+
+
+class WordPrefetcher:
+    """Mantiene unas pocas palabras listas (con sus traducciones) para cada tipo.
+
+    Al empezar una ronda basta con sacar una palabra de la cola; cuando una cola
+    baja del mínimo se despierta su tarea de recarga, que la vuelve a llenar
+    consultando la API fuera del camino crítico.
+    """
+
+    def __init__(self, fetch_word: Callable[[str], Awaitable[Optional[str]]],
+                 fetch_translation: Callable[[str, str], Awaitable],
+                 elegir_tipo: Callable[[str], str],
+                 capacidad: int = PREFETCH_SIZE, minimo: int = PREFETCH_LOW_WATERMARK):
+        self._fetch_word = fetch_word
+        self._fetch_translation = fetch_translation
+        self._elegir_tipo = elegir_tipo
+        self.capacidad = capacidad
+        self.minimo = minimo
+        self._buffers: Dict[str, Deque[PrefetchedWord]] = {tipo: deque() for tipo in TIPOS_PREFETCH}
+        self._eventos: Dict[str, asyncio.Event] = {tipo: asyncio.Event() for tipo in TIPOS_PREFETCH}
+        self._tareas: Dict[str, asyncio.Task] = {}
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.recargas = 0
+        self.fallos_recarga = 0
+        self.descartadas = 0
+        self._latencia_total = 0.0
+        self.ultima_latencia = 0.0
+
+    def start(self):
+        """Arrancar una tarea de recarga por tipo (requiere un loop en ejecución)"""
+        for tipo in TIPOS_PREFETCH:
+            if tipo not in self._tareas or self._tareas[tipo].done():
+                self._eventos[tipo].set()
+                self._tareas[tipo] = asyncio.create_task(self._refill_loop(tipo))
+
+    async def stop(self):
+        for tarea in self._tareas.values():
+            tarea.cancel()
+        await asyncio.gather(*self._tareas.values(), return_exceptions=True)
+        self._tareas.clear()
+
+    def pop(self, tipo_palabras: str) -> Optional[PrefetchedWord]:
+        """Sacar una palabra lista en O(1); None si la cola de ese tipo está vacía"""
+        tipo = self._elegir_tipo(tipo_palabras)
+        buffer = self._buffers[tipo]
+
+        item = buffer.popleft() if buffer else None
+        if item is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        if len(buffer) <= self.minimo:
+            self._eventos[tipo].set()
+        return item
+
+    def reject(self, item: PrefetchedWord, devolver: bool):
+        """Una partida no quiso la palabra (la había usado hace poco).
+
+        Con `devolver` vuelve al final de su cola para otra partida; si no, se
+        tira. En los dos casos se despierta la recarga: una cola llena de
+        palabras recientes no bajaría nunca del mínimo por sí sola.
+        """
+        buffer = self._buffers[item.tipo]
+        if devolver and len(buffer) < self.capacidad:
+            buffer.append(item)
+        else:
+            self.descartadas += 1
+        self._eventos[item.tipo].set()
+
+    async def _fetch_one(self, tipo: str) -> Optional[PrefetchedWord]:
+        palabra = await self._fetch_word(tipo)
+        if not palabra:
+            return None
+        entrada = await self._fetch_translation(palabra, tipo)
+        if not entrada:
+            return None
+        return PrefetchedWord(palabra, tipo, compile_answers(palabra, entrada.traduccion, entrada.alternativas))
+
+    async def _refill_loop(self, tipo: str):
+        buffer = self._buffers[tipo]
+        evento = self._eventos[tipo]
+
+        while True:
+            await evento.wait()
+            evento.clear()
+
+            # Límite de intentos por pasada: si la API repite palabras no insistimos
+            intentos = 0
+            while len(buffer) < self.capacidad and intentos < self.capacidad * 2:
+                intentos += 1
+                inicio = time.perf_counter()
+                item = await self._fetch_one(tipo)
+                latencia = time.perf_counter() - inicio
+
+                if item is None:
+                    self.fallos_recarga += 1
+                    await asyncio.sleep(PREFETCH_RETRY_DELAY)
+                    continue
+
+                self.recargas += 1
+                self._latencia_total += latencia
+                self.ultima_latencia = latencia
+
+                # Evitar repetir la misma palabra dentro del búfer
+                if all(existente.palabra != item.palabra for existente in buffer):
+                    buffer.append(item)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "profundidad": {tipo: len(buffer) for tipo, buffer in self._buffers.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "recargas": self.recargas,
+            "fallos_recarga": self.fallos_recarga,
+            "descartadas": self.descartadas,
+            "latencia_media": self._latencia_total / self.recargas if self.recargas else 0.0,
+            "ultima_latencia": self.ultima_latencia
+        }
@@ -0,0 +1,194 @@
+# Elección de tipo y categoría de palabra (tablas alias) y ventana de palabras recientes
+import logging
+import math
+import random
+from typing import Dict, List, Mapping, Optional
+
+from config import PROBABILIDADES_AUTO, CATEGORIAS_PREFERIDAS, WORD_NO_REPEAT_WINDOW, WORD_NO_REPEAT_BLOOM
+
+logger = logging.getLogger(__name__)
+
+TIPOS_PALABRA = ("normal", "warframe", "mixto")
+
+
+class AliasTable:
+    """Muestreo ponderado en O(1) con el método alias de Walker.
+
+    La tabla se construye una vez en O(n) (algoritmo de Vose); cada muestra es
+    una columna al azar y una moneda sesgada, sin importar cuántas opciones haya.
+    """
+
+    def __init__(self, pesos: Mapping[str, float]):
+        if any(peso < 0 for peso in pesos.values()):
+            raise ValueError("Los pesos no pueden ser negativos")
+        self.pesos = {opcion: float(peso) for opcion, peso in pesos.items() if peso > 0}
+        if not self.pesos:
+            raise ValueError("Hace falta al menos un peso positivo")
+
+        self.opciones: List[str] = list(self.pesos)
+        n = len(self.opciones)
+        total = sum(self.pesos.values())
+        escalados = [self.pesos[opcion] * n / total for opcion in self.opciones]
+        self._prob = [1.0] * n
+        self._alias = list(range(n))
+
+        pequenos = [i for i, p in enumerate(escalados) if p < 1.0]
+        grandes = [i for i, p in enumerate(escalados) if p >= 1.0]
+        while pequenos and grandes:
+            menor, mayor = pequenos.pop(), grandes.pop()
+            self._prob[menor] = escalados[menor]
+            self._alias[menor] = mayor
+            escalados[mayor] -= 1.0 - escalados[menor]
+            (pequenos if escalados[mayor] < 1.0 else grandes).append(mayor)
+        # Lo que queda vale 1 salvo por errores de redondeo
+
+    def __len__(self) -> int:
+        return len(self.opciones)
+
+    def sample(self, rng: random.Random = random) -> str:
+        i = rng.randrange(len(self.opciones))
+        return self.opciones[i] if rng.random() < self._prob[i] else self.opciones[self._alias[i]]
+
+
+class _BloomContador:
+    """Filtro de Bloom con contadores de un byte: a diferencia del clásico, permite borrar.
+
+    Los falsos positivos solo hacen que se descarte alguna palabra que no era
+    reciente; nunca deja pasar una repetida.
+    """
+
+    def __init__(self, capacidad: int, error: float = 0.01):
+        self._m = max(8, math.ceil(-capacidad * math.log(error) / math.log(2) ** 2))
+        self._k = max(1, round(self._m / capacidad * math.log(2)))
+        self._contadores = bytearray(self._m)
+
+    def _posiciones(self, clave: str):
+        # Doble hash: k posiciones a partir de dos valores
+        h1 = hash(clave)
+        h2 = hash((clave, self._k)) | 1
+        return [(h1 + i * h2) % self._m for i in range(self._k)]
+
+    def add(self, clave: str):
+        for i in self._posiciones(clave):
+            if self._contadores[i] < 255:
+                self._contadores[i] += 1
+
+    def discard(self, clave: str):
+        for i in self._posiciones(clave):
+            # Un contador saturado ya no se sabe cuántas veces se sumó: se deja como está
+            if 0 < self._contadores[i] < 255:
+                self._contadores[i] -= 1
+
+    def __contains__(self, clave: str) -> bool:
+        return all(self._contadores[i] for i in self._posiciones(clave))
+
+
+class _Conteo:
+    """Conjunto con multiplicidad: la misma palabra puede estar dos veces en la ventana"""
+
+    def __init__(self):
+        self._veces: Dict[str, int] = {}
+
+    def add(self, clave: str):
+        self._veces[clave] = self._veces.get(clave, 0) + 1
+
+    def discard(self, clave: str):
+        veces = self._veces.get(clave, 0)
+        if veces > 1:
+            self._veces[clave] = veces - 1
+        else:
+            self._veces.pop(clave, None)
+
+    def __contains__(self, clave: str) -> bool:
+        return clave in self._veces
+
+
+class RecentWords:
+    """Las últimas `capacidad` palabras de una sesión, con pertenencia en O(1).
+
+    Búfer circular más un conjunto; a partir de WORD_NO_REPEAT_BLOOM palabras
+    el conjunto es un filtro de Bloom con contadores, que ocupa unos pocos
+    bytes por palabra en vez de guardar las cadenas.
+    """
+
+    def __init__(self, capacidad: int = WORD_NO_REPEAT_WINDOW, bloom_desde: int = WORD_NO_REPEAT_BLOOM):
+        self.capacidad = capacidad
+        self._anillo: List[Optional[str]] = [None] * capacidad
+        self._pos = 0
+        self._miembros = _BloomContador(capacidad) if capacidad >= bloom_desde else _Conteo()
+
+    @staticmethod
+    def _clave(palabra: str) -> str:
+        return palabra.strip().casefold()
+
+    def add(self, palabra: str):
+        if not self.capacidad:
+            return
+        clave = self._clave(palabra)
+        saliente = self._anillo[self._pos]
+        if saliente is not None:
+            self._miembros.discard(saliente)
+        self._anillo[self._pos] = clave
+        self._miembros.add(clave)
+        self._pos = (self._pos + 1) % self.capacidad
+
+    def __contains__(self, palabra: str) -> bool:
+        return self._clave(palabra) in self._miembros
+
+    def __len__(self) -> int:
+        return sum(1 for clave in self._anillo if clave is not None)
+
+    def items(self) -> List[str]:
+        """De la más antigua a la más reciente"""
+        orden = self._anillo[self._pos:] + self._anillo[:self._pos]
+        return [clave for clave in orden if clave is not None]
+
+
+class SelectionProfile:
+    """Pesos de tipo (modo auto) y de categoría por tipo, con sus tablas alias ya construidas"""
+
+    def __init__(self, tipos: Optional[Mapping[str, float]] = None,
+                 categorias: Optional[Mapping[str, Mapping[str, float]]] = None):
+        tipos = dict(tipos or PROBABILIDADES_AUTO)
+        categorias = dict(categorias or {})
+        desconocidos = (set(tipos) | set(categorias)) - set(TIPOS_PALABRA)
+        if desconocidos:
+            raise ValueError(f"Tipos desconocidos: {', '.join(sorted(desconocidos))}")
+
+        self.pesos_tipos = tipos
+        self.pesos_categorias = categorias
+        self._tipos = AliasTable(tipos)
+        # Sin pesos propios, todas las categorías preferidas valen lo mismo
+        self._categorias = {
+            tipo: AliasTable(categorias.get(tipo) or {categoria: 1 for categoria in preferidas})
+            for tipo, preferidas in CATEGORIAS_PREFERIDAS.items()
+        }
+
+    def tipo(self, tipo_actual: str) -> str:
+        """Resolver "auto" a un tipo concreto; cualquier otro tipo se devuelve tal cual"""
+        return self._tipos.sample() if tipo_actual == "auto" else tipo_actual
+
+    def categoria(self, tipo: str) -> Optional[str]:
+        tabla = self._categorias.get(tipo)
+        return tabla.sample() if tabla else None
+
+    def custom_categories(self, tipo: str) -> bool:
+        return tipo in self.pesos_categorias
+
+    def to_config(self) -> dict:
+        return {"tipos": self.pesos_tipos, "categorias": self.pesos_categorias}
+
+    @classmethod
+    def from_config(cls, datos: Optional[dict]) -> "SelectionProfile":
+        """Perfil guardado en bot_config.json; el de por defecto si falta o no es válido"""
+        if not datos:
+            return perfil_por_defecto
+        try:
+            return cls(datos.get("tipos"), datos.get("categorias"))
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning("⚙️ Pesos de palabras inválidos, usando los de por defecto: %s", e)
+            return perfil_por_defecto
+
+
+# Pesos de config.py, compartidos por todos los servidores sin perfil propio
+perfil_por_defecto = SelectionProfile()
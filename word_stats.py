@@ -0,0 +1,140 @@
+# Estadísticas de palabras por tipo para !estadisticas, con caché compartida entre servidores
+import asyncio
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from api_client import ApiError
+from api_config import API_PRESUPUESTO_ESTADISTICAS
+from api_resilience import resilient_api
+from config import WORD_STATS_TTL, WORD_STATS_STALE
+from word_corpus import word_corpus, WordCorpus, TIPOS_CORPUS
+
+logger = logging.getLogger(__name__)
+
+
+class WordStats(NamedTuple):
+    total: int
+    por_categoria: Dict[str, int]
+    origen: str            # "corpus" o "api"
+    obtenido: float        # time.time() de cuando se calcularon u obtuvieron
+
+    def edad(self) -> float:
+        return time.time() - self.obtenido
+
+
+class WordStatsCache:
+    """Conteos de palabras por tipo con TTL y stale-while-revalidate.
+
+    Si el corpus local cubre el tipo, se cuentan sus índices en memoria. Si no,
+    se sirve lo último que dio /estadisticas (también lo que guardó la
+    sincronización del corpus): dentro del TTL tal cual; pasado el TTL, igual,
+    pero lanzando un refresco en segundo plano. Solo se espera a la API cuando
+    no hay nada guardado, y nunca más de API_PRESUPUESTO_ESTADISTICAS.
+    """
+
+    def __init__(self, corpus: WordCorpus = word_corpus, ttl: float = WORD_STATS_TTL,
+                 stale: float = WORD_STATS_STALE, presupuesto: float = API_PRESUPUESTO_ESTADISTICAS):
+        self.corpus = corpus
+        self.ttl = ttl
+        self.stale = stale
+        self.presupuesto = presupuesto
+        self._entradas: Dict[str, WordStats] = {}
+        self._refrescos: Dict[str, asyncio.Task] = {}
+
+        # Métricas
+        self.locales = 0
+        self.frescos = 0
+        self.viejos = 0
+        self.esperas = 0
+        self.refrescos = 0
+        self.errores = 0
+
+    def _guardada(self, tipo: str) -> Optional[WordStats]:
+        entrada = self._entradas.get(tipo)
+        if entrada:
+            return entrada
+
+        # Tras reiniciar: lo que guardó la última sincronización del corpus
+        tipos = TIPOS_CORPUS if tipo == "mixto" else (tipo,)
+        remotos = [self.corpus.remote_stats(t) for t in tipos]
+        if not all(remotos):
+            return None
+        por_categoria: Dict[str, int] = {}
+        for _, categorias, _ in remotos:
+            por_categoria.update(categorias)
+        entrada = WordStats(sum(r[0] for r in remotos), por_categoria, "api", min(r[2] for r in remotos))
+        self._entradas[tipo] = entrada
+        return entrada
+
+    def _refrescar(self, tipo: str) -> asyncio.Task:
+        """Una sola petición en vuelo por tipo, aunque la pidan varios servidores a la vez"""
+        tarea = self._refrescos.get(tipo)
+        if tarea is None or tarea.done():
+            self.refrescos += 1
+            tarea = self._refrescos[tipo] = asyncio.create_task(self._descargar(tipo))
+        return tarea
+
+    async def _descargar(self, tipo: str) -> Optional[WordStats]:
+        try:
+            data = await resilient_api.get_json("/estadisticas", params={"tipo": tipo})
+            stats = data["estadisticas"]
+            entrada = WordStats(int(stats["total"]), dict(stats.get("por_categoria", {})), "api", time.time())
+        except (ApiError, KeyError, TypeError, ValueError) as e:
+            self.errores += 1
+            logger.warning("⚠️ No se pudieron obtener estadísticas de %s: %s", tipo, e)
+            return None
+        self._entradas[tipo] = entrada
+        return entrada
+
+    async def get(self, tipo: str) -> Optional[WordStats]:
+        """Estadísticas de un tipo, o None si no hay datos y la API no responde a tiempo"""
+        if self.corpus.is_ready(tipo):
+            self.locales += 1
+            por_categoria = self.corpus.category_counts(tipo)
+            return WordStats(self.corpus.count(tipo), por_categoria, "corpus", time.time())
+
+        entrada = self._guardada(tipo)
+        if entrada:
+            edad = entrada.edad()
+            if edad < self.ttl:
+                self.frescos += 1
+                return entrada
+            if edad < self.ttl + self.stale:
+                self.viejos += 1
+                self._refrescar(tipo)
+                return entrada
+
+        # Nada guardado (o demasiado viejo): esperar un poco; el refresco sigue aunque se agote el plazo
+        self.esperas += 1
+        try:
+            nueva = await asyncio.wait_for(asyncio.shield(self._refrescar(tipo)), self.presupuesto)
+        except asyncio.TimeoutError:
+            nueva = None
+        return nueva or entrada
+
+    async def get_many(self, tipos: Sequence[str]) -> Dict[str, Optional[WordStats]]:
+        """Todos los tipos a la vez: el peor caso es un solo presupuesto, no uno por tipo"""
+        resultados: List[Optional[WordStats]] = await asyncio.gather(*(self.get(tipo) for tipo in tipos))
+        return dict(zip(tipos, resultados))
+
+    async def stop(self):
+        for tarea in self._refrescos.values():
+            tarea.cancel()
+        await asyncio.gather(*self._refrescos.values(), return_exceptions=True)
+        self._refrescos.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tipos": len(self._entradas),
+            "locales": self.locales,
+            "frescos": self.frescos,
+            "viejos": self.viejos,
+            "esperas": self.esperas,
+            "refrescos": self.refrescos,
+            "errores": self.errores
+        }
+
+
+# Estadísticas compartidas por todos los servidores
+word_stats = WordStatsCache()